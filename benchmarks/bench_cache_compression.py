@@ -0,0 +1,52 @@
+"""
+compare the size and the load time of a cached specification
+with LocalFileCache and CompressedFileCache.
+
+    $ PYTHONPATH=src python benchmarks/bench_cache_compression.py [path/to/spec.json]
+"""
+import importlib.util
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from cfn_docgen.adapters.internal.cache import CompressedFileCache, LocalFileCache
+from cfn_docgen.config import AppContext
+
+def best_of(func, number:int) -> float:
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(spec_path:str, number:int=5):
+    context = AppContext(log_level=logging.WARNING)
+    with open(spec_path, "r", encoding="UTF-8") as fp:
+        body = fp.read()
+    url = "https://example.com/CloudFormationResourceSpecification.json"
+
+    compressions = ["gzip"]
+    if importlib.util.find_spec("zstandard") is not None:
+        compressions.append("zstd")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        caches = {"LocalFileCache": LocalFileCache(os.path.join(cache_dir, "none"), context)}
+        for compression in compressions:
+            caches[f"CompressedFileCache({compression})"] = CompressedFileCache(
+                os.path.join(cache_dir, compression), context, compression, # type: ignore
+            )
+        for name, cache in caches.items():
+            start = time.perf_counter()
+            cache.put(url, body)
+            put = time.perf_counter() - start
+            size = os.path.getsize(cache.cache_filepath(url))
+            get = best_of(lambda: cache.get(url), number)
+            load = best_of(lambda: json.loads(cache.get(url)), number) # type: ignore
+            print(f"{name:26s}: size {size/1024/1024:5.1f} MiB, put {put*1000:6.1f}ms, get {get*1000:6.1f}ms, get + json.loads {load*1000:6.1f}ms")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "/tmp/us-east-1.json")
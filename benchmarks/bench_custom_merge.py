@@ -0,0 +1,52 @@
+"""
+compare building a repository with a custom resource specification from warm caches,
+between loading and merging both specifications and loading the snapshot of the merged one.
+
+    $ PYTHONPATH=src python benchmarks/bench_custom_merge.py path/to/CloudFormationResourceSpecification.json
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+
+CUSTOM_SPECIFICATION = os.path.join(os.path.dirname(__file__), "..", "docs", "custom-specification.json")
+
+class MergingCfnSpecificationRepository(CfnSpecificationRepository):
+    snapshot_merged_specification = False
+
+def best_of(repository_type:type, spec_path:str, cache_dir:str, number:int) -> float:
+    context = AppContext(
+        log_level=logging.WARNING,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    timings = []
+    # the first build fills the caches
+    for _ in range(number + 1):
+        start = time.perf_counter()
+        repository_type(
+            source_url=spec_path,
+            custom_resource_specification_url=CUSTOM_SPECIFICATION,
+            cache=LocalFileCache(cache_dir, context),
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+            loader_factory=specification_loader_factory,
+        )
+        timings.append(time.perf_counter() - start)
+    return min(timings[1:])
+
+def main(spec_path:str, number:int=5):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.chmod(cache_dir, 0o700)
+        merging = best_of(MergingCfnSpecificationRepository, spec_path, cache_dir, number)
+        merged = best_of(CfnSpecificationRepository, spec_path, cache_dir, number)
+    print(f"load and merge  : {merging:.3f}s")
+    print(f"merged snapshot : {merged:.3f}s")
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,46 @@
+"""
+compare the standard json module and the orjson backend on the specification of us-east-1 from the cache,
+parsing the whole specification and rendering each of its resource types with indentation as documents and skeletons do.
+rendered strings are checked to be the same.
+
+    $ PYTHONPATH=src python benchmarks/bench_json_backend.py
+"""
+import json
+import logging
+import time
+
+from cfn_docgen import json_backend
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.config import AppConfig, AppContext
+
+def best_of(func, number:int) -> float:
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(number:int=5):
+    assert json_backend.ORJSON_AVAILABLE
+    cache = LocalFileCache(AppConfig.CACHE_ROOT_DIR, AppContext(log_level=logging.CRITICAL))
+    body = cache.get_bytes(AppConfig.DEFAULT_SPECIFICATION_URL)
+    assert body is not None, "specification is not cached. run `cfn-docgen spec prefetch --regions us-east-1` first"
+    resource_types = list(json.loads(body)["ResourceTypes"].values())
+    for resource_type in resource_types:
+        assert json_backend.dumps_indented(resource_type) == json.dumps(resource_type, indent=2, ensure_ascii=False)
+
+    print(f"{'':<36} {'json':>8} {'orjson':>8}")
+    parse = (
+        best_of(lambda: json.loads(body.decode()), number),
+        best_of(lambda: json_backend.loads(body), number),
+    )
+    print(f"{f'parse specification ({len(body)/2**20:.1f}MiB)':<36} {parse[0]:>7.3f}s {parse[1]:>7.3f}s")
+    dump = (
+        best_of(lambda: [json.dumps(r, indent=2, ensure_ascii=False) for r in resource_types], number),
+        best_of(lambda: [json_backend.dumps_indented(r) for r in resource_types], number),
+    )
+    print(f"{f'render {len(resource_types)} resource types':<36} {dump[0]:>7.3f}s {dump[1]:>7.3f}s")
+
+if __name__ == "__main__":
+    main()
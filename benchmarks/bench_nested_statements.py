@@ -0,0 +1,103 @@
+"""
+measure building a AWS::WAFv2::WebACL whose rule statements are nested in and statements many levels deep.
+each level adds two property nodes (AndStatement and an element of its Statements), and the nodes built are counted.
+run on two checkouts to compare them.
+
+    $ PYTHONPATH=src python benchmarks/bench_nested_statements.py [levels ...]
+"""
+import logging
+import sys
+import time
+from typing import Any, Dict
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateResourcesNode
+
+LEVELS = [10, 40, 200, 1000]
+NUMBER_OF_RULES = 10
+
+def statement(levels:int) -> Dict[str, Any]:
+    byte_match = {
+        "ByteMatchStatement": {
+            "FieldToMatch": {"UriPath": {}},
+            "PositionalConstraint": "STARTS_WITH",
+            "SearchString": f"/level{levels}",
+            "TextTransformations": [{"Priority": 0, "Type": "NONE"}],
+        },
+    }
+    nested = byte_match
+    for _ in range(levels):
+        nested = {"AndStatement": {"Statements": [nested, byte_match]}}
+    return nested
+
+def template(levels:int) -> CfnTemplateDefinition:
+    rules = [
+        {
+            "Name": f"rule{i}",
+            "Priority": i,
+            "Action": {"Block": {}},
+            "Statement": statement(levels),
+            "VisibilityConfig": {"CloudWatchMetricsEnabled": False, "MetricName": f"rule{i}", "SampledRequestsEnabled": False},
+        } for i in range(NUMBER_OF_RULES)
+    ]
+    return CfnTemplateDefinition(Resources={ # type: ignore
+        "WebACL": {
+            "Type": "AWS::WAFv2::WebACL",
+            "Properties": {
+                "DefaultAction": {"Allow": {}},
+                "Scope": "REGIONAL",
+                "Rules": rules,
+                "VisibilityConfig": {"CloudWatchMetricsEnabled": False, "MetricName": "webacl", "SampledRequestsEnabled": False},
+            },
+        },
+    })
+
+def count_nodes(node:Any) -> int:
+    count = 0
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        count += 1
+        stack.extend(n.property_nodes.values())
+        for nodes in n.property_nodes_list.values():
+            stack.extend(nodes)
+        for nodes in n.property_nodes_map.values():
+            stack.extend(nodes.values())
+    return count
+
+def main():
+    levels_list = [int(levels) for levels in sys.argv[1:]] or LEVELS
+    context = AppContext(
+        log_level=logging.CRITICAL,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    for levels in levels_list:
+        definition = template(levels)
+        start = time.perf_counter()
+        try:
+            node = CfnTemplateResourcesNode(
+                definitions=definition.Resources,
+                resource_groups={},
+                spec_repository=repository,
+                context=context,
+            )
+        except RecursionError:
+            print(f"{levels:>5} levels: RecursionError")
+            continue
+        elapsed = time.perf_counter() - start
+        resource_node = node.group_nodes[node.group_name_for_independent_resources].resource_nodes.get("WebACL")
+        nodes = count_nodes(resource_node.properties_node) if resource_node is not None and hasattr(resource_node, "properties_node") else 0
+        print(f"{levels:>5} levels: {elapsed:.3f}s {nodes} nodes")
+
+if __name__ == "__main__":
+    main()
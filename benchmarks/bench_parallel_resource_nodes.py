@@ -0,0 +1,93 @@
+"""
+measure building the resources of a large template in this process and with process pools of several sizes,
+and print the speedup of each against the number of cores.
+run on two checkouts to compare them.
+
+    $ PYTHONPATH=src python benchmarks/bench_parallel_resource_nodes.py [jobs ...]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateResourcesNode
+
+JOBS = [1, 2, 4]
+NUMBER_OF_RESOURCES_PER_TYPE = 100
+
+def template() -> CfnTemplateDefinition:
+    resources:Dict[str, Any] = {}
+    for i in range(NUMBER_OF_RESOURCES_PER_TYPE):
+        resources[f"Instance{i}"] = {
+            "Type": "AWS::EC2::Instance",
+            "Properties": {
+                "ImageId": "ami-12345678",
+                "InstanceType": "t3.micro",
+                "BlockDeviceMappings": [{"DeviceName": "/dev/xvda", "Ebs": {"VolumeSize": 8}}],
+                "Tags": [{"Key": "Name", "Value": f"instance-{i}"}],
+            },
+        }
+        resources[f"Bucket{i}"] = {
+            "Type": "AWS::S3::Bucket",
+            "Properties": {"BucketName": f"bucket-{i}", "VersioningConfiguration": {"Status": "Enabled"}},
+        }
+        resources[f"Function{i}"] = {
+            "Type": "AWS::Lambda::Function",
+            "Properties": {"Handler": "index.handler", "Runtime": "python3.12", "Environment": {"Variables": {"KEY": f"value-{i}"}}},
+        }
+        resources[f"Queue{i}"] = {
+            "Type": "AWS::SQS::Queue",
+            "Properties": {"QueueName": f"queue-{i}", "VisibilityTimeout": 30},
+        }
+    return CfnTemplateDefinition(Resources=resources) # type: ignore
+
+def best_of(func, number:int) -> float:
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(number:int=3):
+    jobs_list = [int(jobs) for jobs in sys.argv[1:]] or JOBS
+    context = AppContext(
+        log_level=logging.CRITICAL,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    definition = template()
+    print(f"{len(definition.Resources)} resources, {os.cpu_count()} cores")
+    for sparse in [False, True]:
+        mode = "sparse" if sparse else "full"
+        build = lambda executor: CfnTemplateResourcesNode(
+            definitions=definition.Resources,
+            resource_groups={},
+            spec_repository=repository,
+            context=context,
+            sparse=sparse,
+            executor=executor,
+        )
+        sequential = best_of(lambda: build(None), number)
+        print(f"  {mode:>6} in this process: {sequential:.3f}s")
+        for jobs in jobs_list:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                # start the workers before measuring
+                list(executor.map(abs, range(jobs)))
+                elapsed = best_of(lambda: build(executor), number)
+            print(f"  {mode:>6} with {jobs} jobs: {elapsed:.3f}s (x{sequential / elapsed:.2f})")
+
+if __name__ == "__main__":
+    main()
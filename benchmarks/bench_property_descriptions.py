@@ -0,0 +1,80 @@
+"""
+measure building the resources of a template whose resources describe their properties in Metadata.CfnDocgen.Properties,
+where every property node looks up its description by its json path.
+run on two checkouts to compare them.
+
+    $ PYTHONPATH=src python benchmarks/bench_property_descriptions.py
+"""
+import logging
+import time
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateResourcesNode
+
+NUMBER_OF_RESOURCES = 100
+
+def template() -> CfnTemplateDefinition:
+    resources = {}
+    for i in range(NUMBER_OF_RESOURCES):
+        resources[f"Instance{i}"] = {
+            "Type": "AWS::EC2::Instance",
+            "Metadata": {
+                "CfnDocgen": {
+                    "Description": f"instance {i}",
+                    "Properties": {
+                        "ImageId": "amazon linux 2023",
+                        "BlockDeviceMappings": [{"Ebs": {"VolumeSize": "root volume"}}],
+                        "Tags": [{"Value": "name of the instance"}],
+                    },
+                },
+            },
+            "Properties": {
+                "ImageId": "ami-12345678",
+                "InstanceType": "t3.micro",
+                "BlockDeviceMappings": [
+                    {"DeviceName": "/dev/xvda", "Ebs": {"VolumeSize": 8, "VolumeType": "gp3", "Encrypted": True}},
+                    {"DeviceName": "/dev/xvdb", "Ebs": {"VolumeSize": 100}},
+                ],
+                "SecurityGroupIds": ["sg-12345678"],
+                "Tags": [{"Key": "Name", "Value": f"instance-{i}"}, {"Key": "Env", "Value": "dev"}],
+            },
+        }
+    return CfnTemplateDefinition(Resources=resources) # type: ignore
+
+def best_of(func, number:int) -> float:
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(number:int=3):
+    context = AppContext(
+        log_level=logging.WARNING,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    for sparse in [False, True]:
+        # a new definition for each build, so that nothing looked up by the previous build is reused
+        build = lambda: CfnTemplateResourcesNode(
+            definitions=template().Resources,
+            resource_groups={},
+            spec_repository=repository,
+            context=context,
+            sparse=sparse,
+        )
+        elapsed = best_of(build, number)
+        print(f"{NUMBER_OF_RESOURCES} resources with descriptions ({'sparse' if sparse else 'full'}): {elapsed:.3f}s")
+
+if __name__ == "__main__":
+    main()
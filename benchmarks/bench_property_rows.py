@@ -0,0 +1,85 @@
+"""
+measure building the property rows of documents from the sparse tree of a template with 1,000 resources,
+whose properties have lists with more than ten items.
+run on two checkouts to compare them.
+
+    $ PYTHONPATH=src python benchmarks/bench_property_rows.py
+"""
+import logging
+import time
+from typing import Any, Dict
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_document_generator import CfnMarkdownDocumentGenerator
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateResourcesNode
+
+NUMBER_OF_RESOURCES = 1000
+
+def template() -> CfnTemplateDefinition:
+    resources:Dict[str, Any] = {}
+    for i in range(NUMBER_OF_RESOURCES // 2):
+        resources[f"Instance{i}"] = {
+            "Type": "AWS::EC2::Instance",
+            "Properties": {
+                "ImageId": "ami-12345678",
+                "BlockDeviceMappings": [
+                    {"DeviceName": f"/dev/xvd{chr(ord('a') + j)}", "Ebs": {"VolumeSize": 8, "VolumeType": "gp3"}}
+                    for j in range(12)
+                ],
+                "Tags": [{"Key": f"key{j}", "Value": f"value{j}"} for j in range(12)],
+            },
+        }
+        resources[f"SecurityGroup{i}"] = {
+            "Type": "AWS::EC2::SecurityGroup",
+            "Properties": {
+                "GroupDescription": f"security group {i}",
+                "SecurityGroupIngress": [
+                    {"IpProtocol": "tcp", "FromPort": port, "ToPort": port, "CidrIp": "10.0.0.0/8"}
+                    for port in range(8000, 8012)
+                ],
+            },
+        }
+    return CfnTemplateDefinition(Resources=resources) # type: ignore
+
+def best_of(func, number:int) -> float:
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(number:int=5):
+    context = AppContext(
+        log_level=logging.CRITICAL,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    resources_node = CfnTemplateResourcesNode(
+        definitions=template().Resources,
+        resource_groups={},
+        spec_repository=repository,
+        context=context,
+        sparse=True,
+    )
+    properties_nodes = [
+        resource_node.properties_node
+        for group_node in resources_node.group_nodes.values()
+        for resource_node in group_node.resource_nodes.values()
+    ]
+    generator = CfnMarkdownDocumentGenerator(context)
+    rows = lambda: [generator._flatten_properties_node(properties_node) for properties_node in properties_nodes] # type: ignore
+    elapsed = best_of(rows, number)
+    print(f"{len(properties_nodes)} resources, {sum(len(r) for r in rows())} rows: {elapsed:.3f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+measure building the resources of a template with many resources of the same types into CfnTemplateTree.
+run on two checkouts to compare them. the full tree (skeletons) and the sparse one (documents) are compared, with the memory they hold.
+
+    $ PYTHONPATH=src python benchmarks/bench_resource_nodes.py
+"""
+import gc
+import logging
+import time
+import tracemalloc
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateResourcesNode
+
+NUMBER_OF_RESOURCES = 200
+
+def template() -> CfnTemplateDefinition:
+    resources = {}
+    for i in range(NUMBER_OF_RESOURCES):
+        resources[f"SecurityGroup{i}"] = {
+            "Type": "AWS::EC2::SecurityGroup",
+            "Properties": {
+                "GroupDescription": f"security group {i}",
+                "SecurityGroupIngress": [
+                    {"IpProtocol": "tcp", "FromPort": 443, "ToPort": 443, "CidrIp": "0.0.0.0/0"},
+                ],
+                "Tags": [{"Key": "Name", "Value": f"sg-{i}"}],
+            },
+        }
+        resources[f"Instance{i}"] = {
+            "Type": "AWS::EC2::Instance",
+            "Properties": {
+                "ImageId": "ami-12345678",
+                "BlockDeviceMappings": [{"DeviceName": "/dev/xvda", "Ebs": {"VolumeSize": 8}}],
+            },
+        }
+    return CfnTemplateDefinition(Resources=resources) # type: ignore
+
+def best_of(func, number:int) -> float:
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(number:int=5):
+    context = AppContext(
+        log_level=logging.WARNING,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    definition = template()
+    for sparse in [False, True]:
+        build = lambda: CfnTemplateResourcesNode(
+            definitions=definition.Resources,
+            resource_groups={},
+            spec_repository=repository,
+            context=context,
+            sparse=sparse,
+        )
+        elapsed = best_of(build, number)
+        gc.collect()
+        tracemalloc.start()
+        node = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del node
+        print(f"{len(definition.Resources)} resources ({'sparse' if sparse else 'full'}): {elapsed:.3f}s {size/2**20:.1f}MiB")
+
+if __name__ == "__main__":
+    main()
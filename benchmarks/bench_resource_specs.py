@@ -0,0 +1,57 @@
+"""
+compare looking up the specs for every resource of a template with 1,000 resources
+by scanning all property types (as before) with the per resource type index.
+
+    $ PYTHONPATH=src python benchmarks/bench_resource_specs.py
+"""
+import logging
+import time
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_specification import CfnSpecificationResourceTypeName
+
+NUMBER_OF_RESOURCES = 1000
+
+def scan_properties_for_resource(repository:CfnSpecificationRepository, resource_type:CfnSpecificationResourceTypeName):
+    return {
+        property_type: property_spec for property_type, property_spec in repository.spec.PropertyTypes.items()
+        if property_type.startswith(f"{resource_type.fullname}.") or property_type == "Tag"
+    }
+
+def main():
+    context = AppContext(
+        log_level=logging.WARNING,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    all_resource_types = repository.list_resource_types()
+    resource_types = [
+        CfnSpecificationResourceTypeName(all_resource_types[i % len(all_resource_types)], context)
+        for i in range(NUMBER_OF_RESOURCES)
+    ]
+
+    start = time.perf_counter()
+    for resource_type in resource_types:
+        scan_properties_for_resource(repository, resource_type)
+    scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for resource_type in resource_types:
+        repository.get_specs_for_resource(resource_type)
+    indexed = time.perf_counter() - start
+
+    print(f"{len(repository.spec.PropertyTypes)} property types, {NUMBER_OF_RESOURCES} resources")
+    print(f"scan    : {scan*1000:.1f}ms")
+    print(f"indexed : {indexed*1000:.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+compare peak memory (tracemalloc) and time to build CfnSpecification from a downloaded specification,
+between parsing the whole body at once and parsing it entry by entry from the download stream.
+
+    $ PYTHONPATH=src python benchmarks/bench_spec_ingest.py path/to/CloudFormationResourceSpecification.json
+"""
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+from cfn_docgen.adapters.internal.file_loader import LocalFileLoader
+from cfn_docgen.adapters.internal.json_stream import iter_json_entries
+from cfn_docgen.config import AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_specification import CfnSpecification
+
+def whole(loader:LocalFileLoader, path:str) -> CfnSpecification:
+    body = loader.download(path)
+    return CfnSpecification(**json.loads(body.decode()))
+
+def stream(loader:LocalFileLoader, path:str) -> CfnSpecification:
+    chunks, _ = loader.download_stream(path)
+    return CfnSpecification.from_entries(
+        iter_json_entries(chunks, nested_keys={"ResourceTypes", "PropertyTypes"}),
+    )
+
+def main(path:str):
+    context = AppContext(
+        log_level=logging.WARNING,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    loader = LocalFileLoader(context)
+    for name, build in [("whole", whole), ("stream", stream)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        spec = build(loader, path)
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:6s}: {elapsed:.3f}s, peak {peak / 2**20:.1f} MiB, retained {current / 2**20:.1f} MiB")
+        del spec
+
+if __name__ == "__main__":
+    main(sys.argv[1])
@@ -0,0 +1,38 @@
+"""
+compare loading the cached resource specification by validating its json
+with loading its pre-validated snapshot.
+
+    $ PYTHONPATH=src python benchmarks/bench_spec_load.py [path/to/spec.json]
+"""
+import json
+import sys
+import tempfile
+import time
+
+from cfn_docgen.adapters.internal.snapshot import dump_snapshot, load_snapshot, snapshot_secret
+from cfn_docgen.domain.model.cfn_specification import CfnSpecification
+
+def best_of(func, number:int) -> float:
+    # not timeit, which disables gc and so hides most of the validation cost
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(spec_path:str, number:int=5):
+    with open(spec_path, "r", encoding="UTF-8") as fp:
+        cached = fp.read()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        secret = snapshot_secret(cache_dir)
+        body = dump_snapshot(CfnSpecification(**json.loads(cached)), secret, tags={})
+
+        validate = best_of(lambda: CfnSpecification(**json.loads(cached)), number)
+        snapshot = best_of(lambda: load_snapshot(body, CfnSpecification, secret, tags={}), number)
+    print(f"json + validation : {validate:.3f}s ({len(cached.encode())/1024/1024:.1f} MiB)")
+    print(f"snapshot          : {snapshot:.3f}s ({len(body)/1024/1024:.1f} MiB)")
+    print(f"speedup           : {validate/snapshot:.1f}x")
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "/tmp/us-east-1.json")
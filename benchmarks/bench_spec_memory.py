@@ -0,0 +1,89 @@
+"""
+compare memory of the specification of each region kept as pydantic models (as before) and as compact specs,
+when a run loads it from its snapshot.
+each of them is loaded in a fresh process, and the resident memory it adds (and the memory allocated by python objects, traced separately) is reported.
+specifications are read from the cache (e.g. after `cfn-docgen spec prefetch`), and regions not in the cache are skipped.
+
+    $ PYTHONPATH=src python benchmarks/bench_spec_memory.py [region ...]
+"""
+import gc
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+import tracemalloc
+from typing import Dict, List, Tuple
+
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.config import AppConfig, AppContext
+from cfn_docgen.domain.model.cfn_specification import CfnSpecification, CfnSpecificationCompact
+
+def resident_bytes() -> int:
+    with open("/proc/self/statm", "r") as fp:
+        return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def measure(path:str, traced:bool) -> int:
+    with open(path, "rb") as fp:
+        payload = fp.read()
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    before = resident_bytes()
+    spec = pickle.loads(payload)
+    gc.collect()
+    if traced:
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    else:
+        size = resident_bytes() - before
+    del spec
+    return size
+
+def measure_in_process(path:str, traced:bool) -> int:
+    # fresh interpreter, so that memory freed by other measurements is not reused
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(measure, (path, traced))
+
+def dump_snapshots(region:str, url:str, directory:str) -> Dict[str, str]:
+    body = LocalFileCache(AppConfig.CACHE_ROOT_DIR, AppContext(log_level=logging.CRITICAL)).get(url)
+    if body is None:
+        return {}
+    spec = CfnSpecification(**json.loads(body))
+    paths:Dict[str, str] = {}
+    for name, model in [("pydantic", spec), ("compact", CfnSpecificationCompact.from_specification(spec))]:
+        paths[name] = os.path.join(directory, f"{region}.{name}.pickle")
+        with open(paths[name], "wb") as fp:
+            pickle.dump(model, fp, protocol=pickle.HIGHEST_PROTOCOL)
+    return paths
+
+def mib(size:int) -> str:
+    return f"{size/2**20:>7.1f}MiB"
+
+def main():
+    regions = sys.argv[1:] or list(AppConfig.SPECIFICATION_URL_BY_REGION.keys())
+    results:List[Tuple[int, int, int, int]] = []
+    print(f"{'':<16} {'resident':>21} {'python objects':>21}")
+    print(f"{'region':<16} {'pydantic':>10} {'compact':>10} {'pydantic':>10} {'compact':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for region in regions:
+            paths = dump_snapshots(region, AppConfig.SPECIFICATION_URL_BY_REGION[region], directory)
+            if not paths:
+                print(f"{region:<16} not cached")
+                continue
+            result = (
+                measure_in_process(paths["pydantic"], traced=False),
+                measure_in_process(paths["compact"], traced=False),
+                measure_in_process(paths["pydantic"], traced=True),
+                measure_in_process(paths["compact"], traced=True),
+            )
+            results.append(result)
+            print(f"{region:<16} {' '.join(mib(size) for size in result)}")
+    if results:
+        averages = [sum(result[i] for result in results) // len(results) for i in range(4)]
+        print(f"{'average':<16} {' '.join(mib(size) for size in averages)}")
+
+if __name__ == "__main__":
+    main()
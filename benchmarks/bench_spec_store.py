@@ -0,0 +1,58 @@
+"""
+compare memory and time to look up a few resource types
+with CfnSpecificationRepository (snapshot) and MmapCfnSpecificationRepository (spec store).
+each repository runs in its own process to measure its peak RSS.
+
+    $ PYTHONPATH=src python benchmarks/bench_spec_store.py
+"""
+import logging
+import resource
+import subprocess
+import sys
+import time
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository, MmapCfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_specification import CfnSpecificationResourceTypeName
+
+RESOURCE_TYPES = ["AWS::EC2::Instance", "AWS::S3::Bucket", "AWS::Lambda::Function", "AWS::IAM::Role"]
+REPOSITORIES = {
+    "CfnSpecificationRepository": CfnSpecificationRepository,
+    "MmapCfnSpecificationRepository": MmapCfnSpecificationRepository,
+}
+
+def run(name:str):
+    context = AppContext(
+        log_level=logging.WARNING,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    start = time.perf_counter()
+    repository = REPOSITORIES[name](
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    for resource_type in RESOURCE_TYPES:
+        repository.get_specs_for_resource(CfnSpecificationResourceTypeName(resource_type, context))
+    elapsed = time.perf_counter() - start
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{name:32s}: {elapsed:.3f}s, peak RSS {max_rss:.0f} MiB")
+
+def main():
+    for name in REPOSITORIES.keys():
+        # the first run builds the snapshot or the store
+        for _ in range(2):
+            output = subprocess.run(
+                [sys.executable, __file__, name], check=True, capture_output=True, text=True,
+            ).stdout
+        print(output, end="")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+    else:
+        main()
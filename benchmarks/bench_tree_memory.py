@@ -0,0 +1,99 @@
+"""
+measure the memory held by CfnTemplateTree for a template with 1,000 resources, against the size of the template text.
+the full tree (skeletons) and the sparse one (documents) are measured, and so are the property fields of the document.
+run on two checkouts to compare them.
+
+    $ PYTHONPATH=src python benchmarks/bench_tree_memory.py
+"""
+import gc
+import json
+import logging
+import tracemalloc
+from typing import Any, Dict
+
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
+from cfn_docgen.domain.model.cfn_document_generator import CfnMarkdownDocumentGenerator
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateSource, CfnTemplateTree
+
+NUMBER_OF_RESOURCES = 1000
+
+def template_text() -> str:
+    parameters:Dict[str, Any] = {}
+    resources:Dict[str, Any] = {}
+    outputs:Dict[str, Any] = {}
+    for i in range(NUMBER_OF_RESOURCES // 4):
+        parameters[f"ImageId{i}"] = {"Type": "AWS::EC2::Image::Id", "Description": f"image of instance {i}"}
+        resources[f"Instance{i}"] = {
+            "Type": "AWS::EC2::Instance",
+            "Properties": {
+                "ImageId": {"Ref": f"ImageId{i}"},
+                "InstanceType": "t3.micro",
+                "BlockDeviceMappings": [{"DeviceName": "/dev/xvda", "Ebs": {"VolumeSize": 8, "VolumeType": "gp3"}}],
+                "Tags": [{"Key": "Name", "Value": f"instance-{i}"}],
+            },
+        }
+        resources[f"SecurityGroup{i}"] = {
+            "Type": "AWS::EC2::SecurityGroup",
+            "Properties": {
+                "GroupDescription": f"security group {i}",
+                "SecurityGroupIngress": [{"IpProtocol": "tcp", "FromPort": 443, "ToPort": 443, "CidrIp": "0.0.0.0/0"}],
+            },
+        }
+        resources[f"Bucket{i}"] = {
+            "Type": "AWS::S3::Bucket",
+            "Properties": {"BucketName": f"bucket-{i}", "VersioningConfiguration": {"Status": "Enabled"}},
+        }
+        resources[f"Queue{i}"] = {
+            "Type": "AWS::SQS::Queue",
+            "Properties": {"QueueName": f"queue-{i}", "VisibilityTimeout": 30},
+        }
+        outputs[f"InstanceId{i}"] = {"Value": {"Ref": f"Instance{i}"}, "Description": f"id of instance {i}"}
+    return json.dumps({"Parameters": parameters, "Resources": resources, "Outputs": outputs}, indent=2)
+
+def traced(func) -> Any:
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def main():
+    context = AppContext(
+        log_level=logging.CRITICAL,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        loader_factory=specification_loader_factory,
+    )
+    text = template_text()
+    definition = CfnTemplateDefinition(**json.loads(text))
+    source = CfnTemplateSource("template.json", context)
+    print(f"{len(definition.Resources)} resources, template text {len(text)/2**20:.2f}MiB")
+    for sparse in [False, True]:
+        tree, size = traced(lambda: CfnTemplateTree(
+            template_source=source,
+            definition=definition,
+            spec_repository=repository,
+            context=context,
+            sparse=sparse,
+        ))
+        print(f"  tree ({'sparse' if sparse else 'full'}): {size/2**20:.2f}MiB (x{size/len(text):.1f} of the text)")
+    generator = CfnMarkdownDocumentGenerator(context)
+    resources_node = tree.resources_node
+    _, size = traced(lambda: [
+        generator._flatten_properties_node(resource_node.properties_node)
+        for group_node in resources_node.group_nodes.values()
+        for resource_node in group_node.resource_nodes.values()
+    ])
+    print(f"  property fields of the document: {size/2**20:.2f}MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+compare loading a large yaml template like the ones synthesized by cdk,
+through the json string converted by cfn_flip (as before), with the LibYAML based loader,
+and from the snapshot cached for an unchanged template.
+
+    $ PYTHONPATH=src python benchmarks/bench_yaml_template.py [number of resources]
+"""
+import json
+import logging
+import secrets
+import sys
+import time
+
+from cfn_flip import to_json # type: ignore
+from cfn_docgen.adapters.internal.snapshot import dump_snapshot, load_snapshot
+from cfn_docgen.adapters.internal.yaml_loader import LIBYAML_AVAILABLE, load_yaml_template
+from cfn_docgen.config import AppContext
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition
+
+def resource(i:int) -> str:
+    # cdk synthesizes intrinsic functions in their long form, with metadata for every resource
+    return f"""  Function{i}ServiceRole:
+    Type: AWS::IAM::Role
+    Properties:
+      AssumeRolePolicyDocument:
+        Statement:
+          - Action: sts:AssumeRole
+            Effect: Allow
+            Principal:
+              Service: lambda.amazonaws.com
+        Version: "2012-10-17"
+      ManagedPolicyArns:
+        - Fn::Join:
+            - ""
+            - - "arn:"
+              - Ref: AWS::Partition
+              - :iam::aws:policy/service-role/AWSLambdaBasicExecutionRole
+    Metadata:
+      aws:cdk:path: SampleStack/Function{i}/ServiceRole/Resource
+  Function{i}:
+    Type: AWS::Lambda::Function
+    Properties:
+      Code:
+        S3Bucket: !Sub cdk-hnb659fds-assets-${{AWS::AccountId}}-${{AWS::Region}}
+        S3Key: {i:064x}.zip
+      Role:
+        Fn::GetAtt:
+          - Function{i}ServiceRole
+          - Arn
+      Environment:
+        Variables:
+          TABLE_NAME: !Ref Table
+          TOPIC_ARN: !GetAtt Topic.TopicArn
+      Handler: index.handler
+      Runtime: python3.11
+      Timeout: 30
+    DependsOn:
+      - Function{i}ServiceRole
+    Metadata:
+      aws:cdk:path: SampleStack/Function{i}/Resource
+      aws:asset:path: asset.{i:064x}
+      aws:asset:is-bundled: false
+      aws:asset:property: Code
+"""
+
+def template(number_of_functions:int) -> str:
+    return "\n".join([
+        "AWSTemplateFormatVersion: 2010-09-09",
+        "Description: sample stack",
+        "Resources:",
+        "  Table:\n    Type: AWS::DynamoDB::Table\n    Properties:\n      BillingMode: PAY_PER_REQUEST",
+        "  Topic:\n    Type: AWS::SNS::Topic\n    Properties:\n      TopicName: sample",
+        *[resource(i) for i in range(number_of_functions)],
+        "Outputs:\n  TopicArn:\n    Value: !Ref Topic",
+    ])
+
+def best_of(func, number:int) -> float:
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(number:int=3):
+    context = AppContext(log_level=logging.WARNING)
+    number_of_functions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    body = template(number_of_functions)
+    assert LIBYAML_AVAILABLE
+    assert load_yaml_template(body) == json.loads(to_json(body))
+    print(f"{len(body)/2**20:.1f}MiB yaml, {number_of_functions*2+2} resources")
+    results = {
+        "cfn_flip": best_of(lambda: CfnTemplateDefinition.from_string(to_json(body), context), number),
+        "LibYAML loader": best_of(lambda: CfnTemplateDefinition.from_dict(load_yaml_template(body), context), number),
+    }
+    secret, tags = secrets.token_bytes(32), {"cfn_docgen": "bench"}
+    snapshot = dump_snapshot(CfnTemplateDefinition.from_dict(load_yaml_template(body), context), secret, tags)
+    results["snapshot"] = best_of(lambda: load_snapshot(snapshot, CfnTemplateDefinition, secret, tags), number)
+    for name, elapsed in results.items():
+        print(f"{name:<16} {elapsed:.3f}s")
+
+if __name__ == "__main__":
+    main()
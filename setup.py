@@ -23,6 +23,10 @@ setup(
     package_dir={"": "src"},
     packages = find_packages(where="src", ),
     install_requires = [requirements],
+    extras_require = {
+        "zstd": ["zstandard>=0.21.0"],
+        "orjson": ["orjson>=3.9.0"],
+    },
     python_requires='>=3.10',
     classifiers=[
         "Programming Language :: Python :: 3.10",
@@ -1,13 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import hashlib
 import json
-from typing import Callable, List, Mapping, Optional
-from cfn_docgen.config import AppContext
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+from cfn_docgen import __version__, json_backend
+from cfn_docgen.adapters.internal.cache import LocalFileCache, metadata_key
+from cfn_docgen.adapters.internal.file_loader import pooled_http_session, specification_loader_factory
+from cfn_docgen.adapters.internal.json_stream import iter_json_entries
+from cfn_docgen.adapters.internal.snapshot import SnapshotMismatchError, dump_snapshot, load_snapshot, merged_snapshot_key, snapshot_key, snapshot_secret
+from cfn_docgen.adapters.internal.spec_store import dump_spec_store, load_spec_store, open_spec_store, spec_store_key
+from cfn_docgen.config import AppConfig, AppContext
 
-from cfn_docgen.domain.model.cfn_specification import CfnSpecificationForResource, CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName, CfnSpecificationPropertyType, CfnSpecificationResourceType, CfnSpecification
+from cfn_docgen.domain.model.cfn_specification import CfnSpecificationCompact, CfnSpecificationCompactPropertyType, CfnSpecificationCompactResourceType, CfnSpecificationForResource, CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName, CfnSpecification
 from cfn_docgen.domain.ports.cache import IFileCache
-from cfn_docgen.domain.ports.internal.file_loader import IFileLoader
+from cfn_docgen.domain.ports.internal.file_loader import FileValidators, IFileLoader
 from cfn_docgen.domain.ports.cfn_specification_repository import ICfnSpecificationRepository
 
+SpecificationType = TypeVar("SpecificationType")
+
 class CfnSpecificationRepository(ICfnSpecificationRepository):
+    # whether the specification merged with the custom one is kept as a snapshot
+    snapshot_merged_specification = True
+
     def __init__(
         self, 
         source_url:str,
@@ -16,78 +32,298 @@ class CfnSpecificationRepository(ICfnSpecificationRepository):
         context:AppContext,
         loader_factory:Callable[[str, AppContext], IFileLoader], 
         custom_resource_specification_url:Optional[str]=None,
+        lazy_validation:bool=False,
+        cache_ttl:Optional[float]=None,
     ) -> None:
         self.context = context
+        self.lazy_validation = lazy_validation
+        self.cache_ttl = cache_ttl
         self.recursive_resource_types = recursive_resource_types
         self.loader_factory = loader_factory
 
+        use_merged_snapshot = (
+            custom_resource_specification_url is not None
+            and self.snapshot_merged_specification and not self.lazy_validation
+        )
+        merged_spec:Optional[CfnSpecificationCompact] = None
         try:
-            cached = cache.get(source_url)
-            if cached is None:
-                self.context.log_debug(f"cache not hit [{source_url}]")
-                json_bytes = self.loader_factory(source_url, self.context).download(source_url)
-                json_str = json_bytes.decode()
-                self.spec = CfnSpecification(**json.loads(json_str))
-                cache.put(source_url, json_str)
+            # cache for each url is filled by one process at a time. the others wait for it and reuse the cache
+            with cache.lock(source_url):
+                self.__revalidate_cache(source_url, cache)
+            if custom_resource_specification_url is not None:
+                with cache.lock(custom_resource_specification_url):
+                    self.__revalidate_cache(custom_resource_specification_url, cache)
+            if use_merged_snapshot:
+                merged_spec = self.__get_merged_snapshot(source_url, custom_resource_specification_url, cache) # type: ignore
+            if merged_spec is None:
+                with cache.lock(source_url):
+                    self.spec = self._load_specification(source_url, cache)
             else:
-                self.context.log_debug(f"cache hit [{source_url}]")
-                self.spec = CfnSpecification(**json.loads(cached))
+                self.spec = merged_spec
             self.recursive_resource_types = recursive_resource_types
         except Exception as ex:
             self.context.log_error("failed to setup CfnSpecificationRepository")
             raise ex
 
 
-        if custom_resource_specification_url is None:
+        if custom_resource_specification_url is not None and merged_spec is None:
+            try:
+                with cache.lock(custom_resource_specification_url):
+                    custom_spec = self._load_specification(custom_resource_specification_url, cache)
+                self.spec.merge_with_custom_specification(custom_spec, context)
+                if use_merged_snapshot:
+                    self.__put_merged_snapshot(source_url, custom_resource_specification_url, cache)
+
+            except Exception:
+                self.context.log_warning(f"failed to setup custom-resource-specification from [{custom_resource_specification_url}]")
+
+        self.__index_property_types()
+
+    def __index_property_types(self):
+        # group property types by their resource type once,
+        # so that looking up the property types of a resource does not scan all of them
+        shared_property_types:List[str] = []
+        property_types_by_resource:Dict[str, List[str]] = {}
+        for property_type in self.spec.PropertyTypes.keys():
+            if property_type == "Tag":
+                shared_property_types.append(property_type)
+                continue
+            resource_type, sep, _ = property_type.partition(".")
+            if not sep:
+                continue
+            property_types_by_resource.setdefault(resource_type, []).append(property_type)
+
+        self.shared_property_types = shared_property_types
+        self.property_types_by_resource = property_types_by_resource
+        self.specs_by_resource:Dict[str, CfnSpecificationForResource] = {}
+
+    def _load_specification(self, url:str, cache:IFileCache) -> CfnSpecificationCompact:
+        if self.lazy_validation:
+            # validate only the entries which are actually used
+            return CfnSpecificationCompact.from_specification(
+                self._build_specification(url, cache, CfnSpecification.lazy),
+            )
+
+        snapshot = self.__get_snapshot(url, cache)
+        if snapshot is not None:
+            return snapshot
+
+        # pydantic models validate the specification, then only its compact specs are kept
+        spec = CfnSpecificationCompact.from_specification(self._build_specification(
+            url, cache, lambda data: CfnSpecification(**data),
+            # on a cache miss, parse the download incrementally instead of holding all of it in memory
+            stream_build=lambda chunks: CfnSpecification.from_entries(
+                iter_json_entries(chunks, nested_keys={"ResourceTypes", "PropertyTypes"}),
+            ),
+        ))
+        self.__put_snapshot(url, spec, cache)
+        return spec
+
+    def _build_specification(
+        self, url:str, cache:IFileCache, build:Callable[[Any], SpecificationType],
+        stream_build:Optional[Callable[[Iterable[bytes]], SpecificationType]]=None,
+    ) -> SpecificationType:
+        cached = cache.get_bytes(url)
+        if cached is None and stream_build is not None:
+            self.context.log_debug(f"cache not hit [{url}]. build from stream")
+            chunks, validators = self.loader_factory(url, self.context).download_stream(url)
+            digest = hashlib.sha256()
+            stream = cache.put_stream(url, self.__digest_chunks(chunks, digest))
+            try:
+                spec = stream_build(stream)
+                # the cache is written only after the whole stream is consumed
+                for _ in stream:
+                    pass
+            except Exception:
+                # the whole download may have been cached before its end turned out to be invalid
+                stream.close()
+                cache.delete(url)
+                raise
+            self.__put_cache_metadata(url, validators, digest.hexdigest(), cache)
+        elif cached is None:
+            self.context.log_debug(f"cache not hit [{url}]")
+            json_bytes, validators = self.loader_factory(url, self.context).download_if_modified(url, FileValidators())
+            assert json_bytes is not None, f"nothing is downloaded from [{url}]"
+            spec = build(json_backend.loads(json_bytes))
+            cache.put_bytes(url, json_bytes)
+            self.__put_cache_metadata(url, validators, hashlib.sha256(json_bytes).hexdigest(), cache)
+        else:
+            self.context.log_debug(f"cache hit [{url}]")
+            spec = build(json_backend.loads(cached))
+        return spec
+
+    @staticmethod
+    def __digest_chunks(chunks:Iterable[bytes], digest:Any) -> Iterator[bytes]:
+        for chunk in chunks:
+            digest.update(chunk)
+            yield chunk
+
+    def __revalidate_cache(self, url:str, cache:IFileCache):
+        # once the ttl expires, ask the source whether the cached json is still fresh,
+        # and download it again only if it is modified
+        if self.cache_ttl is None:
             return
+        metadata = self.__get_cache_metadata(url, cache)
+        if metadata is None:
+            if cache.get_local_filepath(url) is None:
+                # nothing is cached yet
+                return
+            validators = FileValidators()
+        elif time.time() - metadata["FetchedAt"] < self.cache_ttl:
+            return
+        else:
+            validators = FileValidators(etag=metadata["ETag"], last_modified=metadata["LastModified"])
+
         try:
-            cached = cache.get(custom_resource_specification_url)
-            if cached is None:
-                self.context.log_debug(f"cache not hit [{custom_resource_specification_url}]")
-                json_bytes = self.loader_factory(
-                    custom_resource_specification_url, self.context
-                ).download(custom_resource_specification_url)
-                json_str = json_bytes.decode()
-                custom_spec = CfnSpecification(**json.loads(json_str))
-                cache.put(custom_resource_specification_url, json_str)
+            json_bytes, validators = self.loader_factory(url, self.context).download_if_modified(url, validators)
+            if json_bytes is None:
+                self.context.log_debug(f"cache for [{url}] is not modified")
+                digest = metadata.get("Digest") if metadata is not None else None
             else:
-                self.context.log_debug(f"cache hit [{custom_resource_specification_url}]")
-                custom_spec = CfnSpecification(**json.loads(cached))
-            
-            self.spec.merge_with_custom_specification(custom_spec, context)
+                self.context.log_debug(f"cache for [{url}] is modified")
+                json_backend.loads(json_bytes)["ResourceSpecificationVersion"]
+                cache.put_bytes(url, json_bytes)
+                # snapshot and spec store are built from the old json
+                cache.delete(snapshot_key(url))
+                cache.delete(spec_store_key(url))
+                digest = hashlib.sha256(json_bytes).hexdigest()
+            self.__put_cache_metadata(url, validators, digest, cache)
+        except Exception:
+            self.context.log_warning(f"failed to revalidate cache for [{url}]. use the cached one")
 
+    def __get_cache_metadata(self, url:str, cache:IFileCache) -> Optional[Mapping[str, Any]]:
+        try:
+            body = cache.get(metadata_key(url))
+            if body is None:
+                return None
+            return json.loads(body)
         except Exception:
-            self.context.log_warning(f"failed to setup custom-resource-specification from [{custom_resource_specification_url}]")
+            self.context.log_warning(f"failed to load cache metadata for [{url}]")
+            return None
 
-    def get_resource_spec(self, resource_type: CfnSpecificationResourceTypeName) -> CfnSpecificationResourceType:
+    def __put_cache_metadata(self, url:str, validators:FileValidators, digest:Optional[str], cache:IFileCache):
+        cache.put(metadata_key(url), json.dumps({
+            "ETag": validators.etag,
+            "LastModified": validators.last_modified,
+            "FetchedAt": time.time(),
+            "Digest": digest,
+        }))
+
+    def __get_digest(self, url:str, cache:IFileCache) -> Optional[str]:
+        # sha256 of the cached json, recorded when it is downloaded
+        metadata = self.__get_cache_metadata(url, cache)
+        if metadata is not None and metadata.get("Digest") is not None:
+            return metadata["Digest"]
+        body = cache.get_bytes(url)
+        if body is None:
+            return None
+        return hashlib.sha256(body).hexdigest()
+
+    def __merged_snapshot_tags(self, source_url:str, custom_url:str, cache:IFileCache) -> Optional[Mapping[str, str]]:
+        source_digest = self.__get_digest(source_url, cache)
+        custom_digest = self.__get_digest(custom_url, cache)
+        if source_digest is None or custom_digest is None:
+            return None
+        return {"cfn_docgen": __version__, "source": source_digest, "custom": custom_digest}
+
+    def __get_merged_snapshot(self, source_url:str, custom_url:str, cache:IFileCache) -> Optional[CfnSpecificationCompact]:
+        try:
+            tags = self.__merged_snapshot_tags(source_url, custom_url, cache)
+            body = cache.get_bytes(merged_snapshot_key(source_url, custom_url))
+            if tags is None or body is None:
+                self.context.log_debug(f"merged snapshot not hit [{source_url}] [{custom_url}]")
+                return None
+            spec = load_snapshot(body, CfnSpecificationCompact, secret=snapshot_secret(cache.cache_root_dir), tags=tags)
+            self.context.log_debug(f"merged snapshot hit [{source_url}] [{custom_url}]")
+            return spec
+        except SnapshotMismatchError:
+            self.context.log_debug(f"merged snapshot for [{source_url}] [{custom_url}] is built from other specifications")
+            return None
+        except Exception:
+            self.context.log_warning(f"failed to load merged snapshot for [{source_url}] [{custom_url}]")
+            return None
+
+    def __put_merged_snapshot(self, source_url:str, custom_url:str, cache:IFileCache):
+        try:
+            tags = self.__merged_snapshot_tags(source_url, custom_url, cache)
+            if tags is None:
+                return
+            cache.put_bytes(
+                merged_snapshot_key(source_url, custom_url),
+                dump_snapshot(self.spec, secret=snapshot_secret(cache.cache_root_dir), tags=tags),
+            )
+        except Exception:
+            self.context.log_warning(f"failed to save merged snapshot for [{source_url}] [{custom_url}]")
+
+    def __get_snapshot(self, url:str, cache:IFileCache) -> Optional[CfnSpecificationCompact]:
+        try:
+            body = cache.get_bytes(snapshot_key(url))
+            if body is None:
+                self.context.log_debug(f"snapshot not hit [{url}]")
+                return None
+            spec = load_snapshot(
+                body, CfnSpecificationCompact,
+                secret=snapshot_secret(cache.cache_root_dir),
+                tags={"cfn_docgen": __version__},
+            )
+            self.context.log_debug(f"snapshot hit [{url}] version [{spec.ResourceSpecificationVersion}]")
+            return spec
+        except Exception:
+            self.context.log_warning(f"failed to load snapshot for [{url}]")
+            return None
+
+    def __put_snapshot(self, url:str, spec:CfnSpecificationCompact, cache:IFileCache):
+        try:
+            cache.put_bytes(
+                snapshot_key(url),
+                dump_snapshot(
+                    spec,
+                    secret=snapshot_secret(cache.cache_root_dir),
+                    tags={
+                        "cfn_docgen": __version__,
+                        "ResourceSpecificationVersion": spec.ResourceSpecificationVersion,
+                    },
+                ),
+            )
+        except Exception:
+            self.context.log_warning(f"failed to save snapshot for [{url}]")
+
+    def get_resource_spec(self, resource_type: CfnSpecificationResourceTypeName) -> CfnSpecificationCompactResourceType:
         try:
             return self.spec.ResourceTypes[resource_type.fullname]
         except KeyError as ex:
             self.context.log_debug(f"Specification for resource tyoe [{resource_type.fullname}] is not found")
             raise ex
 
-    def get_property_spec(self, property_type: CfnSpecificationPropertyTypeName) -> CfnSpecificationPropertyType:
+    def get_property_spec(self, property_type: CfnSpecificationPropertyTypeName) -> CfnSpecificationCompactPropertyType:
         try:
             return self.spec.PropertyTypes[property_type.fullname]
         except KeyError as ex:
             self.context.log_debug(f"Specification for property tyoe [{property_type.fullname}] is not found")
             raise ex
 
-    def list_properties_for_resource(self, resource_type: CfnSpecificationResourceTypeName) -> Mapping[str, CfnSpecificationPropertyType]:
-        property_specs:Mapping[str, CfnSpecificationPropertyType] = {}
-        for property_type, property_spec in self.spec.PropertyTypes.items():
-            if property_type.startswith(f"{resource_type.fullname}.") or property_type == "Tag":
-                property_specs[property_type] = property_spec
-        return property_specs
+    def list_properties_for_resource(self, resource_type: CfnSpecificationResourceTypeName) -> Mapping[str, CfnSpecificationCompactPropertyType]:
+        property_types = self.property_types_by_resource.get(resource_type.fullname, [])
+        return {
+            property_type: self.spec.PropertyTypes[property_type]
+            for property_type in property_types + self.shared_property_types
+        }
 
 
     def get_specs_for_resource(self, resource_type: CfnSpecificationResourceTypeName) -> CfnSpecificationForResource:
-        resource_spec = self.get_resource_spec(resource_type)
-        property_specs = self.list_properties_for_resource(resource_type)
-        return CfnSpecificationForResource(
-            ResourceSpec=resource_spec,
-            PropertySpecs=property_specs,
-        )
+        # resolve the property types of each resource type once, and share them among all resources of the type
+        specs = self.specs_by_resource.get(resource_type.fullname)
+        if specs is None:
+            resource_spec = self.get_resource_spec(resource_type)
+            property_specs = self.list_properties_for_resource(resource_type)
+            specs = CfnSpecificationForResource.resolve(
+                resource_type=resource_type.fullname,
+                resource_spec=resource_spec,
+                property_specs=property_specs,
+                context=self.context,
+            )
+            self.specs_by_resource[resource_type.fullname] = specs
+        return specs
 
     def is_recursive(self, resource_type: CfnSpecificationResourceTypeName) -> bool:
         if resource_type.fullname in self.recursive_resource_types:
@@ -97,3 +333,157 @@ class CfnSpecificationRepository(ICfnSpecificationRepository):
 
     def list_resource_types(self) -> List[str]:
         return sorted(list(self.spec.ResourceTypes.keys()))
+
+
+class MmapCfnSpecificationRepository(CfnSpecificationRepository):
+    """
+    repository which keeps the specification as an offset-indexed store in the cache and memory-maps it,
+    so that only resource types and property types actually used are read, decoded and validated
+    """
+    # the merged specification would be a whole snapshot in memory, which the store avoids
+    snapshot_merged_specification = False
+
+    def _load_specification(self, url:str, cache:IFileCache) -> CfnSpecificationCompact:
+        spec = self.__open_store(url, cache)
+        if spec is not None:
+            return CfnSpecificationCompact.from_specification(spec)
+
+        body = self._build_specification(url, cache, dump_spec_store)
+        try:
+            cache.put_bytes(spec_store_key(url), body)
+        except Exception:
+            self.context.log_warning(f"failed to save spec store for [{url}]")
+        spec = self.__open_store(url, cache)
+        if spec is not None:
+            return CfnSpecificationCompact.from_specification(spec)
+        # the cache cannot keep the store (e.g. NoFileCache)
+        return CfnSpecificationCompact.from_specification(load_spec_store(body))
+
+    def __open_store(self, url:str, cache:IFileCache) -> Optional[CfnSpecification]:
+        try:
+            store_filepath = cache.get_local_filepath(spec_store_key(url))
+            if store_filepath is not None:
+                spec = open_spec_store(store_filepath)
+            else:
+                # the cache cannot be mapped (e.g. CompressedFileCache), so read the store into memory
+                body = cache.get_bytes(spec_store_key(url))
+                if body is None:
+                    self.context.log_debug(f"spec store not hit [{url}]")
+                    return None
+                spec = load_spec_store(body)
+            self.context.log_debug(f"spec store hit [{url}] version [{spec.ResourceSpecificationVersion}]")
+            return spec
+        except Exception:
+            self.context.log_warning(f"failed to open spec store for [{url}]")
+            return None
+
+
+RepositoryKey = Tuple[str, Optional[str]]
+
+def default_repository_factory(
+    source_url:str,
+    custom_resource_specification_url:Optional[str],
+    context:AppContext,
+) -> ICfnSpecificationRepository:
+    return CfnSpecificationRepository(
+        source_url=source_url,
+        custom_resource_specification_url=custom_resource_specification_url,
+        loader_factory=specification_loader_factory,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+    )
+
+class CfnSpecificationRepositoryRegistry:
+    """
+    thread-safe registry which builds a repository once for each pair of source url and custom resource specification url,
+    and hands out the same instance to every caller until it is invalidated.
+    the shared repository must be treated as read-only, and it logs into the context of the caller which built it.
+    """
+
+    def __init__(
+        self,
+        repository_factory:Callable[[str, Optional[str], AppContext], ICfnSpecificationRepository]=default_repository_factory,
+    ) -> None:
+        self.repository_factory = repository_factory
+        self.repositories:Dict[RepositoryKey, ICfnSpecificationRepository] = {}
+        self.locks:Dict[RepositoryKey, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def get(
+        self,
+        source_url:str,
+        custom_resource_specification_url:Optional[str],
+        context:AppContext,
+    ) -> ICfnSpecificationRepository:
+        key = (source_url, custom_resource_specification_url)
+        with self.lock:
+            repository = self.repositories.get(key, None)
+            if repository is not None:
+                context.log_debug(f"repository for [{key}] is registered")
+                return repository
+            key_lock = self.locks.setdefault(key, threading.Lock())
+
+        # build outside of the registry lock, so that building one repository does not block the others
+        with key_lock:
+            with self.lock:
+                repository = self.repositories.get(key, None)
+            if repository is not None:
+                return repository
+            repository = self.repository_factory(source_url, custom_resource_specification_url, context)
+            with self.lock:
+                # may be invalidated while building, but the built one is still the newest
+                self.repositories[key] = repository
+            context.log_debug(f"repository for [{key}] is built and registered")
+            return repository
+
+    def invalidate(
+        self,
+        source_url:str,
+        custom_resource_specification_url:Optional[str]=None,
+    ) -> None:
+        with self.lock:
+            self.repositories.pop((source_url, custom_resource_specification_url), None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.repositories.clear()
+
+spec_repository_registry = CfnSpecificationRepositoryRegistry()
+
+def prefetch_specifications(
+    source_urls:Iterable[str],
+    cache:IFileCache,
+    context:AppContext,
+    jobs:int=8,
+    cache_ttl:Optional[float]=None,
+) -> Dict[str, bool]:
+    """
+    download, validate and cache specifications of source_urls in parallel threads sharing pooled http connections,
+    so that following runs for any of them start from the cache. returns whether each of them is cached
+    """
+    session = pooled_http_session(jobs)
+    loader_factory = functools.partial(specification_loader_factory, session=session)
+
+    def prefetch(source_url:str) -> bool:
+        try:
+            # the repository is dropped right after it is built, so that at most jobs specifications are in memory
+            CfnSpecificationRepository(
+                source_url=source_url,
+                custom_resource_specification_url=None,
+                loader_factory=loader_factory,
+                cache=cache,
+                recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+                context=context,
+                cache_ttl=cache_ttl,
+            )
+            context.log_debug(f"specification [{source_url}] is prefetched")
+            return True
+        except Exception:
+            context.log_warning(f"failed to prefetch specification [{source_url}]")
+            return False
+
+    # regions may share the same specification
+    unique_source_urls = list(dict.fromkeys(source_urls))
+    with session, ThreadPoolExecutor(max_workers=jobs) as executor:
+        return dict(zip(unique_source_urls, executor.map(prefetch, unique_source_urls)))
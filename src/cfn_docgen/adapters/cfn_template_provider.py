@@ -1,30 +1,97 @@
-from typing import Callable
+import hashlib
+from typing import Callable, Optional
 from cfn_flip import to_json # type: ignore
+from cfn_docgen import __version__
 from cfn_docgen.adapters.internal.file_loader import template_loader_factory
+from cfn_docgen.adapters.internal.snapshot import dump_snapshot, load_snapshot, snapshot_secret, template_snapshot_key
+from cfn_docgen.adapters.internal.yaml_loader import LIBYAML_AVAILABLE, load_yaml_template
 from cfn_docgen.config import AppContext
 from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateSource
+from cfn_docgen.domain.ports.cache import IFileCache
 from cfn_docgen.domain.ports.cfn_template_provider import ICfnTemplateProvider
 from cfn_docgen.domain.ports.internal.file_loader import IFileLoader
 
-def template_provider_factory(template_source:CfnTemplateSource, context:AppContext) -> ICfnTemplateProvider:
+def template_provider_factory(
+    template_source:CfnTemplateSource, context:AppContext, cache:Optional[IFileCache]=None,
+) -> ICfnTemplateProvider:
     context.log_debug(f"type of template source is [{template_source.type}]. return CfnTemplateProvider")
     return CfnTemplateProvider(
         file_loader_factory=template_loader_factory,
         context=context,
+        cache=cache,
     )
 
 class CfnTemplateProvider(ICfnTemplateProvider):
-    def __init__(self, file_loader_factory: Callable[[CfnTemplateSource, AppContext], IFileLoader], context: AppContext) -> None:
+    def __init__(
+        self,
+        file_loader_factory: Callable[[CfnTemplateSource, AppContext], IFileLoader],
+        context: AppContext,
+        cache:Optional[IFileCache]=None,
+    ) -> None:
         super().__init__(file_loader_factory, context)
         self.file_loader_factory = file_loader_factory
+        # validated definitions are cached by the hash of their templates, if given
+        self.cache = cache
 
     def load_template(self, template_source:CfnTemplateSource) -> CfnTemplateDefinition:
         loader = self.file_loader_factory(template_source, self.context)
         template_bytes = loader.download(template_source.source)
-        template_str = template_bytes.decode(encoding="UTF-8")
-        if template_str.startswith("{") and template_str.endswith("}"):
+        if self.cache is None:
+            return self.parse_template(template_source, template_bytes)
+
+        digest = hashlib.sha256(template_bytes).hexdigest()
+        definition = self.__get_snapshot(template_source, digest, self.cache)
+        if definition is not None:
+            return definition
+        definition = self.parse_template(template_source, template_bytes)
+        self.__put_snapshot(template_source, digest, definition, self.cache)
+        return definition
+
+    def parse_template(self, template_source:CfnTemplateSource, template_bytes:bytes) -> CfnTemplateDefinition:
+        if template_bytes.startswith(b"{") and template_bytes.endswith(b"}"):
             self.context.log_debug(f"template source [{template_source.source}] is json format")
-            return CfnTemplateDefinition.from_string(template_str, context=self.context)
+            # parse the bytes as they are, without decoding them first
+            return CfnTemplateDefinition.from_string(template_bytes, context=self.context)
         
+        template_str = template_bytes.decode(encoding="UTF-8")
         self.context.log_debug(f"template source [{template_source.source}] is yaml format")
-        return CfnTemplateDefinition.from_string(to_json(template_str), context=self.context)
\ No newline at end of file
+        if LIBYAML_AVAILABLE:
+            # load the yaml into a dict directly, instead of round-tripping it through a json string
+            try:
+                template = load_yaml_template(template_str)
+            except Exception as ex:
+                self.context.log_error(f"failed to load yaml template [{template_source.source}]. {str(ex)}")
+                raise ex
+            return CfnTemplateDefinition.from_dict(template, context=self.context)
+        self.context.log_debug("LibYAML is not available. convert yaml template with cfn_flip")
+        return CfnTemplateDefinition.from_string(to_json(template_str), context=self.context)
+
+    def __get_snapshot(self, template_source:CfnTemplateSource, digest:str, cache:IFileCache) -> Optional[CfnTemplateDefinition]:
+        try:
+            body = cache.get_bytes(template_snapshot_key(digest))
+            if body is None:
+                self.context.log_debug(f"template snapshot not hit [{template_source.source}]")
+                return None
+            definition = load_snapshot(
+                body, CfnTemplateDefinition,
+                secret=snapshot_secret(cache.cache_root_dir),
+                tags={"cfn_docgen": __version__},
+            )
+            self.context.log_debug(f"template snapshot hit [{template_source.source}]")
+            return definition
+        except Exception:
+            self.context.log_warning(f"failed to load template snapshot for [{template_source.source}]")
+            return None
+
+    def __put_snapshot(self, template_source:CfnTemplateSource, digest:str, definition:CfnTemplateDefinition, cache:IFileCache):
+        try:
+            cache.put_bytes(
+                template_snapshot_key(digest),
+                dump_snapshot(
+                    definition,
+                    secret=snapshot_secret(cache.cache_root_dir),
+                    tags={"cfn_docgen": __version__},
+                ),
+            )
+        except Exception:
+            self.context.log_warning(f"failed to save template snapshot for [{template_source.source}]")
@@ -1,9 +1,68 @@
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+import gzip
 import hashlib
+import json
 import os
+import tempfile
+import time
+from typing import IO, Any, ContextManager, Dict, Iterable, Iterator, List, Literal, Optional, Tuple
 from cfn_docgen.config import AppContext
 from cfn_docgen.domain.ports.cache import IFileCache
 
 HexHashString = str
+CacheCompression = Literal["gzip", "zstd"]
+
+def metadata_key(filepath:str) -> str:
+    """cache key of the metadata (e.g. ETag and Last-Modified) for the cached file"""
+    return f"{filepath}#metadata"
+
+@contextmanager
+def file_lock(path:str) -> Iterator[None]:
+    """exclusive lock on the lock file at path, which is created if not exists. blocks until the lock is acquired"""
+    with open(path, "a+b") as fp:
+        if os.name == "nt":
+            import msvcrt # pylint: disable=import-outside-toplevel
+            fp.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after 10 seconds, so retry until acquired
+                    msvcrt.locking(fp.fileno(), msvcrt.LK_LOCK, 1) # type: ignore
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl # pylint: disable=import-outside-toplevel
+            fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                fp.seek(0)
+                msvcrt.locking(fp.fileno(), msvcrt.LK_UNLCK, 1) # type: ignore
+            else:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+
+@dataclass
+class CacheRunStats:
+    request_id:str
+    started_at:float
+    hits:int = 0
+    misses:int = 0
+
+@dataclass
+class CacheStats:
+    entries:int
+    bytes:int
+    runs:List[CacheRunStats] = field(default_factory=list)
+
+    @property
+    def hits(self) -> int:
+        return sum(r.hits for r in self.runs)
+
+    @property
+    def misses(self) -> int:
+        return sum(r.misses for r in self.runs)
 
 class NoFileCache(IFileCache):
 
@@ -16,31 +75,343 @@ class NoFileCache(IFileCache):
     def put(self, filepath: str, body: str):
         pass
 
+    def get_bytes(self, filepath: str) -> bytes | None:
+        return None
+
+    def put_bytes(self, filepath: str, body: bytes):
+        pass
+
+    def put_stream(self, filepath: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        yield from chunks
+
+    def lock(self, filepath: str) -> ContextManager[None]:
+        return nullcontext()
+
+    def delete(self, filepath: str):
+        pass
+
+    def get_local_filepath(self, filepath: str) -> str | None:
+        return None
+
 class LocalFileCache(IFileCache):
+    """
+    cache which stores each file in the cache root directory.
+    if max_size (bytes) is set, least recently used files are evicted after each put so that the directory stays within it.
+    hits and misses are recorded per run (request_id of the context) in the stats file of the directory.
+    """
 
-    def __init__(self, cache_root_dir: str, context: AppContext) -> None:
+    stats_filename = ".stats.json"
+    max_runs_in_stats = 100
+
+    def __init__(self, cache_root_dir: str, context: AppContext, max_size:Optional[int]=None) -> None:
         super().__init__(cache_root_dir, context)
         os.makedirs(self.cache_root_dir, exist_ok=True)
         context.log_debug(f"create directory for cache at [{self.cache_root_dir}]")
 
         self.encoding = "UTF-8"
+        self.max_size = max_size
+        self.started_at = time.time()
 
     def hash(self, string:str) -> HexHashString:
         h = hashlib.md5(string.encode())
         return h.hexdigest()
     
     def put(self, filepath: str, body: str):
-        filepath_hash = self.hash(filepath)
-        cache_filepath = os.path.join(self.cache_root_dir, filepath_hash)
-        with open(cache_filepath, "w", encoding=self.encoding) as fp:
-            fp.write(body)
+        self.put_bytes(filepath, body.encode(self.encoding))
 
     def get(self, filepath: str) -> str | None:
-        filepath_hash = self.hash(filepath)
-        cache_filepath = os.path.join(self.cache_root_dir, filepath_hash)
-        if os.path.isfile(cache_filepath):
-            self.context.log_debug(f"cache [{cache_filepath}] hit")
-            with open(cache_filepath, "r", encoding=self.encoding) as fp:
+        body = self.get_bytes(filepath)
+        if body is None:
+            return None
+        return body.decode(self.encoding)
+
+    def cache_filepath(self, filepath:str) -> str:
+        return os.path.join(self.cache_root_dir, self.hash(filepath))
+
+    def put_bytes(self, filepath: str, body: bytes):
+        for _ in self.put_stream(filepath, [body]):
+            pass
+
+    def get_bytes(self, filepath: str) -> bytes | None:
+        cache_filepath = self.cache_filepath(filepath)
+        try:
+            with open(cache_filepath, "rb") as fp:
                 body = fp.read()
-            return body
-        return None
\ No newline at end of file
+        except FileNotFoundError:
+            self.record_access(cache_filepath, hit=False)
+            return None
+        self.context.log_debug(f"cache [{cache_filepath}] hit")
+        self.record_access(cache_filepath, hit=True)
+        return body
+
+    def open_writer(self, path:str) -> IO[bytes]:
+        return open(path, "wb")
+
+    def put_stream(self, filepath: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        cache_filepath = self.cache_filepath(filepath)
+        # write into a temporary file and rename it, so that readers in other threads or processes
+        # never see a partially written cache, and a partially consumed stream never leaves a broken one
+        fd, temp_filepath = tempfile.mkstemp(
+            dir=self.cache_root_dir, prefix=f"{os.path.basename(cache_filepath)}.", suffix=".tmp",
+        )
+        os.close(fd)
+        try:
+            with self.open_writer(temp_filepath) as fp:
+                for chunk in chunks:
+                    fp.write(chunk)
+                    yield chunk
+            os.replace(temp_filepath, cache_filepath)
+        finally:
+            if os.path.isfile(temp_filepath):
+                os.remove(temp_filepath)
+        if self.max_size is not None:
+            self.prune(self.max_size)
+
+    def lock(self, filepath: str) -> ContextManager[None]:
+        return file_lock(os.path.join(self.cache_root_dir, f"{self.hash(filepath)}.lock"))
+
+    def delete(self, filepath: str):
+        cache_filepath = self.cache_filepath(filepath)
+        try:
+            os.remove(cache_filepath)
+            self.context.log_debug(f"cache [{cache_filepath}] deleted")
+        except FileNotFoundError:
+            pass
+
+    def get_local_filepath(self, filepath: str) -> str | None:
+        cache_filepath = self.cache_filepath(filepath)
+        if os.path.isfile(cache_filepath):
+            self.record_access(cache_filepath, hit=True)
+            return cache_filepath
+        self.record_access(cache_filepath, hit=False)
+        return None
+
+    def is_entry(self, filename:str) -> bool:
+        # lock files, temporary files while writing, and files of the cache itself (e.g. stats) are not entries
+        return not filename.startswith(".") and not filename.endswith((".lock", ".tmp"))
+
+    def list_entries(self) -> List[Tuple[str, os.stat_result]]:
+        """cached files with their stat, least recently used first"""
+        entries:List[Tuple[str, os.stat_result]] = []
+        for filename in os.listdir(self.cache_root_dir):
+            if not self.is_entry(filename):
+                continue
+            path = os.path.join(self.cache_root_dir, filename)
+            try:
+                entries.append((path, os.stat(path)))
+            except FileNotFoundError:
+                # evicted by other process
+                continue
+        return sorted(entries, key=lambda e: e[1].st_atime)
+
+    def record_access(self, cache_filepath:str, hit:bool):
+        if hit:
+            # atime is not updated on read with noatime or relatime mounts, so set it explicitly for LRU eviction
+            try:
+                os.utime(cache_filepath, (time.time(), os.stat(cache_filepath).st_mtime))
+            except FileNotFoundError:
+                pass
+        try:
+            with self.update_stats() as runs:
+                run = runs.setdefault(self.context.request_id, {
+                    "request_id": self.context.request_id, "started_at": self.started_at, "hits": 0, "misses": 0,
+                })
+                run["hits" if hit else "misses"] += 1
+        except Exception:
+            # stats are informational, so failing to record them never fails the cache
+            self.context.log_warning(f"failed to record cache stats at [{self.cache_root_dir}]")
+
+    @contextmanager
+    def update_stats(self) -> Iterator[Dict[str, Dict[str, Any]]]:
+        stats_filepath = os.path.join(self.cache_root_dir, self.stats_filename)
+        with file_lock(stats_filepath + ".lock"):
+            runs = {r["request_id"]: r for r in self.read_stats()}
+            yield runs
+            recent_runs = sorted(runs.values(), key=lambda r: r["started_at"])[-self.max_runs_in_stats:]
+            fd, temp_filepath = tempfile.mkstemp(dir=self.cache_root_dir, prefix=f"{self.stats_filename}.", suffix=".tmp")
+            with os.fdopen(fd, "w") as fp:
+                json.dump({"Runs": recent_runs}, fp)
+            os.replace(temp_filepath, stats_filepath)
+
+    def read_stats(self) -> List[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.cache_root_dir, self.stats_filename), "r") as fp:
+                return json.load(fp)["Runs"]
+        except FileNotFoundError:
+            return []
+
+    def stats(self) -> CacheStats:
+        entries = self.list_entries()
+        return CacheStats(
+            entries=len(entries),
+            bytes=sum(stat.st_size for _, stat in entries),
+            runs=[CacheRunStats(**r) for r in self.read_stats()],
+        )
+
+    def prune(self, max_size:int) -> List[str]:
+        """evict least recently used files until the total size is within max_size. returns evicted files"""
+        entries = self.list_entries()
+        total_size = sum(stat.st_size for _, stat in entries)
+        evicted:List[str] = []
+        for path, stat in entries:
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path)
+                self.context.log_debug(f"cache [{path}] evicted")
+            except FileNotFoundError:
+                pass
+            total_size -= stat.st_size
+            evicted.append(path)
+        return evicted
+
+    def clear(self) -> List[str]:
+        """delete all cached files and stats. lock files are kept, since other processes may hold them"""
+        removed:List[str] = []
+        for filename in os.listdir(self.cache_root_dir):
+            if filename.endswith(".lock"):
+                continue
+            path = os.path.join(self.cache_root_dir, filename)
+            try:
+                os.remove(path)
+                removed.append(path)
+            except FileNotFoundError:
+                pass
+        self.context.log_debug(f"cache at [{self.cache_root_dir}] cleared")
+        return removed
+
+class CompressedFileCache(LocalFileCache):
+    """LocalFileCache which compresses each cached file with gzip or zstd (requires zstandard package)"""
+
+    extensions = {"gzip": ".gz", "zstd": ".zst"}
+
+    def __init__(
+        self, cache_root_dir: str, context: AppContext, compression:CacheCompression="gzip", max_size:Optional[int]=None,
+    ) -> None:
+        super().__init__(cache_root_dir, context, max_size)
+        if compression not in self.extensions:
+            raise ValueError(f"compression [{compression}] is not supported")
+        if compression == "zstd":
+            # fail fast if optional dependency is missing
+            import zstandard # pylint: disable=import-outside-toplevel,unused-import
+        self.compression = compression
+
+    def cache_filepath(self, filepath: str) -> str:
+        return super().cache_filepath(filepath) + self.extensions[self.compression]
+
+    def open_writer(self, path: str) -> IO[bytes]:
+        if self.compression == "zstd":
+            import zstandard # pylint: disable=import-outside-toplevel
+            return zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True) # type: ignore
+        return gzip.GzipFile(path, mode="wb", compresslevel=6, mtime=0) # type: ignore
+
+    def get_bytes(self, filepath: str) -> bytes | None:
+        cache_filepath = self.cache_filepath(filepath)
+        try:
+            fp = open(cache_filepath, "rb")
+        except FileNotFoundError:
+            self.record_access(cache_filepath, hit=False)
+            return None
+        self.context.log_debug(f"cache [{cache_filepath}] hit")
+        self.record_access(cache_filepath, hit=True)
+        # decompress while reading, without holding the compressed file in memory
+        with fp:
+            if self.compression == "zstd":
+                import zstandard # pylint: disable=import-outside-toplevel
+                with zstandard.ZstdDecompressor().stream_reader(fp) as reader:
+                    return reader.read()
+            with gzip.GzipFile(fileobj=fp, mode="rb") as gz:
+                return gz.read()
+
+    def get_local_filepath(self, filepath: str) -> str | None:
+        # cached files are compressed, so they cannot be read directly
+        return None
+
+class ContentAddressedFileCache(IFileCache):
+    """
+    cache which stores each distinct body once, keyed by its sha256, in the underlying cache.
+    each filepath only points to the hash of its body, so identical files (e.g. specifications of several regions) share the storage.
+    """
+
+    def __init__(self, cache:IFileCache, context:AppContext) -> None:
+        super().__init__(cache.cache_root_dir, context)
+        self.cache = cache
+        self.encoding = "UTF-8"
+
+    def content_key(self, digest:str) -> str:
+        return f"sha256:{digest}"
+
+    def pointer_key(self, filepath:str) -> str:
+        return f"{filepath}#content"
+
+    def get_digest(self, filepath:str) -> str | None:
+        return self.cache.get(self.pointer_key(filepath))
+
+    def put(self, filepath: str, body: str):
+        self.put_bytes(filepath, body.encode(self.encoding))
+
+    def get(self, filepath: str) -> str | None:
+        body = self.get_bytes(filepath)
+        if body is None:
+            return None
+        return body.decode(self.encoding)
+
+    def put_bytes(self, filepath: str, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        if self.cache.get_local_filepath(self.content_key(digest)) is None:
+            self.cache.put_bytes(self.content_key(digest), body)
+        else:
+            self.context.log_debug(f"content [{digest}] for [{filepath}] is already cached")
+        self.cache.put(self.pointer_key(filepath), digest)
+
+    def get_bytes(self, filepath: str) -> bytes | None:
+        digest = self.get_digest(filepath)
+        if digest is None:
+            return None
+        return self.cache.get_bytes(self.content_key(digest))
+
+    def put_stream(self, filepath: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        # the key of the content is known only after all chunks are read, so they are buffered
+        body = bytearray()
+        for chunk in chunks:
+            body += chunk
+            yield chunk
+        self.put_bytes(filepath, bytes(body))
+
+    def lock(self, filepath: str) -> ContextManager[None]:
+        return self.cache.lock(filepath)
+
+    def delete(self, filepath: str):
+        # the content may be shared with other filepaths, so just drop the pointer
+        self.cache.delete(self.pointer_key(filepath))
+
+    def get_local_filepath(self, filepath: str) -> str | None:
+        digest = self.get_digest(filepath)
+        if digest is None:
+            return None
+        return self.cache.get_local_filepath(self.content_key(digest))
+
+def file_cache_factory(
+    cache_root_dir:str,
+    compression:Optional[CacheCompression],
+    context:AppContext,
+    content_addressed:bool=False,
+    max_size:Optional[int]=None,
+) -> IFileCache:
+    cache = _file_cache_backend(cache_root_dir, compression, context, max_size)
+    if content_addressed:
+        context.log_debug("cache is content addressed. return ContentAddressedFileCache")
+        return ContentAddressedFileCache(cache, context)
+    return cache
+
+def _file_cache_backend(
+    cache_root_dir:str,
+    compression:Optional[CacheCompression],
+    context:AppContext,
+    max_size:Optional[int]=None,
+) -> IFileCache:
+    if compression is None:
+        context.log_debug("cache compression is not set. return LocalFileCache")
+        return LocalFileCache(cache_root_dir, context, max_size)
+    context.log_debug(f"cache compression is [{compression}]. return CompressedFileCache")
+    return CompressedFileCache(cache_root_dir, context, compression, max_size)
@@ -1,13 +1,18 @@
+from email.utils import formatdate
 import glob
 import os
-from typing import List, Optional
+from typing import Any, Iterator, List, Optional, Tuple
 from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
 import boto3
+from botocore.exceptions import ClientError
 from cfn_docgen.config import AppContext
 from cfn_docgen.domain.model.cfn_document_generator import CfnDocumentDestination
 from cfn_docgen.domain.model.cfn_template import CfnTemplateSource # type: ignore
-from cfn_docgen.domain.ports.internal.file_loader import IFileLoader
+from cfn_docgen.domain.ports.internal.file_loader import FileValidators, IFileLoader
+
+CHUNK_SIZE = 64 * 1024
 
 def document_loader_factory(
     document_dest:CfnDocumentDestination,
@@ -46,11 +51,12 @@ def template_loader_factory(
 
 def specification_loader_factory(
     specification_url:str,
-    context:AppContext
+    context:AppContext,
+    session:Optional[requests.Session]=None,
 ) -> IFileLoader:
     if specification_url.startswith("https://") or specification_url.startswith("http://"):
         context.log_debug("resource specification type is [http]. return RemoteFileLoader")
-        return RemoteFileLoader(context)
+        return RemoteFileLoader(context, session)
     if specification_url.startswith("s3://"):
         context.log_debug("resource specification type is [s3]. return S3FileLoader")
         return S3FileLoader(context)
@@ -67,6 +73,22 @@ class LocalFileLoader(IFileLoader):
             raw = fp.read()
         self.context.log_debug(f"download from [{source}]")
         return raw
+
+    def download_if_modified(self, source: str, validators: FileValidators) -> Tuple[Optional[bytes], FileValidators]:
+        last_modified = formatdate(os.path.getmtime(source), usegmt=True)
+        if validators.last_modified == last_modified:
+            self.context.log_debug(f"[{source}] is not modified since [{last_modified}]")
+            return None, validators
+        return self.download(source), FileValidators(last_modified=last_modified)
+
+    def download_stream(self, source: str) -> Tuple[Iterator[bytes], FileValidators]:
+        last_modified = formatdate(os.path.getmtime(source), usegmt=True)
+        def chunks() -> Iterator[bytes]:
+            with open(source, "rb") as fp:
+                while chunk := fp.read(CHUNK_SIZE):
+                    yield chunk
+            self.context.log_debug(f"download from [{source}]")
+        return chunks(), FileValidators(last_modified=last_modified)
     
     def upload(self, body: bytes, dest: str) -> None:
         # meke suer directory is exist
@@ -84,16 +106,60 @@ class LocalFileLoader(IFileLoader):
             self.context.log_debug(f"[{source}] is a directory. listed files are [{'.'.join(files_and_dir)}]")
             return sorted([f for f in files_and_dir if os.path.isfile(f)])
 
+def pooled_http_session(pool_size:int) -> requests.Session:
+    """session which keeps up to pool_size connections alive for each host, to be shared by threads downloading in parallel"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 class RemoteFileLoader(IFileLoader):
 
-    def __init__(self, context: AppContext) -> None:
+    def __init__(self, context: AppContext, session:Optional[requests.Session]=None) -> None:
         super().__init__(context)
+        # without session, each request opens its own connection
+        self.session = session
+
+    def get(self, source:str, **kwargs:Any) -> requests.Response:
+        if self.session is None:
+            return requests.get(source, **kwargs)
+        return self.session.get(source, **kwargs)
 
     def download(self, source: str) -> bytes:
-        res = requests.get(source, timeout=10)
+        res = self.get(source, timeout=10)
         self.context.log_debug(f"download from [{source}]")
         return res.content
 
+    def download_if_modified(self, source: str, validators: FileValidators) -> Tuple[Optional[bytes], FileValidators]:
+        headers = {}
+        if validators.etag is not None:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified is not None:
+            headers["If-Modified-Since"] = validators.last_modified
+        res = self.get(source, headers=headers, timeout=10)
+        if res.status_code == 304:
+            self.context.log_debug(f"[{source}] is not modified")
+            return None, validators
+        res.raise_for_status()
+        self.context.log_debug(f"download from [{source}]")
+        return res.content, FileValidators(
+            etag=res.headers.get("ETag", None),
+            last_modified=res.headers.get("Last-Modified", None),
+        )
+
+    def download_stream(self, source: str) -> Tuple[Iterator[bytes], FileValidators]:
+        res = self.get(source, stream=True, timeout=10)
+        res.raise_for_status()
+        def chunks() -> Iterator[bytes]:
+            with res:
+                yield from res.iter_content(chunk_size=CHUNK_SIZE)
+            self.context.log_debug(f"download from [{source}]")
+        return chunks(), FileValidators(
+            etag=res.headers.get("ETag", None),
+            last_modified=res.headers.get("Last-Modified", None),
+        )
+
     def upload(self, body: bytes, dest: str) -> None:
         raise NotImplementedError
     
@@ -123,6 +189,43 @@ class S3FileLoader(IFileLoader):
         )
         self.context.log_debug(f"download from [{source}]")
         return res["Body"].read()
+
+    def download_if_modified(self, source: str, validators: FileValidators) -> Tuple[Optional[bytes], FileValidators]:
+        s3_url = urlparse(source)
+        bucket = s3_url.netloc
+        key = s3_url.path
+        if key.startswith("/"):
+            key = key[1:]
+        try:
+            if validators.etag is not None:
+                res = self.client.get_object(Bucket=bucket, Key=key, IfNoneMatch=validators.etag)
+            else:
+                res = self.client.get_object(Bucket=bucket, Key=key)
+        except ClientError as ex:
+            if ex.response.get("Error", {}).get("Code") == "304":
+                self.context.log_debug(f"[{source}] is not modified")
+                return None, validators
+            raise ex
+        self.context.log_debug(f"download from [{source}]")
+        return res["Body"].read(), FileValidators(
+            etag=res["ETag"],
+            last_modified=formatdate(res["LastModified"].timestamp(), usegmt=True),
+        )
+
+    def download_stream(self, source: str) -> Tuple[Iterator[bytes], FileValidators]:
+        s3_url = urlparse(source)
+        bucket = s3_url.netloc
+        key = s3_url.path
+        if key.startswith("/"):
+            key = key[1:]
+        res = self.client.get_object(Bucket=bucket, Key=key)
+        def chunks() -> Iterator[bytes]:
+            yield from res["Body"].iter_chunks(chunk_size=CHUNK_SIZE)
+            self.context.log_debug(f"download from [{source}]")
+        return chunks(), FileValidators(
+            etag=res["ETag"],
+            last_modified=formatdate(res["LastModified"].timestamp(), usegmt=True),
+        )
     
     def upload(self, body: bytes, dest: str) -> None:
         s3_url = urlparse(dest)
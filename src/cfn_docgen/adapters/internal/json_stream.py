@@ -0,0 +1,117 @@
+import codecs
+import json
+from json.decoder import scanstring # type: ignore
+from typing import Any, Iterable, Iterator, Optional, Set, Tuple
+
+WHITESPACES = " \t\n\r"
+
+# (top level key, second level key or None, value)
+JsonEntry = Tuple[str, Optional[str], Any]
+
+class _JsonStreamReader:
+    """buffer of decoded text which pulls chunks from the stream only when it needs more"""
+
+    def __init__(self, chunks:Iterable[bytes], encoding:str) -> None:
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.raw_decoder = json.JSONDecoder()
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        # drop consumed text, so that the buffer stays as small as one entry
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.buffer += self.decoder.decode(b"", final=True)
+            self.eof = True
+        else:
+            self.buffer += self.decoder.decode(chunk)
+        return True
+
+    def fill_more(self):
+        # at least double the unconsumed text before decoding it again,
+        # so that a value spanning many chunks is not re-decoded once per chunk
+        target = 2 * (len(self.buffer) - self.pos)
+        while self.fill() and len(self.buffer) - self.pos < target:
+            pass
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACES:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("unexpected end of json stream")
+
+    def expect(self, char:str):
+        if self.peek() != char:
+            raise ValueError(f"expected [{char}] at [{self.buffer[self.pos:self.pos+32]}]")
+        self.pos += 1
+
+    def read_string(self) -> str:
+        self.expect('"')
+        while True:
+            try:
+                value, end = scanstring(self.buffer, self.pos)
+                self.pos = end
+                return value
+            except ValueError:
+                # the string may continue in the next chunk
+                if self.eof:
+                    raise
+                self.fill_more()
+
+    def read_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.raw_decoder.raw_decode(self.buffer, self.pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill_more()
+
+def iter_json_entries(
+    chunks:Iterable[bytes],
+    nested_keys:Set[str],
+    encoding:str="UTF-8",
+) -> Iterator[JsonEntry]:
+    """
+    parse a json object from the stream of chunks incrementally.
+    each value of the top level keys in nested_keys (which must be objects) is yielded entry by entry as (key, entry_key, entry_value),
+    and the other top level values are yielded as a whole as (key, None, value).
+    """
+    reader = _JsonStreamReader(chunks, encoding)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.read_string()
+        reader.expect(":")
+        if key in nested_keys:
+            reader.expect("{")
+            if reader.peek() != "}":
+                while True:
+                    entry_key = reader.read_string()
+                    reader.expect(":")
+                    yield key, entry_key, reader.read_value()
+                    if reader.peek() != ",":
+                        break
+                    reader.expect(",")
+            reader.expect("}")
+        else:
+            yield key, None, reader.read_value()
+        if reader.peek() != ",":
+            break
+        reader.expect(",")
+    reader.expect("}")
@@ -0,0 +1,129 @@
+import gc
+import hashlib
+import hmac
+import io
+import json
+import os
+import pickle
+import secrets
+import stat
+from typing import Any, Mapping, Optional, Set, Type, TypeVar
+from pydantic import BaseModel
+
+SNAPSHOT_FORMAT_VERSION = "1"
+SNAPSHOT_MAGIC = b"CFN-DOCGEN-SNAPSHOT"
+SNAPSHOT_KEY_FILENAME = ".snapshot-key"
+
+ModelType = TypeVar("ModelType")
+
+def snapshot_key(url:str) -> str:
+    """cache key of the snapshot for the url. each url has exactly one snapshot, so a new one overwrites the old one"""
+    return f"{url}#snapshot"
+
+def merged_snapshot_key(source_url:str, custom_url:str) -> str:
+    """cache key of the snapshot for the specification of source_url merged with the custom one of custom_url"""
+    return f"{source_url}#merged#{custom_url}"
+
+def template_snapshot_key(digest:str) -> str:
+    """cache key of the snapshot for the template whose sha256 is digest, so that unchanged templates share it"""
+    return f"template#{digest}"
+
+class SnapshotMismatchError(ValueError):
+    """snapshot is valid, but built from other inputs than the expected ones"""
+
+def _restore_model(
+    cls:Type[BaseModel],
+    fields:Mapping[str, Any],
+    fields_set:Set[str],
+    extra:Optional[Mapping[str, Any]],
+    private:Optional[Mapping[str, Any]],
+) -> BaseModel:
+    # rebuild the instance as-is, without running pydantic validation again
+    model = cls.__new__(cls)
+    object.__setattr__(model, "__dict__", fields)
+    object.__setattr__(model, "__pydantic_fields_set__", fields_set)
+    object.__setattr__(model, "__pydantic_extra__", extra)
+    object.__setattr__(model, "__pydantic_private__", private)
+    return model
+
+class _SnapshotPickler(pickle.Pickler):
+
+    def reducer_override(self, obj:Any) -> Any:
+        if isinstance(obj, BaseModel):
+            return _restore_model, (
+                type(obj),
+                obj.__dict__,
+                obj.__pydantic_fields_set__,
+                obj.__pydantic_extra__,
+                obj.__pydantic_private__,
+            )
+        return NotImplemented
+
+def _is_private(path:str) -> bool:
+    if not hasattr(os, "getuid"):
+        # ownership and permission bits are not meaningful (e.g. on windows)
+        return True
+    st = os.stat(path)
+    return st.st_uid == os.getuid() and (st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)) == 0
+
+def snapshot_secret(cache_root_dir:str) -> bytes:
+    """
+    return the secret key to sign snapshots in the cache directory, creating it at the first call.
+    snapshots are pickles, so they are used only when both the cache directory and the key are private to the current user.
+    """
+    if not _is_private(cache_root_dir):
+        raise PermissionError(f"cache directory [{cache_root_dir}] must be owned by the current user and not be writable by others")
+    key_path = os.path.join(cache_root_dir, SNAPSHOT_KEY_FILENAME)
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(secrets.token_bytes(32))
+    except FileExistsError:
+        pass
+    if not _is_private(key_path):
+        raise PermissionError(f"snapshot key [{key_path}] must be owned by the current user and not be writable by others")
+    with open(key_path, "rb") as fp:
+        return fp.read()
+
+def _sign(secret:bytes, header:bytes, payload:bytes) -> bytes:
+    return hmac.new(secret, header + b"\n" + payload, hashlib.sha256).hexdigest().encode()
+
+def dump_snapshot(model:Any, secret:bytes, tags:Mapping[str, str]) -> bytes:
+    """
+    serialize an already validated model (pydantic model, or any picklable object) into signed snapshot bytes.
+    tags are stored in the header and must match at load time (e.g. versions the snapshot was built from)
+    """
+    buffer = io.BytesIO()
+    _SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(model)
+    payload = buffer.getvalue()
+    header = json.dumps(
+        {"format": SNAPSHOT_FORMAT_VERSION, "tags": dict(tags)}, sort_keys=True,
+    ).encode()
+    return b"\n".join([SNAPSHOT_MAGIC, header, _sign(secret, header, payload), payload])
+
+def load_snapshot(body:bytes, model_type:Type[ModelType], secret:bytes, tags:Mapping[str, str]) -> ModelType:
+    """deserialize snapshot bytes created by dump_snapshot, after verifying its signature and that it has all of the tags"""
+    magic, header, signature, payload = body.split(b"\n", 3)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("not a cfn-docgen snapshot")
+    if not hmac.compare_digest(signature, _sign(secret, header, payload)):
+        raise ValueError("signature of snapshot is invalid")
+    loaded_header = json.loads(header)
+    if loaded_header["format"] != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"snapshot format [{loaded_header['format']}] is not supported")
+    for key, value in tags.items():
+        if loaded_header["tags"].get(key) != value:
+            raise SnapshotMismatchError(f"snapshot is built for {key} [{loaded_header['tags'].get(key)}], not for [{value}]")
+
+    # loading creates tens of thousands of containers at once,
+    # so pause cyclic gc which otherwise dominates the load time
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        model = pickle.loads(payload)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    if not isinstance(model, model_type):
+        raise TypeError(f"snapshot is not an instance of [{model_type.__name__}]")
+    return model
@@ -0,0 +1,76 @@
+import json
+import mmap
+from typing import Any, Dict, List, Mapping, Type, Union
+from cfn_docgen import json_backend
+from cfn_docgen.domain.model.cfn_specification import (
+    CfnSpecification, CfnSpecificationLazyMapping, CfnSpecificationPropertyType, CfnSpecificationResourceType, SpecType,
+)
+
+SPEC_STORE_FORMAT_VERSION = "1"
+SPEC_STORE_MAGIC = b"CFN-DOCGEN-SPEC-STORE"
+
+Buffer = Union[bytes, mmap.mmap]
+
+def spec_store_key(url:str) -> str:
+    """cache key of the spec store for the url"""
+    return f"{url}#store"
+
+class SpecStoreMapping(CfnSpecificationLazyMapping[SpecType]):
+    """mapping which decodes and validates each entry from its byte range of the store at the first access"""
+
+    def __init__(self, spec_type:Type[SpecType], buffer:Buffer, body_offset:int, ranges:Dict[str, Any]) -> None:
+        super().__init__(spec_type, ranges)
+        self.buffer = buffer
+        self.body_offset = body_offset
+
+    def validate(self, entry:Any) -> SpecType:
+        offset, length = entry
+        start = self.body_offset + offset
+        return self.spec_type(**json_backend.loads(self.buffer[start:start+length]))
+
+def dump_spec_store(data:Mapping[str, Any]) -> bytes:
+    """
+    serialize parsed specification json into the store format:
+    magic, header json with byte range of each resource type and property type, then the entries themselves
+    """
+    chunks:List[bytes] = []
+    offset = 0
+    ranges:Dict[str, Dict[str, List[int]]] = {}
+    for kind in ["ResourceTypes", "PropertyTypes"]:
+        ranges[kind] = {}
+        for name, entry in data[kind].items():
+            chunk = json.dumps(entry, separators=(",", ":")).encode()
+            ranges[kind][name] = [offset, len(chunk)]
+            chunks.append(chunk)
+            offset += len(chunk)
+    header = json.dumps({
+        "format": SPEC_STORE_FORMAT_VERSION,
+        "ResourceSpecificationVersion": data["ResourceSpecificationVersion"],
+        **ranges,
+    }, separators=(",", ":")).encode()
+    return b"\n".join([SPEC_STORE_MAGIC, header, b"".join(chunks)])
+
+def load_spec_store(buffer:Buffer) -> CfnSpecification:
+    """open the store in the buffer (bytes or mmap) as a specification, without decoding any entry"""
+    magic_end = len(SPEC_STORE_MAGIC)
+    if buffer[:magic_end] != SPEC_STORE_MAGIC:
+        raise ValueError("not a cfn-docgen spec store")
+    header_end = buffer.find(b"\n", magic_end + 1)
+    if header_end < 0:
+        raise ValueError("header of spec store is broken")
+    header = json.loads(buffer[magic_end+1:header_end])
+    if header["format"] != SPEC_STORE_FORMAT_VERSION:
+        raise ValueError(f"spec store format [{header['format']}] is not supported")
+
+    body_offset = header_end + 1
+    return CfnSpecification.model_construct(
+        ResourceSpecificationVersion=header["ResourceSpecificationVersion"],
+        ResourceTypes=SpecStoreMapping(CfnSpecificationResourceType, buffer, body_offset, header["ResourceTypes"]),
+        PropertyTypes=SpecStoreMapping(CfnSpecificationPropertyType, buffer, body_offset, header["PropertyTypes"]),
+    )
+
+def open_spec_store(path:str) -> CfnSpecification:
+    """memory-map the store file, so that only pages of the entries actually used are read"""
+    with open(path, "rb") as fp:
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    return load_spec_store(buffer)
@@ -1,9 +1,13 @@
 
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
 import logging
+import multiprocessing
 import os
 
 import pytest
-from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.cache import CacheCompression, CompressedFileCache, ContentAddressedFileCache, LocalFileCache, file_cache_factory
 
 from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
 
@@ -39,3 +43,213 @@ def test_LocalFileCache_get(context:AppContext):
     assert cache.get("not-exist") is None
 
 
+def test_LocalFileCache_put_bytes(context:AppContext):
+    path1 = "/foo/bar.snapshot"
+    body1 = b"\x80\x05foobar"
+    cache = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context)
+
+    cache.put_bytes(path1, body1)
+    cache_filepath = os.path.join(
+        cache.cache_root_dir, cache.hash(path1)
+    )
+    assert os.path.isfile(cache_filepath), f"{cache_filepath} does not exists"
+    with open(cache_filepath, "rb") as fp:
+        assert body1 == fp.read()
+
+def test_LocalFileCache_get_bytes(context:AppContext):
+    path1 = "/foo/bar.snapshot"
+    body1 = b"\x80\x05foobar"
+    cache = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context)
+
+    cache.put_bytes(path1, body1)
+
+    assert body1 == cache.get_bytes(path1)
+    assert cache.get_bytes("not-exist") is None
+
+def test_LocalFileCache_get_local_filepath(context:AppContext):
+    path1 = "/foo/bar.store"
+    body1 = b"foobar"
+    cache = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context)
+
+    cache.put_bytes(path1, body1)
+    local_filepath = cache.get_local_filepath(path1)
+    assert local_filepath is not None
+    with open(local_filepath, "rb") as fp:
+        assert body1 == fp.read()
+    assert cache.get_local_filepath("not-exist") is None
+
+def test_LocalFileCache_delete(context:AppContext):
+    path1 = "/foo/bar.json"
+    cache = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context)
+
+    cache.put(path1, "foobar")
+    cache.delete(path1)
+    assert cache.get(path1) is None
+    # deleting not existing entry is no-op
+    cache.delete(path1)
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_CompressedFileCache(compression:CacheCompression, context:AppContext, tmp_path:str):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    path1 = "/foo/bar.json"
+    body1 = "foobar" * 1000
+    cache = CompressedFileCache(str(tmp_path), context=context, compression=compression)
+
+    cache.put(path1, body1)
+    cache_filepath = cache.cache_filepath(path1)
+    assert cache_filepath.endswith(CompressedFileCache.extensions[compression])
+    assert os.path.getsize(cache_filepath) < len(body1)
+    assert cache.get(path1) == body1
+    assert cache.get_local_filepath(path1) is None
+
+    cache.delete(path1)
+    assert cache.get(path1) is None
+    assert not os.path.isfile(cache_filepath)
+
+@pytest.mark.parametrize("compression,expected", [
+    (None, LocalFileCache), ("gzip", CompressedFileCache),
+])
+def test_file_cache_factory(compression:CacheCompression | None, expected:type, context:AppContext):
+    cache = file_cache_factory(AppConfig.CACHE_ROOT_DIR, compression, context)
+    assert type(cache) == expected
+
+def test_ContentAddressedFileCache(context:AppContext, tmp_path:str):
+    path1 = "https://example.com/us-east-1.json"
+    path2 = "https://example.com/us-west-2.json"
+    body = b"foobar"
+    backend = LocalFileCache(str(tmp_path), context=context)
+    cache = ContentAddressedFileCache(backend, context=context)
+
+    cache.put_bytes(path1, body)
+    cache.put_bytes(path2, body)
+    assert cache.get_bytes(path1) == body
+    assert cache.get_bytes(path2) == body
+    # identical bodies are stored once
+    assert cache.get_local_filepath(path1) == cache.get_local_filepath(path2)
+    assert cache.get_digest(path1) == hashlib.sha256(body).hexdigest()
+    assert len([f for f in os.listdir(tmp_path) if os.path.getsize(os.path.join(tmp_path, f)) == len(body)]) == 1
+
+    cache.put(path2, "updated")
+    assert cache.get(path2) == "updated"
+    assert cache.get_bytes(path1) == body
+
+    cache.delete(path1)
+    assert cache.get_bytes(path1) is None
+    assert cache.get_local_filepath(path1) is None
+    assert cache.get(path2) == "updated"
+    assert cache.get("not-exist") is None
+
+def test_file_cache_factory_content_addressed(context:AppContext):
+    cache = file_cache_factory(AppConfig.CACHE_ROOT_DIR, "gzip", context, content_addressed=True)
+    assert isinstance(cache, ContentAddressedFileCache)
+    assert isinstance(cache.cache, CompressedFileCache)
+
+@pytest.mark.parametrize("cache_type", [LocalFileCache, CompressedFileCache])
+def test_LocalFileCache_put_stream(cache_type:type, context:AppContext, tmp_path:str):
+    path1 = "/foo/bar.json"
+    chunks = [b"foo", b"bar", b"baz"]
+    cache = cache_type(str(tmp_path), context=context)
+
+    # chunks pass through, and the entry is written only after all of them are consumed
+    stream = cache.put_stream(path1, chunks)
+    assert next(stream) == b"foo"
+    assert cache.get_bytes(path1) is None
+    assert list(stream) == [b"bar", b"baz"]
+    assert cache.get_bytes(path1) == b"foobarbaz"
+
+    # a stream closed halfway leaves neither the entry nor its temporary file
+    stream = cache.put_stream("/foo/partial.json", chunks)
+    next(stream)
+    stream.close()
+    assert cache.get_bytes("/foo/partial.json") is None
+    # besides the entry, only the stats of hits and misses are left
+    assert sorted(os.listdir(tmp_path)) == sorted([
+        os.path.basename(cache.cache_filepath(path1)), cache.stats_filename, f"{cache.stats_filename}.lock",
+    ])
+
+def increment_counter(cache_root_dir:str, compression:CacheCompression | None, times:int) -> int:
+    context = AppContext(log_level=logging.CRITICAL)
+    cache = file_cache_factory(cache_root_dir, compression, context)
+    torn_reads = 0
+    for _ in range(times):
+        with cache.lock("/foo/counter.json"):
+            body = cache.get("/foo/counter.json")
+            counter = json.loads(body)["counter"] if body is not None else 0
+            # large body, so that a torn write would be visible to readers
+            cache.put("/foo/counter.json", json.dumps({"counter": counter + 1, "padding": "x" * 256 * 1024}))
+        # read without lock while the others write
+        try:
+            json.loads(cache.get("/foo/counter.json")) # type: ignore
+        except ValueError:
+            torn_reads += 1
+    return torn_reads
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_LocalFileCache_concurrent(compression:CacheCompression | None, context:AppContext, tmp_path:str):
+    processes, times = 4, 20
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+        torn_reads = list(executor.map(
+            increment_counter, [str(tmp_path)] * processes, [compression] * processes, [times] * processes,
+        ))
+    assert torn_reads == [0] * processes
+    cache = file_cache_factory(str(tmp_path), compression, context)
+    # no increment is lost, and no temporary file is left
+    assert json.loads(cache.get("/foo/counter.json"))["counter"] == processes * times # type: ignore
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(".tmp")]
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_LocalFileCache_max_size(compression:CacheCompression | None, context:AppContext, tmp_path:str):
+    cache = file_cache_factory(str(tmp_path), compression, context, max_size=2500)
+    assert isinstance(cache, LocalFileCache)
+    body = os.urandom(1000)
+    cache.put_bytes("/foo/1.json", body)
+    cache.put_bytes("/foo/2.json", body)
+    # make 1.json least recently used regardless of the resolution of timestamps
+    os.utime(cache.cache_filepath("/foo/1.json"), (0, 0))
+    os.utime(cache.cache_filepath("/foo/2.json"), (1, 1))
+    assert cache.get_bytes("/foo/1.json") == body
+    cache.put_bytes("/foo/3.json", body)
+    # 2.json is evicted since 1.json is accessed after it
+    assert cache.get_bytes("/foo/1.json") == body
+    assert cache.get_bytes("/foo/2.json") is None
+    assert cache.get_bytes("/foo/3.json") == body
+    # lock files and stats are not counted as entries
+    with cache.lock("/foo/1.json"):
+        pass
+    assert cache.stats().entries == 2
+
+def test_LocalFileCache_stats(context:AppContext, tmp_path:str):
+    cache = LocalFileCache(str(tmp_path), context)
+    cache.put("/foo/bar.json", "foobar")
+    cache.get("/foo/bar.json")
+    cache.get("/foo/baz.json")
+    # another run with the same directory
+    another_context = AppContext(log_level=logging.DEBUG)
+    another_cache = LocalFileCache(str(tmp_path), another_context)
+    another_cache.get("/foo/bar.json")
+
+    stats = cache.stats()
+    assert stats.entries == 1
+    assert stats.bytes == len("foobar")
+    assert [(r.request_id, r.hits, r.misses) for r in stats.runs] == [
+        (context.request_id, 1, 1), (another_context.request_id, 1, 0),
+    ]
+    assert (stats.hits, stats.misses) == (2, 1)
+
+def test_LocalFileCache_prune_and_clear(context:AppContext, tmp_path:str):
+    cache = LocalFileCache(str(tmp_path), context)
+    for i in range(3):
+        cache.put_bytes(f"/foo/{i}.json", b"0" * 1000)
+        os.utime(cache.cache_filepath(f"/foo/{i}.json"), (i, i))
+    evicted = cache.prune(1500)
+    assert evicted == [cache.cache_filepath("/foo/0.json"), cache.cache_filepath("/foo/1.json")]
+    assert cache.prune(1500) == []
+
+    with cache.lock("/foo/2.json"):
+        assert cache.get_bytes("/foo/2.json") is not None
+    cache.clear()
+    assert cache.stats().entries == 0
+    assert cache.read_stats() == []
+    # lock files are kept for other processes
+    assert sorted(os.listdir(tmp_path)) == sorted([f"{cache.hash('/foo/2.json')}.lock", ".stats.json.lock"])
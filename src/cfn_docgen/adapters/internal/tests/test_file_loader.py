@@ -10,6 +10,7 @@ from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, Conn
 from cfn_docgen.domain.model.cfn_document_generator import CfnDocumentDestination
 from cfn_docgen.domain.model.cfn_template import CfnTemplateSource
 
+from cfn_docgen.domain.ports.internal.file_loader import FileValidators
 from cfn_docgen.adapters.internal.file_loader import LocalFileLoader, RemoteFileLoader, S3FileLoader, document_loader_factory, specification_loader_factory, template_loader_factory
 
 INPUT_MASTER_FILE=os.path.join(
@@ -133,6 +134,18 @@ def test_LocalFileLoader_download(context:AppContext):
         expected = fp.read()
     assert body == expected
 
+def test_LocalFileLoader_download_if_modified(context:AppContext):
+    loader = LocalFileLoader(context=context)
+    body, validators = loader.download_if_modified(INPUT_FILE1, FileValidators())
+    with open(INPUT_MASTER_FILE, "rb") as fp:
+        expected = fp.read()
+    assert body == expected
+    assert validators.last_modified is not None
+
+    body, not_modified_validators = loader.download_if_modified(INPUT_FILE1, validators)
+    assert body is None
+    assert not_modified_validators == validators
+
 def test_LocalFileLoader_upload(context:AppContext):
     loader = LocalFileLoader(context=context)
     with open(EXPECTED_MASTER_FILE, "rb") as fp:
@@ -0,0 +1,53 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+from cfn_docgen.adapters.internal.json_stream import iter_json_entries
+
+def split(body:bytes, chunk_size:int) -> List[bytes]:
+    return [body[i:i+chunk_size] for i in range(0, len(body), chunk_size)]
+
+def collect(body:bytes, chunk_size:int) -> Dict[str, Any]:
+    data:Dict[str, Any] = {}
+    for key, entry_key, value in iter_json_entries(split(body, chunk_size), nested_keys={"Nested", "Empty"}):
+        if entry_key is None:
+            data[key] = value
+        else:
+            data.setdefault(key, {})[entry_key] = value
+    return data
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_iter_json_entries(chunk_size:int):
+    expected = {
+        "Version": "1.0.0",
+        "Number": 1234567890,
+        "Nested": {
+            "Foo": {"List": [1, 2.5, -3e10, True, False, None], "Escaped": "a \"quoted\" \\ é あ 😀"},
+            "Bar": 42,
+        },
+        "Float": 0.125,
+    }
+    body = json.dumps(expected, indent=2, ensure_ascii=False).encode()
+    assert collect(body, chunk_size) == expected
+
+def test_iter_json_entries_entries():
+    body = b'{"Nested": {"A": 1, "B": {"C": 2}}, "Version": "1"}'
+    assert list(iter_json_entries(split(body, 3), nested_keys={"Nested"})) == [
+        ("Nested", "A", 1), ("Nested", "B", {"C": 2}), ("Version", None, "1"),
+    ]
+
+@pytest.mark.parametrize("body", [b"{}", b'{"Empty": {}}', b' { "Number" : 10 } '])
+def test_iter_json_entries_edge(body:bytes):
+    # an empty nested object yields nothing
+    assert collect(body, 1) == {k: v for k, v in json.loads(body).items() if v != {}}
+
+@pytest.mark.parametrize("body", [
+    b'{"Number": 10',
+    b'{"Nested": {"Foo": 1,}}',
+    b'{"Version": "unterminated}',
+    b'["not", "object"]',
+    b'',
+])
+def test_iter_json_entries_invalid(body:bytes):
+    with pytest.raises(ValueError):
+        collect(body, 2)
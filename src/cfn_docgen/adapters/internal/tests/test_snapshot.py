@@ -0,0 +1,76 @@
+import json
+import os
+import stat
+
+import pytest
+from cfn_docgen.adapters.internal.snapshot import SNAPSHOT_KEY_FILENAME, SnapshotMismatchError, dump_snapshot, load_snapshot, snapshot_secret
+from cfn_docgen.domain.model.cfn_specification import CfnSpecification
+from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition
+
+@pytest.fixture
+def custom_specification():
+    localpath = os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "..", "..", "docs", "custom-specification.json",
+    )
+    with open(localpath, "r", encoding="UTF-8") as fp:
+        data = fp.read()
+    return CfnSpecification(**json.loads(data))
+
+@pytest.fixture
+def secret(tmp_path:str):
+    os.chmod(tmp_path, 0o700)
+    return snapshot_secret(str(tmp_path))
+
+def test_snapshot_roundtrip(custom_specification:CfnSpecification, secret:bytes):
+    body = dump_snapshot(custom_specification, secret, tags={"version": "1.0.0"})
+    loaded = load_snapshot(body, CfnSpecification, secret, tags={"version": "1.0.0"})
+
+    assert loaded == custom_specification
+    assert loaded.model_fields_set == custom_specification.model_fields_set
+    nested_prop = loaded.PropertyTypes["Custom::Resource.NestedProp"]
+    assert nested_prop.Properties is not None
+    assert nested_prop.Properties["NumberProp"].PrimitiveType == "Integer"
+    assert nested_prop.Properties["NumberProp"].model_dump(exclude_unset=True) == \
+        custom_specification.PropertyTypes["Custom::Resource.NestedProp"].Properties["NumberProp"].model_dump(exclude_unset=True) # type: ignore
+
+def test_snapshot_type_mismatch(custom_specification:CfnSpecification, secret:bytes):
+    body = dump_snapshot(custom_specification, secret, tags={})
+    with pytest.raises(TypeError):
+        load_snapshot(body, CfnTemplateDefinition, secret, tags={})
+
+def test_snapshot_tag_mismatch(custom_specification:CfnSpecification, secret:bytes):
+    body = dump_snapshot(custom_specification, secret, tags={"version": "1.0.0"})
+    with pytest.raises(SnapshotMismatchError):
+        load_snapshot(body, CfnSpecification, secret, tags={"version": "2.0.0"})
+    with pytest.raises(SnapshotMismatchError):
+        load_snapshot(body, CfnSpecification, secret, tags={"version": "1.0.0", "custom": "digest"})
+
+@pytest.mark.parametrize("tamper", [
+    lambda body: body.replace(b"Integer", b"Intexer"),
+    lambda body: body[:-1],
+])
+def test_snapshot_invalid_signature(custom_specification:CfnSpecification, secret:bytes, tamper):
+    body = dump_snapshot(custom_specification, secret, tags={})
+    with pytest.raises(ValueError):
+        load_snapshot(tamper(body), CfnSpecification, secret, tags={})
+    with pytest.raises(ValueError):
+        load_snapshot(body, CfnSpecification, b"another secret", tags={})
+
+def test_snapshot_secret(tmp_path:str):
+    os.chmod(tmp_path, 0o700)
+    secret = snapshot_secret(str(tmp_path))
+    assert len(secret) == 32
+    assert snapshot_secret(str(tmp_path)) == secret
+    key_mode = os.stat(os.path.join(tmp_path, SNAPSHOT_KEY_FILENAME)).st_mode
+    assert stat.S_IMODE(key_mode) == 0o600
+
+def test_snapshot_secret_writable_by_others(tmp_path:str):
+    os.chmod(tmp_path, 0o777)
+    with pytest.raises(PermissionError):
+        snapshot_secret(str(tmp_path))
+
+    os.chmod(tmp_path, 0o700)
+    snapshot_secret(str(tmp_path))
+    os.chmod(os.path.join(tmp_path, SNAPSHOT_KEY_FILENAME), 0o666)
+    with pytest.raises(PermissionError):
+        snapshot_secret(str(tmp_path))
@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+from cfn_docgen.adapters.internal.spec_store import SpecStoreMapping, dump_spec_store, load_spec_store, open_spec_store
+from cfn_docgen.domain.model.cfn_specification import CfnSpecification
+
+@pytest.fixture
+def custom_specification_json():
+    localpath = os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "..", "..", "docs", "custom-specification.json",
+    )
+    with open(localpath, "r", encoding="UTF-8") as fp:
+        return json.loads(fp.read())
+
+def test_spec_store_roundtrip(custom_specification_json):
+    expected = CfnSpecification(**custom_specification_json)
+    spec = load_spec_store(dump_spec_store(custom_specification_json))
+
+    assert spec.ResourceSpecificationVersion == expected.ResourceSpecificationVersion
+    assert list(spec.ResourceTypes.keys()) == list(expected.ResourceTypes.keys())
+    assert list(spec.PropertyTypes.keys()) == list(expected.PropertyTypes.keys())
+    assert isinstance(spec.PropertyTypes, SpecStoreMapping)
+    # nothing is decoded until accessed
+    assert all(isinstance(entry, list) for entry in spec.PropertyTypes.entries.values())
+    for name, resource_spec in expected.ResourceTypes.items():
+        assert spec.ResourceTypes[name] == resource_spec
+    for name, property_spec in expected.PropertyTypes.items():
+        assert spec.PropertyTypes[name] == property_spec
+
+def test_open_spec_store(custom_specification_json, tmp_path):
+    store_filepath = os.path.join(tmp_path, "store")
+    with open(store_filepath, "wb") as fp:
+        fp.write(dump_spec_store(custom_specification_json))
+    spec = open_spec_store(store_filepath)
+    assert spec.ResourceTypes["Custom::Resource"] == CfnSpecification(**custom_specification_json).ResourceTypes["Custom::Resource"]
+
+@pytest.mark.parametrize("body", [
+    b"", b"not a store", b"CFN-DOCGEN-SPEC-STORE\n{\"format\":\"0\"}\n",
+])
+def test_load_spec_store_invalid(body:bytes):
+    with pytest.raises(Exception):
+        load_spec_store(body)
@@ -0,0 +1,40 @@
+import glob
+import json
+import os
+
+import pytest
+from cfn_flip import to_json # type: ignore
+from cfn_docgen.adapters.internal.yaml_loader import LIBYAML_AVAILABLE, load_yaml_template
+
+DOCS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "..", "docs")
+
+def test_libyaml_available():
+    assert LIBYAML_AVAILABLE
+
+@pytest.mark.parametrize("template", [
+    "A: !Ref Foo",
+    "A: !Condition IsProd",
+    "A: !GetAtt Foo.Bar.Baz",
+    "A: !GetAtt [Foo, Bar]",
+    "A: !Sub ['${Foo}-x', {Foo: !Ref Bar}]",
+    "A: !If [IsProd, !Ref 'AWS::NoValue', !Join ['', [a, !Select [0, !GetAZs '']]]]",
+    "A: !Base64 {'Fn::Sub': x}",
+    "AWSTemplateFormatVersion: 2010-09-09\nA: 2020-01-01 10:00:00",
+    "A: {1: a, 1.5: b, true: c, null: d}",
+    "A: [1, 2.5, yes, off, ~, .nan]\nB: &anchor {X: 1}\nC: *anchor",
+    '  {"Resources": {"A": {"Type": "AWS::SNS::Topic"}}}\n',
+])
+def test_load_yaml_template(template:str):
+    # compare through json, since nan != nan
+    expected = to_json(template)
+    assert json.dumps(load_yaml_template(template), indent=4, ensure_ascii=False) == expected
+
+@pytest.mark.parametrize("template_file", glob.glob(os.path.join(DOCS_DIR, "*.yaml")))
+def test_load_yaml_template_docs(template_file:str):
+    with open(template_file, "r", encoding="utf-8") as fp:
+        template = fp.read()
+    assert load_yaml_template(template) == json.loads(to_json(template))
+
+def test_load_yaml_template_not_mapping():
+    with pytest.raises(ValueError):
+        load_yaml_template("- a\n- b\n")
@@ -0,0 +1,85 @@
+from __future__ import annotations
+import datetime
+import json
+from typing import Any, Dict
+import yaml
+from yaml.nodes import MappingNode, Node, ScalarNode, SequenceNode
+from cfn_docgen import json_backend
+
+try:
+    # the scanner, parser and composer of LibYAML run in C
+    from yaml import CSafeLoader as BaseSafeLoader
+    LIBYAML_AVAILABLE = True
+except ImportError:
+    from yaml import SafeLoader as BaseSafeLoader # type: ignore
+    LIBYAML_AVAILABLE = False
+
+# tags which are not prefixed with "Fn::", the same as cfn_flip
+UNPREFIXED_TAGS = ["Ref", "Condition"]
+
+def json_key(key:Any) -> Any:
+    # mapping keys become what they would be after the round trip through json
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return str(key)
+    if isinstance(key, float):
+        return json.dumps(key)
+    return key
+
+class CfnYamlLoader(BaseSafeLoader): # type: ignore
+    """SafeLoader for cfn templates which constructs the same dict as json.loads(cfn_flip.to_json(template))"""
+
+    def construct_cfn_mapping(self, node:MappingNode, deep:bool=False) -> Dict[Any, Any]:
+        # merge keys (<<) are not supported, like cfn_flip
+        mapping:Dict[Any, Any] = {}
+        for key_node, value_node in node.value:
+            key = self.construct_object(key_node, deep=deep) # type: ignore
+            mapping[key] = self.construct_object(value_node, deep=deep) # type: ignore
+        if all(isinstance(key, str) for key in mapping):
+            return mapping
+        # keys equal in python (e.g. 1 and true) are merged before they are converted, like cfn_flip
+        return {json_key(key): value for key, value in mapping.items()}
+
+    def construct_cfn_timestamp(self, node:ScalarNode) -> str:
+        timestamp:datetime.date = self.construct_yaml_timestamp(node) # type: ignore
+        return timestamp.isoformat()
+
+    def construct_cfn_intrinsic(self, tag_suffix:str, node:Node) -> Dict[str, Any]:
+        name = tag_suffix if tag_suffix in UNPREFIXED_TAGS else f"Fn::{tag_suffix}"
+        if name == "Fn::GetAtt":
+            if isinstance(node, ScalarNode):
+                return {name: node.value.split(".", 1)}
+            if isinstance(node, SequenceNode):
+                return {name: [n.value for n in node.value]}
+            raise ValueError(f"Unexpected node type: {type(node.value)}")
+        if isinstance(node, ScalarNode):
+            return {name: self.construct_scalar(node)} # type: ignore
+        if isinstance(node, SequenceNode):
+            return {name: self.construct_sequence(node)} # type: ignore
+        if isinstance(node, MappingNode):
+            return {name: self.construct_cfn_mapping(node)}
+        raise ValueError(f"Bad tag: !{tag_suffix}")
+
+CfnYamlLoader.add_constructor("tag:yaml.org,2002:map", CfnYamlLoader.construct_cfn_mapping)
+CfnYamlLoader.add_constructor("tag:yaml.org,2002:timestamp", CfnYamlLoader.construct_cfn_timestamp)
+CfnYamlLoader.add_multi_constructor("!", CfnYamlLoader.construct_cfn_intrinsic)
+
+def load_yaml_template(template:str) -> Dict[str, Any]:
+    """load a cfn template in yaml (or json) format into a dict, with short form intrinsic functions in their long form"""
+    if template.lstrip().startswith("{"):
+        # json with surrounding whitespaces, which cfn_flip also loads as json first
+        try:
+            return json_backend.loads(template)
+        except ValueError:
+            pass
+    loaded = yaml.load(template, Loader=CfnYamlLoader) # type: ignore
+    if not isinstance(loaded, dict):
+        raise ValueError(f"template must be a mapping, but got {type(loaded).__name__}")
+    return loaded
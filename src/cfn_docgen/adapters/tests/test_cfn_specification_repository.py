@@ -1,11 +1,21 @@
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import json
 import logging
+import multiprocessing
 import os
+import threading
+import time
+from typing import Any, List, Optional
 import pytest
-from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
-from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen import __version__
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository, CfnSpecificationRepositoryRegistry, MmapCfnSpecificationRepository, prefetch_specifications
+from cfn_docgen.adapters.internal.cache import CompressedFileCache, ContentAddressedFileCache, LocalFileCache, NoFileCache
 from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
+from cfn_docgen.adapters.internal.snapshot import load_snapshot, snapshot_key, snapshot_secret
 from cfn_docgen.config import AppConfig, AppContext, ConnectionSettings, AwsConnectionSettings
-from cfn_docgen.domain.model.cfn_specification import CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName
+from cfn_docgen.domain.model.cfn_specification import CfnSpecification, CfnSpecificationCompact, CfnSpecificationCompactPropertyType, CfnSpecificationLazyMapping, CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName
 
 
 # @pytest.fixture
@@ -18,6 +28,52 @@ def custom_resource_specification_url():
         "..", "..", "..", "..", "docs", "custom-specification.json"
     )
 
+class SpecificationServer:
+    """local stand-in of the specification distribution which supports conditional GET with ETag"""
+
+    def __init__(self, body:bytes) -> None:
+        self.body = body
+        self.status_codes:List[int] = []
+        # seconds to wait before sending the body, to keep concurrent requests in flight
+        self.delay = 0.0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                etag = f'"{hashlib.md5(server.body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    server.status_codes.append(304)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                server.status_codes.append(200)
+                time.sleep(server.delay)
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(server.body)))
+                self.end_headers()
+                self.wfile.write(server.body)
+
+            def log_message(self, format:str, *args:Any):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/CloudFormationResourceSpecification.json"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def specification_server(custom_resource_specification_url:str):
+    with open(custom_resource_specification_url, "rb") as fp:
+        server = SpecificationServer(fp.read())
+    yield server
+    server.shutdown()
+
 @pytest.fixture
 def context():
     return AppContext(
@@ -165,6 +221,34 @@ def test_CfnSpecificationRepository_list_properties_for_resource(
         CfnSpecificationPropertyTypeName(f"{resource_type.fullname}.Ebs", context).fullname
     )
 
+def test_CfnSpecificationRepository_list_properties_for_resource_index(
+    custom_resource_specification_url:str,
+    context:AppContext,
+):
+    repository = CfnSpecificationRepository(
+        source_url="https://d1uauaxba7bl26.cloudfront.net/latest/gzip/CloudFormationResourceSpecification.json",
+        custom_resource_specification_url=custom_resource_specification_url,
+        loader_factory=specification_loader_factory,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context
+    )
+    # the index returns exactly what scanning all property types returns
+    for resource_type in repository.list_resource_types():
+        expected = {
+            property_type: property_spec for property_type, property_spec in repository.spec.PropertyTypes.items()
+            if property_type.startswith(f"{resource_type}.") or property_type == "Tag"
+        }
+        assert repository.list_properties_for_resource(
+            CfnSpecificationResourceTypeName(resource_type, context)
+        ) == expected, resource_type
+
+    properties = repository.list_properties_for_resource(
+        CfnSpecificationResourceTypeName("Custom::Resource", context)
+    )
+    assert properties.get("Custom::Resource.NestedProp")
+    assert properties.get("Tag")
+
 def test_CfnSpecificationRepository_get_specs_for_resources(
     repository:CfnSpecificationRepository,
     context:AppContext,
@@ -177,6 +261,12 @@ def test_CfnSpecificationRepository_get_specs_for_resources(
     assert specs.PropertySpecs.get(
         CfnSpecificationPropertyTypeName(f"{resource_type.fullname}.Ebs", context).fullname
     )
+    # resolved once for each resource type
+    assert repository.get_specs_for_resource(resource_type) is specs
+    block_device_mappings = specs.ResolvedProperties["BlockDeviceMappings"]
+    assert block_device_mappings.Kind == "List" and block_device_mappings.PropertyType is not None
+    ebs = block_device_mappings.PropertyType.Properties["Ebs"].PropertyType
+    assert ebs is not None and ebs.Spec == specs.PropertySpecs[f"{resource_type.fullname}.Ebs"]
 
 @pytest.mark.parametrize("resource_type,expected", [
     ("AWS::WAFv2::RuleGroup", True), ("AWS::EC2::Instance", False)
@@ -221,6 +311,49 @@ def test_CfnSpecificationRepository_with_custom_specification(
     assert nested_prop.Properties["NumberProp"].PrimitiveType is not None
 
 
+def test_CfnSpecificationRepository_merged_snapshot(
+    custom_resource_specification_url:str,
+    specification_server:SpecificationServer,
+    tmp_path:str,
+):
+    def build(cache_ttl:Optional[float]=None):
+        context = AppContext(
+            log_level=logging.DEBUG,
+            connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+        )
+        repository = CfnSpecificationRepository(
+            source_url=custom_resource_specification_url,
+            custom_resource_specification_url=specification_server.url,
+            loader_factory=specification_loader_factory,
+            cache=LocalFileCache(str(tmp_path), context=context),
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+            cache_ttl=cache_ttl,
+        )
+        return repository, context.log_messages.as_string(logging.DEBUG)
+
+    repository, logs = build()
+    assert logs.find("merged snapshot not hit") >= 0
+    assert logs.find("add custom resource type [Custom::Resource]") < 0
+    assert logs.find("overwrite resource type [Custom::Resource] with custom one") >= 0
+
+    # merged in one step without loading and merging each of them
+    merged_repository, logs = build()
+    assert logs.find(f"merged snapshot hit [{custom_resource_specification_url}] [{specification_server.url}]") >= 0
+    assert logs.find("overwrite resource type") < 0
+    assert merged_repository.spec == repository.spec
+    assert merged_repository.property_types_by_resource == repository.property_types_by_resource
+
+    # updated custom specification invalidates the merged one
+    modified = json.loads(specification_server.body)
+    modified["ResourceTypes"]["Custom::Another"] = {"Properties": {}}
+    specification_server.body = json.dumps(modified).encode()
+    updated_repository, logs = build(cache_ttl=0)
+    assert logs.find("is built from other specifications") >= 0
+    assert "Custom::Another" in updated_repository.list_resource_types()
+    _, logs = build()
+    assert logs.find("merged snapshot hit") >= 0
+
 def test_CfnSpecificationRepository_list_resource_types(
     custom_resource_specification_url:str,
     context:AppContext,
@@ -236,4 +369,444 @@ def test_CfnSpecificationRepository_list_resource_types(
 
     resource_types = repository.list_resource_types()
     assert "AWS::EC2::Instance" in resource_types
-    assert "Custom::Resource" in resource_types
\ No newline at end of file
+    assert "Custom::Resource" in resource_types
+
+def test_CfnSpecificationRepository_snapshot(
+    context:AppContext,
+):
+    source_url = "https://d1uauaxba7bl26.cloudfront.net/latest/gzip/CloudFormationResourceSpecification.json"
+    cache = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context)
+    # first build validates the spec and leaves its snapshot in the cache
+    repository = CfnSpecificationRepository(
+        source_url=source_url,
+        custom_resource_specification_url=None,
+        loader_factory=specification_loader_factory,
+        cache=cache,
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context
+    )
+
+    snapshot_context = AppContext(
+        log_level=logging.DEBUG,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    snapshot_repository = CfnSpecificationRepository(
+        source_url=source_url,
+        custom_resource_specification_url=None,
+        loader_factory=specification_loader_factory,
+        cache=cache,
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=snapshot_context
+    )
+    assert snapshot_context.log_messages.as_string(logging.DEBUG).find(
+        f"snapshot hit [{source_url}]"
+    ) >= 0
+    assert snapshot_repository.spec == repository.spec
+
+    resource_type = CfnSpecificationResourceTypeName("AWS::EC2::Instance", context)
+    assert (
+        snapshot_repository.get_specs_for_resource(resource_type) 
+        == repository.get_specs_for_resource(resource_type)
+    )
+
+def test_CfnSpecificationRepository_snapshot_invalid(
+    custom_resource_specification_url:str,
+    context:AppContext,
+):
+    cache = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context)
+    CfnSpecificationRepository(
+        source_url=custom_resource_specification_url,
+        custom_resource_specification_url=None,
+        loader_factory=specification_loader_factory,
+        cache=cache,
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context
+    )
+    # corrupt the snapshot of the spec, then fall back to validate the cached json
+    cache.put_bytes(snapshot_key(custom_resource_specification_url), b"corrupted")
+
+    fallback_context = AppContext(
+        log_level=logging.DEBUG,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    repository = CfnSpecificationRepository(
+        source_url=custom_resource_specification_url,
+        custom_resource_specification_url=None,
+        loader_factory=specification_loader_factory,
+        cache=cache,
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=fallback_context
+    )
+    assert fallback_context.log_messages.as_string(logging.DEBUG).find(
+        f"failed to load snapshot for [{custom_resource_specification_url}]"
+    ) >= 0
+    custom_resource_spec = repository.get_specs_for_resource(
+        CfnSpecificationResourceTypeName("Custom::Resource", context),
+    )
+    assert custom_resource_spec.ResourceSpec.Properties["StringProp"].PrimitiveType is not None
+
+    # the corrupted snapshot is replaced with a valid one
+    body = cache.get_bytes(snapshot_key(custom_resource_specification_url))
+    assert body is not None
+    snapshot = load_snapshot(
+        body, CfnSpecificationCompact,
+        secret=snapshot_secret(cache.cache_root_dir),
+        tags={"cfn_docgen": __version__},
+    )
+    assert snapshot == repository.spec
+
+def test_CfnSpecificationRepository_lazy_validation(
+    custom_resource_specification_url:str,
+    context:AppContext,
+):
+    source_url = "https://d1uauaxba7bl26.cloudfront.net/latest/gzip/CloudFormationResourceSpecification.json"
+    repository = CfnSpecificationRepository(
+        source_url=source_url,
+        custom_resource_specification_url=custom_resource_specification_url,
+        loader_factory=specification_loader_factory,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+    )
+    lazy_repository = CfnSpecificationRepository(
+        source_url=source_url,
+        custom_resource_specification_url=custom_resource_specification_url,
+        loader_factory=specification_loader_factory,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+        lazy_validation=True,
+    )
+    assert lazy_repository.list_resource_types() == repository.list_resource_types()
+    for resource_type_name in ["AWS::EC2::Instance", "Custom::Resource"]:
+        resource_type = CfnSpecificationResourceTypeName(resource_type_name, context)
+        assert lazy_repository.get_specs_for_resource(resource_type) == repository.get_specs_for_resource(resource_type)
+
+    # only the resource types and property types used so far are validated
+    property_types = lazy_repository.spec.PropertyTypes
+    assert isinstance(property_types, CfnSpecificationLazyMapping)
+    validated = [
+        property_type for property_type, entry in property_types.entries.items()
+        if isinstance(entry, CfnSpecificationCompactPropertyType)
+    ]
+    assert 0 < len(validated) < 100
+
+    with pytest.raises(KeyError):
+        lazy_repository.get_resource_spec(CfnSpecificationResourceTypeName("AWS::Invalid::Key", context))
+
+def test_MmapCfnSpecificationRepository(
+    custom_resource_specification_url:str,
+    context:AppContext,
+):
+    source_url = "https://d1uauaxba7bl26.cloudfront.net/latest/gzip/CloudFormationResourceSpecification.json"
+    repository = CfnSpecificationRepository(
+        source_url=source_url,
+        custom_resource_specification_url=custom_resource_specification_url,
+        loader_factory=specification_loader_factory,
+        cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+    )
+    # build the store at first, then open it
+    for _ in range(2):
+        mmap_context = AppContext(
+            log_level=logging.DEBUG,
+            connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+        )
+        mmap_repository = MmapCfnSpecificationRepository(
+            source_url=source_url,
+            custom_resource_specification_url=custom_resource_specification_url,
+            loader_factory=specification_loader_factory,
+            cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=mmap_context),
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=mmap_context,
+        )
+        assert mmap_repository.list_resource_types() == repository.list_resource_types()
+        for resource_type_name in ["AWS::EC2::Instance", "AWS::WAFv2::RuleGroup", "Custom::Resource"]:
+            resource_type = CfnSpecificationResourceTypeName(resource_type_name, context)
+            assert mmap_repository.get_specs_for_resource(resource_type) == repository.get_specs_for_resource(resource_type)
+    assert mmap_context.log_messages.as_string(logging.DEBUG).find(
+        f"spec store hit [{source_url}]"
+    ) >= 0
+
+def test_MmapCfnSpecificationRepository_NoFileCache(
+    custom_resource_specification_url:str,
+    context:AppContext,
+):
+    repository = MmapCfnSpecificationRepository(
+        source_url=custom_resource_specification_url,
+        loader_factory=specification_loader_factory,
+        cache=NoFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+    )
+    custom_resource_spec = repository.get_specs_for_resource(
+        CfnSpecificationResourceTypeName("Custom::Resource", context),
+    )
+    nested_prop = custom_resource_spec.PropertySpecs["Custom::Resource.NestedProp"]
+    assert nested_prop.Properties is not None
+    assert nested_prop.Properties["NumberProp"].PrimitiveType is not None
+
+@pytest.mark.parametrize("cache_type", [LocalFileCache, CompressedFileCache])
+def test_CfnSpecificationRepository_stream(
+    cache_type:type,
+    specification_server:SpecificationServer,
+    context:AppContext,
+    tmp_path:str,
+):
+    cache = cache_type(str(tmp_path), context=context)
+    repository = CfnSpecificationRepository(
+        source_url=specification_server.url,
+        loader_factory=specification_loader_factory,
+        cache=cache,
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+    )
+    assert context.log_messages.as_string(logging.DEBUG).find(
+        f"cache not hit [{specification_server.url}]. build from stream"
+    ) >= 0
+    # streamed spec is the same as the one built from the whole json, which is cached as-is
+    assert repository.spec == CfnSpecificationCompact.from_specification(
+        CfnSpecification(**json.loads(specification_server.body))
+    )
+    assert cache.get_bytes(specification_server.url) == specification_server.body
+    assert cache.get(f"{specification_server.url}#metadata") is not None
+
+def build_repository_in_process(source_url:str, cache_root_dir:str) -> List[str]:
+    context = AppContext(log_level=logging.CRITICAL)
+    repository = CfnSpecificationRepository(
+        source_url=source_url,
+        loader_factory=specification_loader_factory,
+        cache=LocalFileCache(cache_root_dir, context=context),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        context=context,
+    )
+    return repository.list_resource_types()
+
+# this module builds repositories for all regions when it is imported, so do not spawn processes which import it again
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="fork is not available")
+def test_CfnSpecificationRepository_concurrent(
+    specification_server:SpecificationServer,
+    custom_resource_specification_url:str,
+    tmp_path:str,
+):
+    os.chmod(tmp_path, 0o700)
+    specification_server.delay = 0.5
+    processes = 4
+    with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork")) as executor:
+        resource_types = list(executor.map(
+            build_repository_in_process, [specification_server.url] * processes, [str(tmp_path)] * processes,
+        ))
+    # only one process downloads the specification, and the others reuse its cache
+    assert specification_server.status_codes == [200]
+    with open(custom_resource_specification_url, "rb") as fp:
+        expected = sorted(json.loads(fp.read())["ResourceTypes"].keys())
+    assert resource_types == [expected] * processes
+
+def test_CfnSpecificationRepository_stream_invalid(
+    specification_server:SpecificationServer,
+    context:AppContext,
+    tmp_path:str,
+):
+    cache = LocalFileCache(str(tmp_path), context=context)
+    specification_server.body = specification_server.body[:-10]
+    with pytest.raises(ValueError):
+        CfnSpecificationRepository(
+            source_url=specification_server.url,
+            loader_factory=specification_loader_factory,
+            cache=cache,
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+        )
+    # broken download is not cached
+    assert cache.get(specification_server.url) is None
+
+def test_CfnSpecificationRepository_cache_ttl(
+    specification_server:SpecificationServer,
+    context:AppContext,
+    tmp_path:str,
+):
+    cache = LocalFileCache(str(tmp_path), context=context)
+    def build(cache_ttl:Optional[float]):
+        return CfnSpecificationRepository(
+            source_url=specification_server.url,
+            loader_factory=specification_loader_factory,
+            cache=cache,
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+            cache_ttl=cache_ttl,
+        )
+
+    repository = build(cache_ttl=0)
+    assert specification_server.status_codes == [200]
+    # not modified, so the cached one is used
+    assert build(cache_ttl=0).spec == repository.spec
+    assert specification_server.status_codes == [200, 304]
+    # ttl not expired, or no ttl
+    build(cache_ttl=3600)
+    build(cache_ttl=None)
+    assert specification_server.status_codes == [200, 304]
+
+    # modified, so downloaded again and snapshot for the old one is not used
+    modified = json.loads(specification_server.body)
+    modified["ResourceSpecificationVersion"] = "2.0.0"
+    specification_server.body = json.dumps(modified).encode()
+    assert build(cache_ttl=3600).spec.ResourceSpecificationVersion == "1.0.0"
+    assert build(cache_ttl=0).spec.ResourceSpecificationVersion == "2.0.0"
+    assert specification_server.status_codes == [200, 304, 200]
+    assert build(cache_ttl=None).spec.ResourceSpecificationVersion == "2.0.0"
+
+def test_CfnSpecificationRepository_cache_ttl_unreachable(
+    specification_server:SpecificationServer,
+    context:AppContext,
+    tmp_path:str,
+):
+    cache = LocalFileCache(str(tmp_path), context=context)
+    def build():
+        return CfnSpecificationRepository(
+            source_url=specification_server.url,
+            loader_factory=specification_loader_factory,
+            cache=cache,
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+            cache_ttl=0,
+        )
+    repository = build()
+    specification_server.shutdown()
+    # the cached one is used if the source is unreachable
+    assert build().spec == repository.spec
+    assert context.log_messages.as_string(logging.DEBUG).find(
+        f"failed to revalidate cache for [{specification_server.url}]"
+    ) >= 0
+
+@pytest.mark.parametrize("repository_type", [CfnSpecificationRepository, MmapCfnSpecificationRepository])
+def test_CfnSpecificationRepository_CompressedFileCache(
+    repository_type:type,
+    custom_resource_specification_url:str,
+    context:AppContext,
+    tmp_path:str,
+):
+    cache = CompressedFileCache(str(tmp_path), context=context, compression="gzip")
+    # build from the json at first, then load the compressed snapshot or store
+    for _ in range(2):
+        repository = repository_type(
+            source_url=custom_resource_specification_url,
+            loader_factory=specification_loader_factory,
+            cache=cache,
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+        )
+        custom_resource_spec = repository.get_specs_for_resource(
+            CfnSpecificationResourceTypeName("Custom::Resource", context),
+        )
+        assert custom_resource_spec.ResourceSpec.Properties["StringProp"].PrimitiveType is not None
+    log = context.log_messages.as_string(logging.DEBUG)
+    assert log.find(f"snapshot hit [{custom_resource_specification_url}]") >= 0 or \
+        log.find(f"spec store hit [{custom_resource_specification_url}]") >= 0
+
+@pytest.mark.parametrize("repository_type", [CfnSpecificationRepository, MmapCfnSpecificationRepository])
+def test_CfnSpecificationRepository_ContentAddressedFileCache(
+    repository_type:type,
+    custom_resource_specification_url:str,
+    specification_server:SpecificationServer,
+    context:AppContext,
+    tmp_path:str,
+):
+    cache = ContentAddressedFileCache(LocalFileCache(str(tmp_path), context=context), context=context)
+    # the same specification from two sources
+    repositories = [
+        repository_type(
+            source_url=url,
+            loader_factory=specification_loader_factory,
+            cache=cache,
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+        ) for url in [custom_resource_specification_url, specification_server.url, specification_server.url]
+    ]
+    assert specification_server.status_codes == [200]
+    assert cache.get_digest(custom_resource_specification_url) == cache.get_digest(specification_server.url)
+    resource_type = CfnSpecificationResourceTypeName("Custom::Resource", context)
+    for repository in repositories:
+        assert repository.get_specs_for_resource(resource_type) == repositories[0].get_specs_for_resource(resource_type)
+
+def test_CfnSpecificationRepositoryRegistry(
+    custom_resource_specification_url:str,
+    context:AppContext,
+):
+    built:List[Any] = []
+    def repository_factory(source_url:str, custom_url:Optional[str], context:AppContext):
+        built.append((source_url, custom_url))
+        # make concurrent callers wait for the build
+        time.sleep(0.1)
+        return CfnSpecificationRepository(
+            source_url=source_url,
+            custom_resource_specification_url=custom_url,
+            loader_factory=specification_loader_factory,
+            cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+        )
+    registry = CfnSpecificationRepositoryRegistry(repository_factory)
+
+    repositories:List[Any] = []
+    threads = [
+        threading.Thread(target=lambda: repositories.append(
+            registry.get(custom_resource_specification_url, None, context)
+        )) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(repositories) == 8
+    assert all(repository is repositories[0] for repository in repositories)
+    assert built == [(custom_resource_specification_url, None)]
+
+    # custom specification url is a part of the key
+    with_custom = registry.get(custom_resource_specification_url, custom_resource_specification_url, context)
+    assert with_custom is not repositories[0]
+    assert registry.get(custom_resource_specification_url, custom_resource_specification_url, context) is with_custom
+    assert len(built) == 2
+
+    registry.invalidate(custom_resource_specification_url)
+    rebuilt = registry.get(custom_resource_specification_url, None, context)
+    assert rebuilt is not repositories[0]
+    assert registry.get(custom_resource_specification_url, custom_resource_specification_url, context) is with_custom
+    assert len(built) == 3
+
+    registry.clear()
+    assert registry.get(custom_resource_specification_url, custom_resource_specification_url, context) is not with_custom
+    assert len(built) == 4
+
+def test_prefetch_specifications(
+    specification_server:SpecificationServer,
+    context:AppContext,
+    tmp_path:str,
+):
+    os.chmod(tmp_path, 0o700)
+    cache = LocalFileCache(str(tmp_path), context=context)
+    specification_server.delay = 0.5
+    # the server ignores the query, so each url is a distinct specification with the same body
+    source_urls = [f"{specification_server.url}?region={i}" for i in range(4)]
+    unreachable_url = "http://127.0.0.1:1/CloudFormationResourceSpecification.json"
+
+    started_at = time.time()
+    prefetched = prefetch_specifications(
+        source_urls + [source_urls[0], unreachable_url], cache=cache, context=context, jobs=4,
+    )
+    # downloaded in parallel, and the duplicated url only once
+    assert time.time() - started_at < 0.5 * 4
+    assert specification_server.status_codes == [200] * 4
+    assert prefetched == {**{url: True for url in source_urls}, unreachable_url: False}
+
+    # following runs start from the cache
+    for url in source_urls:
+        assert cache.get_local_filepath(url) is not None
+        CfnSpecificationRepository(
+            source_url=url,
+            loader_factory=specification_loader_factory,
+            cache=cache,
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+            context=context,
+        )
+    assert specification_server.status_codes == [200] * 4
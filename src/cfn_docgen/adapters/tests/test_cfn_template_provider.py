@@ -4,6 +4,7 @@ import pytest
 from cfn_docgen.config import AppContext, AwsConnectionSettings, ConnectionSettings
 from cfn_docgen.domain.model.cfn_template import CfnTemplateDefinition, CfnTemplateSource
 from cfn_docgen.adapters.cfn_template_provider import CfnTemplateProvider
+from cfn_docgen.adapters.internal.cache import LocalFileCache
 from cfn_docgen.adapters.internal.file_loader import template_loader_factory
 
 @pytest.fixture
@@ -47,3 +48,52 @@ def test_load_yaml_template(input_file:str, context:AppContext):
     ))
 
     assert isinstance(template_definition, CfnTemplateDefinition)
+
+def test_load_yaml_template_without_libyaml(input_yaml_file:str, context:AppContext, monkeypatch:pytest.MonkeyPatch):
+    provider = CfnTemplateProvider(
+        file_loader_factory=template_loader_factory,
+        context=context,
+    )
+    template_source = CfnTemplateSource(source=input_yaml_file, context=context)
+    with_libyaml = provider.load_template(template_source)
+    monkeypatch.setattr("cfn_docgen.adapters.cfn_template_provider.LIBYAML_AVAILABLE", False)
+    without_libyaml = provider.load_template(template_source)
+
+    assert with_libyaml == without_libyaml
+    assert "convert yaml template with cfn_flip" in context.log_messages.as_string(logging.DEBUG)
+
+def test_load_template_cache(input_yaml_file:str, tmp_path:str):
+    def load(source:str):
+        context = AppContext(
+            log_level=logging.DEBUG,
+            connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+        )
+        provider = CfnTemplateProvider(
+            file_loader_factory=template_loader_factory,
+            context=context,
+            cache=LocalFileCache(os.path.join(str(tmp_path), "cache"), context=context),
+        )
+        template_definition = provider.load_template(CfnTemplateSource(source=source, context=context))
+        return template_definition, context.log_messages.as_string(logging.DEBUG)
+
+    template_file = os.path.join(str(tmp_path), "sample-template.yaml")
+    with open(input_yaml_file, "r", encoding="utf-8") as src, open(template_file, "w", encoding="utf-8") as dst:
+        dst.write(src.read())
+
+    definition, logs = load(template_file)
+    assert logs.find(f"template snapshot not hit [{template_file}]") >= 0
+    assert logs.find("is yaml format") >= 0
+
+    # unchanged template is not parsed again
+    cached_definition, logs = load(template_file)
+    assert logs.find(f"template snapshot hit [{template_file}]") >= 0
+    assert logs.find("is yaml format") < 0
+    assert cached_definition == definition
+
+    # changed template is parsed again
+    with open(template_file, "a", encoding="utf-8") as fp:
+        fp.write("\n# changed\n")
+    _, logs = load(template_file)
+    assert logs.find(f"template snapshot not hit [{template_file}]") >= 0
+    assert logs.find("is yaml format") >= 0
+
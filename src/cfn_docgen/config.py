@@ -62,6 +62,8 @@ class AppConfig:
         "AWS::Lex::Bot",
         "AWS::EMRServerless::Application"
     ]
+    # depth of property nodes built for a resource, e.g. nested rule statements of AWS::WAFv2::WebACL
+    MAX_PROPERTY_DEPTH=100
 
 @dataclass
 class AppContextLogMessage:
@@ -138,6 +140,17 @@ class AppContext:
         ))
         self.__logger.debug(msg)
 
+    def replay(self, messages:Iterable[AppContextLogMessage]):
+        """log messages logged in another context (e.g. in a worker process) again in this context"""
+        log_by_level = {
+            logging.INFO: self.log_info,
+            logging.WARNING: self.log_warning,
+            logging.ERROR: self.log_error,
+            logging.DEBUG: self.log_debug,
+        }
+        for message in messages:
+            log_by_level[message.level](message.message)
+
 class AppLogger:
     __logger: Logger
     def __init__(self, name:str, loglevel:int, stacklevel:int) -> None:
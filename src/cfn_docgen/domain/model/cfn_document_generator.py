@@ -2,13 +2,14 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 import datetime
-import json
+from operator import itemgetter
 import re
-from typing import Any, List, Literal, Mapping, cast
+from typing import Any, List, Literal, Mapping, Tuple, Union, cast
+from cfn_docgen import json_backend
 from cfn_docgen.config import AppContext
-from cfn_docgen.domain.model.cfn_specification import CfnSpecificationProperty
+from cfn_docgen.domain.model.cfn_specification import CfnSpecificationCompactProperty
 
-from cfn_docgen.domain.model.cfn_template import CfnTemplateParameterDefinition, CfnTemplateResourcePropertiesNode, CfnTemplateResourcePropertyNode, CfnTemplateTree
+from cfn_docgen.domain.model.cfn_template import CfnTemplateParameterDefinition, CfnTemplateResourcePropertiesNode, CfnTemplateResourcePropertyLeaf, CfnTemplateResourcePropertyNode, CfnTemplateTree
 
 SupportedFormat = Literal["markdown"]
 
@@ -37,7 +38,7 @@ class CfnDocumentDestination:
         context.log_debug(f"type of dest [{dest}] is [{self.type}]")
 
 
-@dataclass
+@dataclass(slots=True)
 class PropertyField:
     Property: str
     Value: str
@@ -46,9 +47,7 @@ class PropertyField:
     UpdateType: str
     Type: str
     def as_table_row(self) -> str:
-        return "|{Property}|{Value}|{Description}|{Type}|{Required}|{UpdateType}|".format(
-            **self.__dict__
-        )
+        return f"|{self.Property}|{self.Value}|{self.Description}|{self.Type}|{self.Required}|{self.UpdateType}|"
 
 class ICfnDocumentGenerator(ABC):
 
@@ -387,7 +386,7 @@ class CfnMarkdownDocumentGenerator(ICfnDocumentGenerator):
                 ">", "\\>"
             )
         
-        dumped = json.dumps(j, indent=2, ensure_ascii=False).replace(
+        dumped = json_backend.dumps_indented(j).replace(
             "$", "\\$"
         ).replace(
             "|", "\\|"
@@ -473,7 +472,7 @@ class CfnMarkdownDocumentGenerator(ICfnDocumentGenerator):
             )
             return self.failed_message.format(section="Rules")
 
-    def _prop_type_rep(self, p:CfnSpecificationProperty) -> str:
+    def _prop_type_rep(self, p:CfnSpecificationCompactProperty) -> str:
         if p.PrimitiveType is not None:
             return p.PrimitiveType
         if p.PrimitiveItemType is not None and p.Type is not None:
@@ -486,132 +485,80 @@ class CfnMarkdownDocumentGenerator(ICfnDocumentGenerator):
         return "-"
 
     def _simplify_jsonpath(self, json_path:str) -> str:
-        *rest, tail = json_path.split(".")
-        if len(rest) == 1: # ["$"]
+        # the same as splitting json_path by dots, without the list of its parts
+        depth = json_path.count(".")
+        tail = json_path.rpartition(".")[2]
+        if depth == 1: # ["$"]
             return tail
         
-        spaces = "&nbsp;" * 2 * (len(rest)-1)
+        spaces = "&nbsp;" * 2 * (depth-1)
         # index = re.search(r"\[\d\]$", rest[-1])
         # if index is not None:
         #     return f"{spaces}{index.group()}.{tail}"
         
         return f"{spaces}{tail}"
 
-    def _flatten_property_node(self, property_node:CfnTemplateResourcePropertyNode) -> Mapping[str, PropertyField]:
-        property_fields:Mapping[str, PropertyField] = {}
-
-        for leaf in property_node.property_leaves.values():
-            if leaf.definition is None:
-                continue
-            property_fields[leaf.json_path] = PropertyField(
-                Property=self._simplify_jsonpath(leaf.json_path),
-                Value=self._dump_json(leaf.definition),
-                Description=leaf.description if leaf.description is not None else "-",
-                Required=str(leaf.spec.Required).lower() if leaf.spec.Required is not None else "-",
-                UpdateType=leaf.spec.UpdateType if leaf.spec.UpdateType is not None else "-",
-                Type=self._prop_type_rep(leaf.spec)
-            )
-        for node in property_node.property_nodes.values():
-            if not node.has_leaves:
-                continue
-            property_fields[node.json_path] = PropertyField(
-                Property=self._simplify_jsonpath(node.json_path),
-                Value="-",
-                Description=node.description if node.description is not None else "-",
-                Required=str(node.spec.Required).lower() if node.spec is not None and node.spec.Required is not None else "-",
-                UpdateType=node.spec.UpdateType if node.spec is not None and node.spec.UpdateType is not None else "-",
-                Type=self._prop_type_rep(node.spec) if node.spec is not None else "-"
-            )
-            property_fields.update(self._flatten_property_node(node))
-        for nodes in property_node.property_nodes_list.values():
-            for node in nodes:
-                if not node.has_leaves:
-                    continue
-                property_fields[node.json_path] = PropertyField(
-                    Property=self._simplify_jsonpath(node.json_path),
-                    Value="-",
-                    Description=node.description if node.description is not None else "-",
-                    Required=str(node.spec.Required).lower() if node.spec is not None and node.spec.Required is not None else "-",
-                    UpdateType=node.spec.UpdateType if node.spec is not None and node.spec.UpdateType is not None else "-",
-                    Type=self._prop_type_rep(node.spec) if node.spec is not None else "-"
-                )
-                property_fields.update(self._flatten_property_node(node))
-        for nodes in property_node.property_nodes_map.values():
-            for node in nodes.values():
-                if not node.has_leaves:
-                    continue
-                property_fields[node.json_path] = PropertyField(
-                    Property=self._simplify_jsonpath(node.json_path),
-                    Value="-",
-                    Description=node.description if node.description is not None else "-",
-                    Required=str(node.spec.Required).lower() if node.spec is not None and node.spec.Required is not None else "-",
-                    UpdateType=node.spec.UpdateType if node.spec is not None and node.spec.UpdateType is not None else "-",
-                    Type=self._prop_type_rep(node.spec) if node.spec is not None else "-"
-                )
-                property_fields.update(self._flatten_property_node(node))
+    def _leaf_property_field(self, leaf:CfnTemplateResourcePropertyLeaf) -> PropertyField:
+        return PropertyField(
+            Property=self._simplify_jsonpath(leaf.json_path),
+            Value=self._dump_json(leaf.definition),
+            Description=leaf.description if leaf.description is not None else "-",
+            Required=str(leaf.spec.Required).lower() if leaf.spec.Required is not None else "-",
+            UpdateType=leaf.spec.UpdateType if leaf.spec.UpdateType is not None else "-",
+            Type=self._prop_type_rep(leaf.spec)
+        )
 
-        return property_fields
+    def _node_property_field(self, node:CfnTemplateResourcePropertyNode) -> PropertyField:
+        return PropertyField(
+            Property=self._simplify_jsonpath(node.json_path),
+            Value="-",
+            Description=node.description if node.description is not None else "-",
+            Required=str(node.spec.Required).lower() if node.spec is not None and node.spec.Required is not None else "-",
+            UpdateType=node.spec.UpdateType if node.spec is not None and node.spec.UpdateType is not None else "-",
+            Type=self._prop_type_rep(node.spec) if node.spec is not None else "-"
+        )
+
+    def _child_properties(
+        self, property_node:Union[CfnTemplateResourcePropertiesNode, CfnTemplateResourcePropertyNode],
+    ) -> List[Union[CfnTemplateResourcePropertyLeaf, CfnTemplateResourcePropertyNode]]:
+        # properties set in the template by name, items of a list by index, and items of a map by key
+        leaves = property_node.property_leaves
+        if not (property_node.property_nodes or property_node.property_nodes_list or property_node.property_nodes_map):
+            # most nodes have only leaves (e.g. Ebs in AWS::EC2::Instance)
+            return [leaves[name] for name in sorted(leaves) if leaves[name].definition is not None]
+        children:List[Tuple[str, List[Union[CfnTemplateResourcePropertyLeaf, CfnTemplateResourcePropertyNode]]]] = []
+        for name, leaf in leaves.items():
+            if leaf.definition is not None:
+                children.append((name, [leaf]))
+        for name, node in property_node.property_nodes.items():
+            if node.has_leaves:
+                children.append((name, [node]))
+        for name, nodes in property_node.property_nodes_list.items():
+            children.append((name, [node for node in nodes if node.has_leaves]))
+        for name, nodes_map in property_node.property_nodes_map.items():
+            children.append((name, [nodes_map[key] for key in sorted(nodes_map) if nodes_map[key].has_leaves]))
+        if len(children) > 1:
+            children.sort(key=itemgetter(0))
+        return [p for _, properties in children for p in properties]
 
     def _flatten_properties_node(self, properties_node:CfnTemplateResourcePropertiesNode) -> List[PropertyField]:
-        property_fields:Mapping[str, PropertyField] = {}
-
-        # leaves
-        for leaf in properties_node.property_leaves.values():
-            if leaf.definition is None:
-                continue
-            property_fields[leaf.json_path] = PropertyField(
-                Property=self._simplify_jsonpath(leaf.json_path),
-                Value=self._dump_json(leaf.definition),
-                Description=leaf.description if leaf.description is not None else "-",
-                Required=str(leaf.spec.Required).lower() if leaf.spec.Required is not None else "-",
-                UpdateType=leaf.spec.UpdateType if leaf.spec.UpdateType is not None else "-",
-                Type=self._prop_type_rep(leaf.spec)
-            )
-        for node in properties_node.property_nodes.values():
-            if not node.has_leaves:
-                continue
-            property_fields[node.json_path] = PropertyField(
-                Property=self._simplify_jsonpath(node.json_path),
-                Value="-",
-                Description=node.description if node.description is not None else "-",
-                Required=str(node.spec.Required).lower() if node.spec is not None and node.spec.Required is not None else "-",
-                UpdateType=node.spec.UpdateType if node.spec is not None and node.spec.UpdateType is not None else "-",
-                Type=self._prop_type_rep(node.spec) if node.spec is not None else "-"
-            )
-            property_fields.update(self._flatten_property_node(node))
-        for nodes in properties_node.property_nodes_list.values():
-            for node in nodes:
-                if not node.has_leaves:
-                    continue
-                property_fields[node.json_path] = PropertyField(
-                    Property=self._simplify_jsonpath(node.json_path),
-                    Value="-",
-                    Description=node.description if node.description is not None else "-",
-                    Required=str(node.spec.Required).lower() if node.spec is not None and node.spec.Required is not None else "-",
-                    UpdateType=node.spec.UpdateType if node.spec is not None and node.spec.UpdateType is not None else "-",
-                    Type=self._prop_type_rep(node.spec) if node.spec is not None else "-"
-                )
-                property_fields.update(self._flatten_property_node(node))
-        for nodes in properties_node.property_nodes_map.values():
-            for node in nodes.values():
-                if not node.has_leaves:
+        """rows of the properties set in the template, each followed by the rows of its own properties, in one walk of the tree"""
+        property_fields:List[PropertyField] = []
+        leaf_property_field = self._leaf_property_field
+        node_property_field = self._node_property_field
+        # children still to be visited of each node on the way from the root
+        stack = [iter(self._child_properties(properties_node))]
+        while stack:
+            for p in stack[-1]:
+                if type(p) is CfnTemplateResourcePropertyLeaf:
+                    property_fields.append(leaf_property_field(p))
                     continue
-                property_fields[node.json_path] = PropertyField(
-                    Property=self._simplify_jsonpath(node.json_path),
-                    Value="-",
-                    Description=node.description if node.description is not None else "-",
-                    Required=str(node.spec.Required).lower() if node.spec is not None and node.spec.Required is not None else "-",
-                    UpdateType=node.spec.UpdateType if node.spec is not None and node.spec.UpdateType is not None else "-",
-                    Type=self._prop_type_rep(node.spec) if node.spec is not None else "-"
-                )
-                property_fields.update(self._flatten_property_node(node))
-
-        property_fields_tuple = sorted(
-            [(k, v) for k, v in property_fields.items()],
-            key=lambda t: t[0]
-        )
-        property_fields_list = [t[1] for t in property_fields_tuple]
-        return property_fields_list
+                property_fields.append(node_property_field(p))
+                stack.append(iter(self._child_properties(p)))
+                break
+            else:
+                stack.pop()
+        return property_fields
 
     def resources(self, tree:CfnTemplateTree) -> str:
         try:
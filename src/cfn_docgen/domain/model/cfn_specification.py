@@ -1,7 +1,9 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import copy
 import re
-from typing import Mapping, Literal, Optional
+import sys
+from typing import Any, ClassVar, Dict, Generic, Iterable, Iterator, Mapping, Literal, MutableMapping, Optional, Tuple, Type, TypeVar, Union
 from pydantic import BaseModel
 
 from cfn_docgen.config import AppContext
@@ -42,34 +44,353 @@ class CfnSpecificationPropertyType(BaseModel):
     Properties: Optional[Mapping[str, CfnSpecificationProperty]] = None
 
 
+# shared by the compact specs without properties or attributes, instead of an empty dict for each of them. never mutated
+_EMPTY_MAPPING:Mapping[str, Any] = {}
+
+def _restore_compact_spec(cls:Type[CfnSpecificationCompactSpec], values:Tuple[Any, ...]) -> CfnSpecificationCompactSpec:
+    spec = cls.__new__(cls)
+    for name, value in zip(cls.__slots__, values):
+        object.__setattr__(spec, name, value)
+    return spec
+
+class CfnSpecificationCompactSpec:
+    """
+    base of the read-only counterparts of the pydantic spec models used while reading the specification.
+    fields are kept in __slots__ instead of a dict for each instance, and
+    the fields with a few distinct values (e.g. String, List, Mutable) are interned, so that equal values share one string.
+    """
+    __slots__:ClassVar[Tuple[str, ...]] = ()
+    interned_fields:ClassVar[Tuple[str, ...]] = ()
+
+    def __init__(self, **fields:Any) -> None:
+        for name in self.__slots__:
+            value = fields.get(name)
+            if name in self.interned_fields and value is not None:
+                value = sys.intern(value)
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_model(cls, model:BaseModel) -> Any:
+        return cls(**{name: getattr(model, name) for name in cls.__slots__})
+
+    def __setattr__(self, name:str, value:Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name:str) -> None:
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __eq__(self, other:object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None # type: ignore
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__ if getattr(self, name) is not None)
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _restore_compact_spec, (type(self), tuple(getattr(self, name) for name in self.__slots__))
+
+class CfnSpecificationCompactProperty(CfnSpecificationCompactSpec):
+    __slots__ = ("Documentation", "DuplicatesAllowed", "ItemType", "PrimitiveItemType", "PrimitiveType", "Required", "Type", "UpdateType")
+    interned_fields = ("ItemType", "PrimitiveItemType", "PrimitiveType", "Type", "UpdateType")
+    Documentation:Optional[str]
+    DuplicatesAllowed:Optional[bool]
+    ItemType:Optional[str]
+    PrimitiveItemType:Optional[str]
+    PrimitiveType:Optional[str]
+    Required:Optional[bool]
+    Type:Optional[str]
+    UpdateType:Optional[Literal["Conditional", "Immutable", "Mutable"]]
+
+def _compact_properties(properties:Optional[Mapping[str, CfnSpecificationProperty]]) -> Mapping[str, CfnSpecificationCompactProperty]:
+    if not properties:
+        return _EMPTY_MAPPING
+    return {sys.intern(name): CfnSpecificationCompactProperty.from_model(spec) for name, spec in properties.items()}
+
+class CfnSpecificationCompactResourceTypeAttribute(CfnSpecificationCompactSpec):
+    __slots__ = ("ItemType", "PrimitiveItemType", "PrimitiveType", "Type")
+    interned_fields = ("ItemType", "PrimitiveItemType", "PrimitiveType", "Type")
+    ItemType:Optional[str]
+    PrimitiveItemType:Optional[str]
+    PrimitiveType:Optional[str]
+    Type:Optional[str]
+
+class CfnSpecificationCompactResourceType(CfnSpecificationCompactSpec):
+    __slots__ = ("AdditionalProperties", "Attributes", "Documentation", "Properties")
+    AdditionalProperties:Optional[bool]
+    Attributes:Mapping[str, CfnSpecificationCompactResourceTypeAttribute]
+    Documentation:Optional[str]
+    Properties:Mapping[str, CfnSpecificationCompactProperty]
+
+    @classmethod
+    def from_model(cls, model:BaseModel) -> CfnSpecificationCompactResourceType:
+        assert isinstance(model, CfnSpecificationResourceType)
+        return cls(
+            AdditionalProperties=model.AdditionalProperties,
+            Attributes={
+                sys.intern(name): CfnSpecificationCompactResourceTypeAttribute.from_model(attribute)
+                for name, attribute in model.Attributes.items()
+            } if model.Attributes else _EMPTY_MAPPING,
+            Documentation=model.Documentation,
+            Properties=_compact_properties(model.Properties),
+        )
+
+class CfnSpecificationCompactPropertyType(CfnSpecificationCompactSpec):
+    __slots__ = (
+        "Documentation", "DuplicatesAllowed", "ItemType", "PrimitiveType", "PrimitiveItemType",
+        "Required", "Type", "UpdateType", "Properties",
+    )
+    interned_fields = ("ItemType", "PrimitiveType", "PrimitiveItemType", "Type", "UpdateType")
+    Documentation:Optional[str]
+    DuplicatesAllowed:Optional[bool]
+    ItemType:Optional[str]
+    PrimitiveType:Optional[str]
+    PrimitiveItemType:Optional[str]
+    Required:Optional[bool]
+    Type:Optional[str]
+    UpdateType:Optional[Literal["Conditional", "Immutable", "Mutable"]]
+    # None if the property type is not an object, as with the pydantic model
+    Properties:Optional[Mapping[str, CfnSpecificationCompactProperty]]
+
+    @classmethod
+    def from_model(cls, model:BaseModel) -> CfnSpecificationCompactPropertyType:
+        assert isinstance(model, CfnSpecificationPropertyType)
+        fields = {name: getattr(model, name) for name in cls.__slots__}
+        if model.Properties is not None:
+            fields["Properties"] = _compact_properties(model.Properties)
+        return cls(**fields)
+
+COMPACT_SPEC_TYPES:Mapping[Type[BaseModel], Type[CfnSpecificationCompactSpec]] = {
+    CfnSpecificationProperty: CfnSpecificationCompactProperty,
+    CfnSpecificationResourceTypeAttribute: CfnSpecificationCompactResourceTypeAttribute,
+    CfnSpecificationResourceType: CfnSpecificationCompactResourceType,
+    CfnSpecificationPropertyType: CfnSpecificationCompactPropertyType,
+}
+
+def compact_spec(model:BaseModel) -> Any:
+    """compact read-only counterpart of the validated spec model"""
+    return COMPACT_SPEC_TYPES[type(model)].from_model(model)
+
+ResolvedPropertyKind = Literal["Primitive", "List", "Map", "PropertyType"]
+
+@dataclass(eq=False)
+class CfnSpecificationResolvedPropertyType:
+    Spec: CfnSpecificationCompactPropertyType
+    # filled after the instance is registered, because property types can refer to themselves
+    Properties: Dict[str, CfnSpecificationResolvedProperty] = field(default_factory=dict, repr=False)
+
+@dataclass(eq=False)
+class CfnSpecificationResolvedProperty:
+    Spec: CfnSpecificationCompactProperty
+    Kind: ResolvedPropertyKind
+    # property type of the property itself, or of its items for list and map. None if it has no properties to document
+    PropertyType: Optional[CfnSpecificationResolvedPropertyType] = field(default=None, repr=False)
+
+class _PropertyTypeResolver:
+    """link each property of a resource type to the spec of its property type, following the same lookup rules as building the template tree"""
+
+    def __init__(
+        self,
+        resource_type:str,
+        property_specs:Mapping[str, CfnSpecificationCompactPropertyType],
+        context:AppContext,
+    ) -> None:
+        self.resource_type = resource_type
+        self.property_specs = property_specs
+        self.context = context
+        self.resolved:Dict[str, Optional[CfnSpecificationResolvedPropertyType]] = {}
+
+    def resolve_properties(
+        self, properties:Mapping[str, CfnSpecificationCompactProperty], is_resource:bool,
+    ) -> Dict[str, CfnSpecificationResolvedProperty]:
+        resolved_properties:Dict[str, CfnSpecificationResolvedProperty] = {}
+        for name, spec in properties.items():
+            if spec.PrimitiveType is not None or spec.PrimitiveItemType is not None:
+                resolved_properties[name] = CfnSpecificationResolvedProperty(Spec=spec, Kind="Primitive")
+                continue
+            kind:ResolvedPropertyKind = "PropertyType"
+            type_name = spec.Type
+            if spec.ItemType is not None and spec.Type is not None and spec.Type.lower() in ["list", "map"]:
+                kind = "List" if spec.Type.lower() == "list" else "Map"
+                type_name = spec.ItemType
+            # Tag is shared by all resource types. it is looked up for lists of resources and for single nested properties
+            fallback_to_tag = type_name == "Tag" and (
+                (kind == "List" and is_resource) or (kind == "PropertyType" and not is_resource)
+            )
+            try:
+                property_type = self.resolve_property_type(f"{self.resource_type}.{type_name}")
+                if property_type is None and fallback_to_tag:
+                    property_type = self.resolve_property_type("Tag")
+            except Exception:
+                self.context.log_warning(f"failed to resolve property type for property [{name}] of [{self.resource_type}]")
+                property_type = None
+            resolved_properties[name] = CfnSpecificationResolvedProperty(Spec=spec, Kind=kind, PropertyType=property_type)
+        return resolved_properties
+
+    def resolve_property_type(self, property_type:str) -> Optional[CfnSpecificationResolvedPropertyType]:
+        fullname = CfnSpecificationPropertyTypeName(property_type, self.context).fullname
+        if fullname in self.resolved:
+            return self.resolved[fullname]
+        spec = self.property_specs.get(fullname)
+        if spec is None or spec.Properties is None:
+            self.resolved[fullname] = None
+            return None
+        resolved = CfnSpecificationResolvedPropertyType(Spec=spec)
+        self.resolved[fullname] = resolved
+        resolved.Properties.update(self.resolve_properties(spec.Properties, is_resource=False))
+        return resolved
+
 @dataclass
 class CfnSpecificationForResource:
-    ResourceSpec: CfnSpecificationResourceType
-    PropertySpecs: Mapping[str, CfnSpecificationPropertyType]
+    ResourceSpec: CfnSpecificationCompactResourceType
+    PropertySpecs: Mapping[str, CfnSpecificationCompactPropertyType]
+    # properties of the resource linked to their property types. may refer to themselves, so not compared
+    ResolvedProperties: Mapping[str, CfnSpecificationResolvedProperty] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def resolve(
+        cls,
+        resource_type:str,
+        resource_spec:CfnSpecificationCompactResourceType,
+        property_specs:Mapping[str, CfnSpecificationCompactPropertyType],
+        context:AppContext,
+    ) -> CfnSpecificationForResource:
+        """build specs for the resource with the graph of its property types resolved in advance"""
+        resolver = _PropertyTypeResolver(resource_type, property_specs, context)
+        return cls(
+            ResourceSpec=resource_spec,
+            PropertySpecs=property_specs,
+            ResolvedProperties=resolver.resolve_properties(resource_spec.Properties, is_resource=True),
+        )
+
+SpecType = TypeVar("SpecType", bound=BaseModel)
+
+class CfnSpecificationLazyMapping(MutableMapping[str, SpecType], Generic[SpecType]):
+    """
+    mapping which keeps entries as parsed json and validates each of them at the first access.
+    if compact, each validated entry is kept and returned as its compact spec instead
+    """
+
+    def __init__(self, spec_type:Type[SpecType], entries:Dict[str, Any], compact:bool=False) -> None:
+        self.spec_type = spec_type
+        self.entries:Dict[str, Any] = entries
+        self.compact = compact
+
+    def validate(self, entry:Any) -> SpecType:
+        return self.spec_type(**entry)
+
+    def __getitem__(self, key:str) -> SpecType:
+        entry = self.entries[key]
+        if isinstance(entry, CfnSpecificationCompactSpec) or (isinstance(entry, self.spec_type) and not self.compact):
+            return entry # type: ignore
+        if not isinstance(entry, self.spec_type):
+            entry = self.validate(entry)
+        if self.compact:
+            entry = compact_spec(entry)
+        self.entries[key] = entry
+        return entry
+
+    def compacted(self) -> CfnSpecificationLazyMapping[SpecType]:
+        """the same mapping which keeps compact specs. it shares the entries, so the original one must not be used any more"""
+        mapping = copy.copy(self)
+        mapping.compact = True
+        return mapping
+
+    def __setitem__(self, key:str, value:SpecType) -> None:
+        self.entries[key] = value
+
+    def __delitem__(self, key:str) -> None:
+        del self.entries[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key:object) -> bool:
+        return key in self.entries
 
 class CfnSpecification(BaseModel):
     ResourceSpecificationVersion: str
     ResourceTypes: Mapping[str, CfnSpecificationResourceType]
     PropertyTypes: Mapping[str, CfnSpecificationPropertyType]
 
+    @classmethod
+    def lazy(cls, data:Mapping[str, Any]) -> CfnSpecification:
+        """build specification without validating its resource types and property types until they are accessed"""
+        return cls.model_construct(
+            ResourceSpecificationVersion=data["ResourceSpecificationVersion"],
+            ResourceTypes=CfnSpecificationLazyMapping(CfnSpecificationResourceType, data["ResourceTypes"]),
+            PropertyTypes=CfnSpecificationLazyMapping(CfnSpecificationPropertyType, data["PropertyTypes"]),
+        )
+
+    @classmethod
+    def from_entries(cls, entries:Iterable[Tuple[str, Optional[str], Any]]) -> CfnSpecification:
+        """
+        build specification validating its resource types and property types one by one as they come,
+        e.g. from a streaming json parser, instead of from the whole parsed json.
+        each entry is (top level key, resource type or property type name, value)
+        """
+        fields:Dict[str, Any] = {}
+        spec_types:Mapping[str, Type[BaseModel]] = {
+            "ResourceTypes": CfnSpecificationResourceType,
+            "PropertyTypes": CfnSpecificationPropertyType,
+        }
+        for key, name, value in entries:
+            if name is not None and key in spec_types:
+                fields.setdefault(key, {})[name] = spec_types[key](**value)
+            else:
+                fields[key] = value
+        return cls(**fields)
+
     def merge_with_custom_specification(
         self,
         custom_specification:CfnSpecification,
         context:AppContext,
     ) -> None:
-        for resource_type, resource_spec in custom_specification.ResourceTypes.items():
-            if self.ResourceTypes.get(resource_type, None):
-                context.log_debug(f"overwrite resource type [{resource_type}] with custom one")
-            else:
-                context.log_debug(f"add custom resource type [{resource_type}]")
-            self.ResourceTypes[resource_type] = resource_spec # type: ignore
+        _merge_specs(self.ResourceTypes, custom_specification.ResourceTypes, "resource type", context) # type: ignore
+        _merge_specs(self.PropertyTypes, custom_specification.PropertyTypes, "property type", context) # type: ignore
 
-        for property_type, property_spec in custom_specification.PropertyTypes.items():
-            if self.PropertyTypes.get(property_type, None):
-                context.log_debug(f"overwrite property type [{property_type}] with custom one")
-            else:
-                context.log_debug(f"add custom property type [{property_type}]")
-            self.PropertyTypes[property_type] = property_spec # type: ignore
+def _merge_specs(specs:MutableMapping[str, Any], custom_specs:Mapping[str, Any], kind:str, context:AppContext):
+    for name, spec in custom_specs.items():
+        if name in specs:
+            context.log_debug(f"overwrite {kind} [{name}] with custom one")
+        else:
+            context.log_debug(f"add custom {kind} [{name}]")
+        specs[name] = spec
+
+def _compact_specs(specs:Mapping[str, BaseModel]) -> MutableMapping[str, Any]:
+    if isinstance(specs, CfnSpecificationLazyMapping):
+        # keep it lazy, and compact each entry at its first access instead
+        return specs.compacted() # type: ignore
+    return {name: compact_spec(spec) for name, spec in specs.items()}
+
+@dataclass
+class CfnSpecificationCompact:
+    """specification made of compact specs to be read by the repository. CfnSpecification stays the schema to validate specifications"""
+    ResourceSpecificationVersion:str
+    ResourceTypes:MutableMapping[str, CfnSpecificationCompactResourceType]
+    PropertyTypes:MutableMapping[str, CfnSpecificationCompactPropertyType]
+
+    @classmethod
+    def from_specification(cls, specification:CfnSpecification) -> CfnSpecificationCompact:
+        return cls(
+            ResourceSpecificationVersion=specification.ResourceSpecificationVersion,
+            ResourceTypes=_compact_specs(specification.ResourceTypes),
+            PropertyTypes=_compact_specs(specification.PropertyTypes),
+        )
+
+    def merge_with_custom_specification(
+        self,
+        custom_specification:CfnSpecificationCompact,
+        context:AppContext,
+    ) -> None:
+        _merge_specs(self.ResourceTypes, custom_specification.ResourceTypes, "resource type", context)
+        _merge_specs(self.PropertyTypes, custom_specification.PropertyTypes, "property type", context)
 
 class CfnSpecificationResourceTypeName:
     fullname:str
@@ -1,15 +1,19 @@
 from __future__ import annotations
 from collections import defaultdict
+from concurrent.futures import Executor, Future
 from dataclasses import dataclass
+import functools
 import itertools
-import json
+import logging
 import os
+import re
 from jsonpath_ng import parse # type: ignore
 
-from typing import Any, List, Literal, Mapping, Optional, Union, cast
-from pydantic import BaseModel, Field, PositiveInt, field_validator
-from cfn_docgen.config import AppContext
-from cfn_docgen.domain.model.cfn_specification import CfnSpecificationForResource, CfnSpecificationProperty, CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName, CfnSpecificationPropertyType
+from typing import Any, Dict, Iterable, List, Literal, Mapping, Optional, Tuple, Union, cast
+from pydantic import BaseModel, Field, PositiveInt, PrivateAttr, field_validator
+from cfn_docgen import json_backend
+from cfn_docgen.config import AppConfig, AppContext, AppContextLogMessage
+from cfn_docgen.domain.model.cfn_specification import CfnSpecificationCompactProperty, CfnSpecificationForResource, CfnSpecificationResolvedProperty, CfnSpecificationResourceTypeName
 
 from cfn_docgen.domain.ports.cfn_specification_repository import ICfnSpecificationRepository
 
@@ -106,9 +110,37 @@ class CfnTemplateRuleDefinition(BaseModel):
 # class CfnTemplateMappingDefinition(BaseModel):
 #     """based on https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/mappings-section-structure.html"""
 
+# field names which jsonpath_ng parses as a plain field (not a reserved word, a number, a wildcard, ...)
+JSON_PATH_FIELD = r"(?!(?:where|wherenot)(?![A-Za-z0-9_\-]))[A-Za-z_][A-Za-z0-9_\-]*"
+SIMPLE_JSON_PATH_FIELD = re.compile(JSON_PATH_FIELD)
+# json paths made of plain fields and list indexes only, e.g. $.BlockDeviceMappings[0].Ebs.VolumeType
+SIMPLE_JSON_PATH = re.compile(rf"\$(?:\.{JSON_PATH_FIELD}|\[[0-9]+\])*")
+
+JSON_PATH_INDEX = re.compile(r"\[[0-9]+\]")
+
+def flatten_property_descriptions(properties:Mapping[str, Any]) -> Mapping[str, Any]:
+    """values (other than dicts and lists) in Metadata.CfnDocgen.Properties by their simple json paths"""
+    descriptions:Dict[str, Any] = {}
+    stack:List[Tuple[str, Any]] = [("$", properties)]
+    while stack:
+        json_path, value = stack.pop()
+        if isinstance(value, dict):
+            for key, child in cast(Mapping[Any, Any], value).items():
+                # keys which are not plain fields are never looked up here, and must not collide with nested paths
+                if isinstance(key, str) and SIMPLE_JSON_PATH_FIELD.fullmatch(key) is not None:
+                    stack.append((f"{json_path}.{key}", child))
+        elif isinstance(value, list):
+            for i, child in enumerate(cast(List[Any], value)):
+                stack.append((f"{json_path}[{i}]", child))
+        else:
+            descriptions[json_path] = value
+    return descriptions
+
 class CfnTemplateResourceMetadataCfnDocgenDefinition(BaseModel):
     Description: Optional[str] = None
     Properties: Optional[Mapping[str, Any]] = None
+    # built on the first lookup, once per resource
+    _property_descriptions: Optional[Mapping[str, Any]] = PrivateAttr(default=None)
 
 
     def get_resource_description(self, ) -> Optional[str]:
@@ -117,6 +149,19 @@ class CfnTemplateResourceMetadataCfnDocgenDefinition(BaseModel):
     def get_property_description_by_json_path(self, json_path:str) -> Optional[str]:
         if self.Properties is None:
             return None
+        if SIMPLE_JSON_PATH.fullmatch(json_path) is not None:
+            if self._property_descriptions is None:
+                self._property_descriptions = flatten_property_descriptions(self.Properties)
+            if json_path in self._property_descriptions:
+                description = self._property_descriptions[json_path]
+                return description if isinstance(description, str) else None
+            # jsonpath_ng indexes into strings (and fails on numbers), e.g. $.Tags[0] for "Tags": "tags"
+            if not any(
+                json_path[:index.start()] in self._property_descriptions
+                for index in JSON_PATH_INDEX.finditer(json_path)
+            ):
+                return None
+        # paths with map keys such as "aws:cdk:path" or "1a", which jsonpath_ng parses in its own way (or fails to)
         jsonpath_expr = parse(json_path) # type: ignore
         descriptions:List[Any] = [f.value for f in jsonpath_expr.find(self.Properties)] # type: ignore
         if len(descriptions) != 1:
@@ -177,13 +222,21 @@ class CfnTemplateDefinition(BaseModel):
     Outputs: Mapping[str, CfnTemplateOutputDefinition] = {}
 
     @classmethod
-    def from_string(cls, template:str, context:AppContext) -> CfnTemplateDefinition:
+    def from_string(cls, template:Union[str, bytes], context:AppContext) -> CfnTemplateDefinition:
         try:
-            return CfnTemplateDefinition(**json.loads(template))
+            return CfnTemplateDefinition(**json_backend.loads(template))
         except Exception as ex:
             context.log_error(f"failed to instanciate CfnTemplateDefinition from string. {str(ex)}")
             raise ex
 
+    @classmethod
+    def from_dict(cls, template:Mapping[str, Any], context:AppContext) -> CfnTemplateDefinition:
+        try:
+            return CfnTemplateDefinition(**template)
+        except Exception as ex:
+            context.log_error(f"failed to instanciate CfnTemplateDefinition from dict. {str(ex)}")
+            raise ex
+
     def __get_cfn_docgen(self) -> Optional[CfnTemplateMetadataCfnDocgenDefinition]:
         metadata = self.Metadata
         if metadata is None:
@@ -294,11 +347,15 @@ class CfnTemplateParameterGroupNode:
                 continue
 
 class CfnTemplateParameterLeaf:
+    __slots__ = ("definition",)
+
     def __init__(self, definition:CfnTemplateParameterDefinition) -> None:
         self.definition = definition
 
 
 class CfnTemplateMappingLeaf:
+    __slots__ = ("definition", "description")
+
     def __init__(
         self, 
         definition:Mapping[str, Mapping[str, Any]],
@@ -326,6 +383,8 @@ class CfnTemplateMappingsNode:
                 continue
 
 class CfnTemplateConditionLeaf:
+    __slots__ = ("definition", "descirption")
+
     def __init__(
         self,
         definition: Mapping[str, Any],
@@ -353,6 +412,8 @@ class CfnTemplateConditionsNode:
                 continue
 
 class CfnTemplateRuleLeaf:
+    __slots__ = ("definition", "description")
+
     def __init__(
         self,
         definition: CfnTemplateRuleDefinition,
@@ -380,11 +441,33 @@ class CfnTemplateRulesNode:
                 context.log_warning(f"failed to build CfnTemplateRuleLeaf for rule [{name}]")
                 continue
 
+# shared by the property nodes without child nodes or leaves, instead of four empty dicts for each of them.
+# never mutated, since build_property_node sets new dicts on the nodes it adds children to
+_EMPTY_MAPPING:Mapping[str, Any] = {}
+
+def properties_to_build(
+    resolved_properties:Mapping[str, CfnSpecificationResolvedProperty],
+    definitions:Any,
+    resource_info:ResourceInfo,
+) -> Iterable[Tuple[str, CfnSpecificationResolvedProperty]]:
+    if not resource_info.sparse:
+        return resolved_properties.items()
+    # walk the definitions instead of the spec, which has many more properties than the template sets
+    if not isinstance(definitions, dict):
+        return []
+    return [
+        (property_name, resolved_properties[property_name])
+        for property_name in cast(Mapping[str, Any], definitions)
+        if property_name in resolved_properties
+    ]
+
 class CfnTemplateResourcePropertyLeaf:
+    __slots__ = ("definition", "spec", "description", "json_path")
+
     def __init__(
         self,
         definition:Optional[CfnTemplateResourcePropertyDefinition],
-        property_spec:CfnSpecificationProperty,
+        property_spec:CfnSpecificationCompactProperty,
         description:Optional[str],
         json_path:str,
     ) -> None:
@@ -405,37 +488,35 @@ class CfnTemplateResourcePropertyLeaf:
         return "-"
 
 class CfnTemplateResourcePropertyNode:
+    __slots__ = ("property_nodes", "property_nodes_map", "property_nodes_list", "property_leaves", "description", "json_path", "spec", "has_leaves")
+
     def __init__(
         self,
         definitions:Optional[CfnTemplateResourcePropertyDefinition],
-        resource_property_spec:Optional[CfnSpecificationProperty],
+        resource_property_spec:Optional[CfnSpecificationCompactProperty],
         description:Optional[str],
-        properties_spec:Mapping[str, CfnSpecificationProperty],
         json_path:str,
-        cfn_docgen_metadata:Optional[CfnTemplateResourceMetadataCfnDocgenDefinition],
-        property_specs:Mapping[str, CfnSpecificationPropertyType],
-        resource_info:ResourceInfo,
-        context:AppContext,
     ) -> None:
+        # nodes and leaves under it are built by build_property_nodes, which sets new dicts for them
         self.property_nodes:Mapping[
             str, # e.g. CpuOptions in AWS::EC2::Instance
             CfnTemplateResourcePropertyNode # its node
-        ] = {}
+        ] = _EMPTY_MAPPING
         self.property_nodes_map:Mapping[
             str, # e.g. CustomResponseBodies in AWS::WAFv2::WebACL
             Mapping[
                 str, # its key
                 CfnTemplateResourcePropertyNode # its node
             ]
-        ] = {}
+        ] = _EMPTY_MAPPING
         self.property_nodes_list:Mapping[
             str, # e.g. BlockDeviceMappings in AWS::EC2::Instance
             List[CfnTemplateResourcePropertyNode] # its list of node
-        ] = {}
+        ] = _EMPTY_MAPPING
         self.property_leaves:Mapping[
             str, # e.g. ImageId in AWS::EC2::Instance
             CfnTemplateResourcePropertyLeaf # its definition
-        ] = {}
+        ] = _EMPTY_MAPPING
 
         self.description = description
         self.json_path = json_path
@@ -443,164 +524,11 @@ class CfnTemplateResourcePropertyNode:
         self.has_leaves = definitions is not None
 
 
-        for property_name, property_spec in properties_spec.items():
-            try:
-                if (
-                    property_spec.PrimitiveType is not None 
-                    or property_spec.PrimitiveItemType is not None
-                ):
-                # e.g. CoreCount in AWS::EC2::Instance.CpuOptions (string primitive type)
-                # or Value in AWS::EC2::Instance.AssociationParameter (list of string primitive item type)
-                # or Options in AWS::ECS::Service.LogConfiguration (map of string primitive item type)
-                    definition:Any = None
-                    if definitions is not None and isinstance(definitions, dict):
-                        definition = cast(Mapping[str, CfnTemplateResourcePropertyDefinition], definitions).get(property_name, None)
-                    prop_json_path = f"{self.json_path}.{property_name}"
-                    description = cfn_docgen_metadata.get_property_description_by_json_path(
-                        json_path=prop_json_path,
-                    ) if cfn_docgen_metadata is not None else None
-                    if resource_info.is_recursive and definition is None:
-                        continue
-                    self.property_leaves[property_name] = CfnTemplateResourcePropertyLeaf(
-                        definition=definition,
-                        property_spec=property_spec,
-                        description=description,
-                        json_path=prop_json_path,
-                    )
-                    continue
-            except Exception:
-                context.log_warning(f"failed to build CfnTemplateResourcePropertyLeaf for property [{property_name}]")
-                continue
-
-            try:
-
-                if property_spec.ItemType is not None:
-                    if (
-                        property_spec.Type is not None
-                        and property_spec.Type.lower() == "list"
-                    ):
-                    # e.g. AssociationParameters in AWS::EC2::Instance.SsmAssociation
-                        _property_spec = property_specs.get(
-                            CfnSpecificationPropertyTypeName(f"{resource_info.type}.{property_spec.ItemType}", context).fullname
-                        )
-                        if _property_spec is None or _property_spec.Properties is None:
-                            continue
-                        definition_list:List[Any] = []
-                        if definitions is not None and isinstance(definitions, dict):
-                            definition_list = cast(Mapping[str, List[Any]], definitions).get(property_name, [None])
-                        if definitions is None:
-                            definition_list = [None]
-                        if not isinstance(definition_list, list): # type: ignore
-                            raise ValueError
-                        property_nodes_list:List[CfnTemplateResourcePropertyNode] = []
-                        for i, definition in enumerate(definition_list):
-                            # prop_name is Key, Value, ...
-                            prop_json_path = f"{self.json_path}.{property_name}[{i}]"
-                            description = cfn_docgen_metadata.get_property_description_by_json_path(
-                                json_path=prop_json_path,
-                            ) if cfn_docgen_metadata is not None else None
-                            if resource_info.is_recursive and definition is None:
-                                continue
-                            property_nodes_list.append(CfnTemplateResourcePropertyNode(
-                                definitions=definition,
-                                resource_property_spec=property_spec,
-                                description=description,
-                                json_path=prop_json_path,
-                                properties_spec=_property_spec.Properties,
-                                property_specs=property_specs,
-                                cfn_docgen_metadata=cfn_docgen_metadata,
-                                resource_info=resource_info,
-                                context=context,
-                            ))
-                        self.property_nodes_list[property_name] = property_nodes_list.copy()
-                        continue
-
-                    if (
-                        property_spec.Type is not None
-                        and property_spec.Type.lower() == "map"
-                    ):
-                    # e.g. RequestBodyAssociatedResourceTypeConfig in AWS::WAFv2::WebACL.AssociationConfig
-                        
-                        _property_spec = property_specs.get(
-                            CfnSpecificationPropertyTypeName(f"{resource_info.type}.{property_spec.ItemType}", context).fullname
-                        )
-                        if _property_spec is None or _property_spec.Properties is None:
-                            continue
-                        definition_map:Mapping[str, Any] = {}
-                        if definitions is not None and isinstance(definitions, dict):
-                            definition_map = cast(Mapping[str, Mapping[str, Any]], definitions).get(property_name, {"key": None})
-                        if definitions is None:
-                            definition_map = {"key": None}
-                        if not isinstance(definition_map, dict): # type: ignore
-                            raise ValueError
-                        property_nodes_map:Mapping[str, CfnTemplateResourcePropertyNode] = {}
-                        for key, definition in definition_map.items():
-                            # prop_name is DefaultSizeInspectionLimit, ...
-                            prop_json_path = f"{self.json_path}.{property_name}.{key}"
-                            description = cfn_docgen_metadata.get_property_description_by_json_path(
-                                json_path=prop_json_path
-                            ) if cfn_docgen_metadata is not None else None
-                            if resource_info.is_recursive and definition is None:
-                                continue
-                            property_nodes_map[key] = CfnTemplateResourcePropertyNode(
-                                definitions=definition,
-                                resource_property_spec=property_spec,
-                                properties_spec=_property_spec.Properties,
-                                property_specs=property_specs,
-                                description=description,
-                                json_path=prop_json_path,
-                                cfn_docgen_metadata=cfn_docgen_metadata,
-                                resource_info=resource_info,
-                                context=context,
-                            )
-                        self.property_nodes_map[property_name] = property_nodes_map.copy()
-                        continue
-
-                # the rest is e.g. Ebs in AWS::EC2::Instance.BlockDeviceMapping
-                _property_spec = property_specs.get(
-                    CfnSpecificationPropertyTypeName(f"{resource_info.type}.{property_spec.Type}", context).fullname
-                )
-                if _property_spec is None and property_spec.Type == "Tag":
-                    _property_spec = property_specs.get(
-                        CfnSpecificationPropertyTypeName(property_spec.Type, context).fullname
-                    )
-                if _property_spec is None or _property_spec.Properties is None:
-                    continue
-                definition:Any = None
-                if definitions is not None and isinstance(definitions, dict):
-                    definition = cast(Mapping[str, Any], definitions).get(property_name, None)
-                prop_json_path = f"{self.json_path}.{property_name}"
-                description = cfn_docgen_metadata.get_property_description_by_json_path(
-                    json_path=prop_json_path
-                ) if cfn_docgen_metadata is not None else None
-                if resource_info.is_recursive and definition is None:
-                    continue
-                self.property_nodes[property_name] = CfnTemplateResourcePropertyNode(
-                    definitions=definition,
-                    resource_property_spec=property_spec,
-                    properties_spec=_property_spec.Properties,
-                    property_specs=property_specs,
-                    cfn_docgen_metadata=cfn_docgen_metadata,
-                    resource_info=resource_info,
-                    json_path=prop_json_path,
-                    description=description,
-                    context=context,
-                )
-                continue
-            except RecursionError as ex:
-                context.log_error(f"failed to build CfnTemplateResourcePropertyNode for recursive property [{property_name}]")
-                raise ex
-            except Exception:
-                context.log_warning(f"failed to build CfnTemplateResourcePropertyNode for property [{property_name}]")
-                continue
-
-
 class CfnTemplateResourcePropertiesNode:
     def __init__(
         self,
         definitions:Mapping[str, CfnTemplateResourcePropertyDefinition],
-        resource_property_specs:Mapping[str, CfnSpecificationProperty],
-        property_specs:Mapping[str, CfnSpecificationPropertyType],
+        resolved_properties:Mapping[str, CfnSpecificationResolvedProperty],
         cfn_docgen_metadata:Optional[CfnTemplateResourceMetadataCfnDocgenDefinition],
         resource_info:ResourceInfo,
         context:AppContext,
@@ -609,164 +537,269 @@ class CfnTemplateResourcePropertiesNode:
         self.property_nodes:Mapping[
             str, # e.g. CpuOptions in AWS::EC2::Instance
             CfnTemplateResourcePropertyNode # its node
-        ] = {}
+        ] = _EMPTY_MAPPING
         self.property_nodes_map:Mapping[
             str, # e.g. CustomResponseBodies in AWS::WAFv2::WebACL
             Mapping[
                 str, # its key
                 CfnTemplateResourcePropertyNode # its node
             ]
-        ] = {}
+        ] = _EMPTY_MAPPING
         self.property_nodes_list:Mapping[
             str, # e.g. BlockDeviceMappings in AWS::EC2::Instance
             List[CfnTemplateResourcePropertyNode] # its list of node
-        ] = {}
+        ] = _EMPTY_MAPPING
 
         self.property_leaves:Mapping[
             str, # e.g. ImageId in AWS::EC2::Instance
             CfnTemplateResourcePropertyLeaf # its definition
-        ] = {}
+        ] = _EMPTY_MAPPING
 
         self.json_path = "$"
 
-        for property_name, resource_property_spec in resource_property_specs.items():
-        # property_name is like ImageId, BlockDeviceMappings, CpuOptions, ... in AWS::EC2::Instance
+        build_property_nodes(
+            properties_node=self,
+            definitions=definitions,
+            resolved_properties=resolved_properties,
+            cfn_docgen_metadata=cfn_docgen_metadata,
+            resource_info=resource_info,
+            context=context,
+        )
+
+# a node whose nodes and leaves are still to be built, with its definitions, the properties of its type, and its depth
+PropertyNodeToBuild = Tuple[
+    Union[CfnTemplateResourcePropertiesNode, CfnTemplateResourcePropertyNode],
+    Any,
+    Mapping[str, CfnSpecificationResolvedProperty],
+    int,
+]
 
-            try:
-                if (
-                    resource_property_spec.PrimitiveType is not None 
-                    or resource_property_spec.PrimitiveItemType is not None
-                ):
-                # e.g. ImageId in AWS::EC2::Instance (string primitive type)
-                # or SecurityGroupIds in AWS::EC2::Instance (list of string primitive item type)
-                # or Tags in AWS::MSK::Cluster (map of string primitive item type)
-                    definition = definitions.get(property_name, None)
-                    prop_json_path = f"{self.json_path}.{property_name}"
+# property nodes without definitions by resource type and json path, shared between resources of the same type
+SharedPropertyNodes = Dict[Tuple[str, str], CfnTemplateResourcePropertyNode]
+
+def child_property_node(
+    definition:Any,
+    property_spec:CfnSpecificationCompactProperty,
+    description:Optional[str],
+    json_path:str,
+    resolved_properties:Mapping[str, CfnSpecificationResolvedProperty],
+    depth:int,
+    shared_property_nodes:Optional[SharedPropertyNodes],
+    resource_type:str,
+) -> Tuple[CfnTemplateResourcePropertyNode, List[PropertyNodeToBuild]]:
+    """a new node and itself to be built, or the node already built for the same json path of the resource type if neither of them has definitions.
+    a subtree without definitions (and descriptions) depends only on the spec of the resource type, so it is built once and shared."""
+    if shared_property_nodes is None or definition is not None or description is not None:
+        property_node = CfnTemplateResourcePropertyNode(
+            definitions=definition,
+            resource_property_spec=property_spec,
+            description=description,
+            json_path=json_path,
+        )
+        return property_node, [(property_node, definition, resolved_properties, depth)]
+    key = (resource_type, json_path)
+    if key in shared_property_nodes:
+        return shared_property_nodes[key], []
+    property_node = CfnTemplateResourcePropertyNode(
+        definitions=None,
+        resource_property_spec=property_spec,
+        description=None,
+        json_path=json_path,
+    )
+    shared_property_nodes[key] = property_node
+    return property_node, [(property_node, None, resolved_properties, depth)]
+
+def build_property_nodes(
+    properties_node:CfnTemplateResourcePropertiesNode,
+    definitions:Mapping[str, CfnTemplateResourcePropertyDefinition],
+    resolved_properties:Mapping[str, CfnSpecificationResolvedProperty],
+    cfn_docgen_metadata:Optional[CfnTemplateResourceMetadataCfnDocgenDefinition],
+    resource_info:ResourceInfo,
+    context:AppContext,
+):
+    """build the whole tree of property nodes and leaves under properties_node.
+    nodes are built from an explicit stack in the same order as recursive calls would, so nested property types (e.g. rule statements of AWS::WAFv2::WebACL) never grow the call stack,
+    and nodes deeper than resource_info.max_depth are not built."""
+    stack:List[PropertyNodeToBuild] = [(properties_node, definitions, resolved_properties, 0)]
+    while stack:
+        node, node_definitions, node_resolved_properties, depth = stack.pop()
+        children = build_property_node(
+            node=node,
+            definitions=node_definitions,
+            resolved_properties=node_resolved_properties,
+            depth=depth,
+            cfn_docgen_metadata=cfn_docgen_metadata,
+            resource_info=resource_info,
+            context=context,
+        )
+        stack.extend(reversed(children))
+
+def build_property_node(
+    node:Union[CfnTemplateResourcePropertiesNode, CfnTemplateResourcePropertyNode],
+    definitions:Any,
+    resolved_properties:Mapping[str, CfnSpecificationResolvedProperty],
+    depth:int,
+    cfn_docgen_metadata:Optional[CfnTemplateResourceMetadataCfnDocgenDefinition],
+    resource_info:ResourceInfo,
+    context:AppContext,
+) -> List[PropertyNodeToBuild]:
+    """build leaves of the node, and its child nodes without their nodes and leaves, which are returned to be built next"""
+    children:List[PropertyNodeToBuild] = []
+    # None if the template does not set the properties of the node (or sets something other than an object)
+    property_definitions = cast(Mapping[str, Any], definitions) if isinstance(definitions, dict) else None
+    defined_only = resource_info.defined_only
+    # nodes without definitions are shared unless descriptions in the metadata may be set on them
+    shared_property_nodes = resource_info.shared_property_nodes if (
+        cfn_docgen_metadata is None or not cfn_docgen_metadata.Properties
+    ) else None
+    # set on the node only if they are not empty, so that nodes without children keep sharing _EMPTY_MAPPING
+    property_leaves:Dict[str, CfnTemplateResourcePropertyLeaf] = {}
+    property_nodes:Dict[str, CfnTemplateResourcePropertyNode] = {}
+    property_nodes_list:Dict[str, List[CfnTemplateResourcePropertyNode]] = {}
+    property_nodes_map:Dict[str, Mapping[str, CfnTemplateResourcePropertyNode]] = {}
+    for property_name, resolved_property in properties_to_build(resolved_properties, definitions, resource_info):
+    # property_name is like ImageId, BlockDeviceMappings, CpuOptions, ... in AWS::EC2::Instance
+        property_spec = resolved_property.Spec
+        try:
+            if resolved_property.Kind == "Primitive":
+            # e.g. ImageId in AWS::EC2::Instance (string primitive type)
+            # or SecurityGroupIds in AWS::EC2::Instance (list of string primitive item type)
+            # or Tags in AWS::MSK::Cluster (map of string primitive item type)
+                definition:Any = None
+                if property_definitions is not None:
+                    definition = property_definitions.get(property_name, None)
+                prop_json_path = f"{node.json_path}.{property_name}"
+                description = cfn_docgen_metadata.get_property_description_by_json_path(
+                    json_path=prop_json_path,
+                ) if cfn_docgen_metadata is not None else None
+                if defined_only and definition is None:
+                    continue
+                property_leaves[property_name] = CfnTemplateResourcePropertyLeaf(
+                    definition=definition,
+                    property_spec=property_spec,
+                    description=description,
+                    json_path=prop_json_path,
+                )
+                continue
+        except Exception:
+            context.log_warning(f"failed to build CfnTemplateResourcePropertyLeaf for property [{property_name}]")
+            continue
+
+        try:
+            # property type is resolved in advance. None if it has nothing to document
+            property_type = resolved_property.PropertyType
+            if property_type is None:
+                continue
+            if depth >= resource_info.max_depth:
+                if property_definitions is not None and property_name in property_definitions:
+                    context.log_warning(f"property [{node.json_path}.{property_name}] is nested deeper than {resource_info.max_depth} levels, and is not built")
+                continue
+
+            if resolved_property.Kind == "List":
+            # e.g. BlockDeviceMappings in AWS::EC2::Instance
+                definition_list:List[Any] = []
+                if property_definitions is not None:
+                    definition_list = property_definitions.get(property_name, [None])
+                if definitions is None:
+                    definition_list = [None]
+                if not isinstance(definition_list, list): # type: ignore
+                    raise ValueError
+                list_nodes:List[CfnTemplateResourcePropertyNode] = []
+                list_children:List[PropertyNodeToBuild] = []
+                for i, definition in enumerate(definition_list):
+                    # prop_name is DeviceName, Ebs, ...
+                    prop_json_path = f"{node.json_path}.{property_name}[{i}]"
                     description = cfn_docgen_metadata.get_property_description_by_json_path(
                         json_path=prop_json_path,
                     ) if cfn_docgen_metadata is not None else None
-                    if resource_info.is_recursive and definition is None:
+                    if defined_only and definition is None:
                         continue
-                    self.property_leaves[property_name] = CfnTemplateResourcePropertyLeaf(
+                    property_node, to_build = child_property_node(
                         definition=definition,
-                        property_spec=resource_property_spec,
+                        property_spec=property_spec,
                         description=description,
                         json_path=prop_json_path,
+                        resolved_properties=property_type.Properties,
+                        depth=depth+1,
+                        shared_property_nodes=shared_property_nodes,
+                        resource_type=resource_info.type,
                     )
-                    continue
-            except Exception:
-                context.log_warning(f"failed to build CfnTemplateResourcePropertyLeaf for property [{property_name}]")
+                    list_nodes.append(property_node)
+                    list_children.extend(to_build)
+                property_nodes_list[property_name] = list_nodes.copy()
+                children.extend(list_children)
                 continue
 
-            try:
-                if resource_property_spec.ItemType is not None:
-                    if (
-                        resource_property_spec.Type is not None
-                        and resource_property_spec.Type.lower() == "list"
-                    ):
-                    # e.g. BlockDeviceMappings in AWS::EC2::Instance
-                        property_spec = property_specs.get(
-                            CfnSpecificationPropertyTypeName(f"{resource_info.type}.{resource_property_spec.ItemType}", context).fullname
-                        )
-                        if property_spec is None and resource_property_spec.ItemType == "Tag":
-                            property_spec = property_specs.get(
-                                CfnSpecificationPropertyTypeName(resource_property_spec.ItemType, context).fullname
-                            )
-                        if property_spec is None or property_spec.Properties is None:
-                            continue
-                        definition_list = definitions.get(property_name, [None])
-                        if not isinstance(definition_list, list):
-                            raise ValueError
-                        property_nodes_list:List[CfnTemplateResourcePropertyNode] = []
-                        for i, definition in enumerate(definition_list):
-                            # prop_name is DeviceName, Ebs, ...
-                            prop_json_path = f"{self.json_path}.{property_name}[{i}]"
-                            description = cfn_docgen_metadata.get_property_description_by_json_path(
-                                json_path=prop_json_path,
-                            ) if cfn_docgen_metadata is not None else None
-                            if resource_info.is_recursive and definition is None:
-                                continue
-                            property_nodes_list.append(CfnTemplateResourcePropertyNode(
-                                definitions=definition,
-                                resource_property_spec=resource_property_spec,
-                                description=description,
-                                json_path=prop_json_path,
-                                properties_spec=property_spec.Properties,
-                                property_specs=property_specs,
-                                resource_info=resource_info,
-                                cfn_docgen_metadata=cfn_docgen_metadata,
-                                context=context,
-                            ))
-                        self.property_nodes_list[property_name] = property_nodes_list.copy()
-                        continue
-
-                    if (
-                        resource_property_spec.Type is not None
-                        and resource_property_spec.Type.lower() == "map"
-                    ):
-                    # e.g. CustomResponseBody in AWS::WAFv2::WebACL
-                        
-                        property_spec = property_specs.get(
-                            CfnSpecificationPropertyTypeName(f"{resource_info.type}.{resource_property_spec.ItemType}", context).fullname
-                        )
-                        if property_spec is None or property_spec.Properties is None:
-                            continue
-                        definition_map = definitions.get(property_name, {"key": None})
-                        if not isinstance(definition_map, dict):
-                            raise ValueError
-                        property_nodes_map:Mapping[str, CfnTemplateResourcePropertyNode] = {}
-                        for key, definition in definition_map.items():
-                            # for prop_name, prop_spec in property_spec.Properties.items():
-                            # prop_name is ContentType, Content, ...
-                            prop_json_path = f"{self.json_path}.{property_name}.{key}"
-                            description = cfn_docgen_metadata.get_property_description_by_json_path(
-                                json_path=prop_json_path
-                            ) if cfn_docgen_metadata is not None else None
-                            if resource_info.is_recursive and definition is None:
-                                continue
-                            property_nodes_map[key] = CfnTemplateResourcePropertyNode(
-                                definitions=definition,
-                                resource_property_spec=resource_property_spec,
-                                description=description,
-                                json_path=prop_json_path,
-                                properties_spec=property_spec.Properties,
-                                property_specs=property_specs,
-                                resource_info=resource_info,
-                                cfn_docgen_metadata=cfn_docgen_metadata,
-                                context=context,
-                            )
-                        self.property_nodes_map[property_name] = property_nodes_map.copy()
+            if resolved_property.Kind == "Map":
+            # e.g. CustomResponseBody in AWS::WAFv2::WebACL
+                definition_map:Mapping[str, Any] = {}
+                if property_definitions is not None:
+                    definition_map = property_definitions.get(property_name, {"key": None})
+                if definitions is None:
+                    definition_map = {"key": None}
+                if not isinstance(definition_map, dict): # type: ignore
+                    raise ValueError
+                map_nodes:Mapping[str, CfnTemplateResourcePropertyNode] = {}
+                map_children:List[PropertyNodeToBuild] = []
+                for key, definition in definition_map.items():
+                    # prop_name is ContentType, Content, ...
+                    prop_json_path = f"{node.json_path}.{property_name}.{key}"
+                    description = cfn_docgen_metadata.get_property_description_by_json_path(
+                        json_path=prop_json_path
+                    ) if cfn_docgen_metadata is not None else None
+                    if defined_only and definition is None:
                         continue
-
-                # the rest is e.g. CpuOptions in AWS::EC2::Instance
-                property_spec = property_specs.get(
-                    CfnSpecificationPropertyTypeName(f"{resource_info.type}.{resource_property_spec.Type}", context).fullname
-                )
-                if property_spec is None or property_spec.Properties is None:
-                    continue
-                definition = definitions.get(property_name, None)
-                prop_json_path = f"{self.json_path}.{property_name}"
-                description = cfn_docgen_metadata.get_property_description_by_json_path(
-                    json_path=prop_json_path
-                ) if cfn_docgen_metadata is not None else None
-                if resource_info.is_recursive and definition is None:
-                    continue
-                self.property_nodes[property_name] = CfnTemplateResourcePropertyNode(
-                    definitions=definition,
-                    resource_property_spec=resource_property_spec,
-                    properties_spec=property_spec.Properties,
-                    property_specs=property_specs,
-                    resource_info=resource_info,
-                    json_path=prop_json_path,
-                    description=description,
-                    cfn_docgen_metadata=cfn_docgen_metadata,
-                    context=context,
-                )
+                    property_node, to_build = child_property_node(
+                        definition=definition,
+                        property_spec=property_spec,
+                        description=description,
+                        json_path=prop_json_path,
+                        resolved_properties=property_type.Properties,
+                        depth=depth+1,
+                        shared_property_nodes=shared_property_nodes,
+                        resource_type=resource_info.type,
+                    )
+                    map_nodes[key] = property_node
+                    map_children.extend(to_build)
+                property_nodes_map[property_name] = map_nodes.copy()
+                children.extend(map_children)
                 continue
 
-            except Exception:
-                context.log_warning(f"failed to build CfnTemplateResourcePropertyNode for property [{property_name}]")
+            # the rest is e.g. CpuOptions in AWS::EC2::Instance
+            definition = None
+            if property_definitions is not None:
+                definition = property_definitions.get(property_name, None)
+            prop_json_path = f"{node.json_path}.{property_name}"
+            description = cfn_docgen_metadata.get_property_description_by_json_path(
+                json_path=prop_json_path
+            ) if cfn_docgen_metadata is not None else None
+            if defined_only and definition is None:
                 continue
+            property_node, to_build = child_property_node(
+                definition=definition,
+                property_spec=property_spec,
+                description=description,
+                json_path=prop_json_path,
+                resolved_properties=property_type.Properties,
+                depth=depth+1,
+                shared_property_nodes=shared_property_nodes,
+                resource_type=resource_info.type,
+            )
+            property_nodes[property_name] = property_node
+            children.extend(to_build)
+            continue
+        except Exception:
+            context.log_warning(f"failed to build CfnTemplateResourcePropertyNode for property [{property_name}]")
+            continue
+    if property_leaves:
+        node.property_leaves = property_leaves
+    if property_nodes:
+        node.property_nodes = property_nodes
+    if property_nodes_list:
+        node.property_nodes_list = property_nodes_list
+    if property_nodes_map:
+        node.property_nodes_map = property_nodes_map
+    return children
 
 
 class CfnTemplateResourceNode:
@@ -795,8 +828,7 @@ class CfnTemplateResourceNode:
         try:
             self.properties_node = CfnTemplateResourcePropertiesNode(
                 definitions=definition.Properties,
-                resource_property_specs=specs.ResourceSpec.Properties,
-                property_specs=specs.PropertySpecs,
+                resolved_properties=specs.ResolvedProperties,
                 cfn_docgen_metadata=cfn_docgen,
                 resource_info=resource_info,
                 context=context,
@@ -857,21 +889,129 @@ class CfnTemplateResourceNode:
 
 
 
+# resources of the same type built in a task of the executor
+RESOURCE_NODES_PER_TASK = 20
+
+# a resource node built by the executor (None if it failed), with messages logged while it was built
+BuiltResourceNode = Tuple[Optional[CfnTemplateResourceNode], List[AppContextLogMessage]]
+
+@functools.lru_cache(maxsize=None)
+def quiet_context() -> AppContext:
+    # a logger of its own, so that the level of the logger of the app is kept as it is
+    return AppContext(logger_name=f"{AppConfig.APP_NAME}-resource-nodes", log_level=logging.CRITICAL)
+
+def build_resource_nodes_of_type(
+    definitions:List[Tuple[str, CfnTemplateResourceDefinition]],
+    specs:CfnSpecificationForResource,
+    resource_info:ResourceInfo,
+) -> List[BuiltResourceNode]:
+    """build resource nodes of the same type, in a worker process of the executor, and return them with their messages instead of logging them"""
+    context = quiet_context()
+    built_resource_nodes:List[BuiltResourceNode] = []
+    for name, definition in definitions:
+        context.log_messages.messages.clear()
+        resource_node:Optional[CfnTemplateResourceNode] = None
+        try:
+            resource_node = CfnTemplateResourceNode(
+                definition=definition,
+                specs=specs,
+                resource_info=resource_info,
+                context=context,
+            )
+        except Exception:
+            context.log_warning(f"failed to build CfnTemplateResourceNode for resource [{name}]")
+        built_resource_nodes.append((resource_node, list(context.log_messages.messages)))
+    context.log_messages.messages.clear()
+    return built_resource_nodes
+
+def build_resource_nodes_with_executor(
+    definitions:Mapping[str, CfnTemplateResourceDefinition],
+    spec_repository:ICfnSpecificationRepository,
+    context:AppContext,
+    sparse:bool,
+    max_depth:int,
+    executor:Executor,
+) -> Mapping[str, BuiltResourceNode]:
+    """
+    build resource nodes in tasks of the executor (e.g. ProcessPoolExecutor), each of which gets resources of one type with the specs of the type.
+    messages are returned for each resource instead of being logged, and tasks which fail (e.g. nodes too deep to be pickled) are built in this process again
+    """
+    lookup_context = quiet_context()
+    lookup_messages:Dict[str, List[AppContextLogMessage]] = {}
+    specs_by_type:Dict[str, Tuple[CfnSpecificationForResource, ResourceInfo]] = {}
+    names_by_type:Dict[str, List[str]] = defaultdict(list)
+    for name, definition in definitions.items():
+        lookup_context.log_messages.messages.clear()
+        try:
+            type_name = CfnSpecificationResourceTypeName(definition.Type, lookup_context)
+            specs = spec_repository.get_specs_for_resource(type_name)
+            if definition.Type not in specs_by_type:
+                specs_by_type[definition.Type] = (specs, ResourceInfo(
+                    type=definition.Type,
+                    is_recursive=spec_repository.is_recursive(type_name),
+                    sparse=sparse,
+                    max_depth=max_depth,
+                    # property nodes are shared within a task, since nodes from different tasks are unpickled separately
+                    shared_property_nodes={},
+                ))
+            names_by_type[definition.Type].append(name)
+        except Exception:
+            lookup_context.log_warning(f"failed to build CfnTemplateResourceNode for resource [{name}]")
+        lookup_messages[name] = list(lookup_context.log_messages.messages)
+    lookup_context.log_messages.messages.clear()
+
+    tasks:List[Tuple[List[Tuple[str, CfnTemplateResourceDefinition]], str, Future[List[BuiltResourceNode]]]] = []
+    for resource_type, names in names_by_type.items():
+        specs, resource_info = specs_by_type[resource_type]
+        for i in range(0, len(names), RESOURCE_NODES_PER_TASK):
+            task_definitions = [(name, definitions[name]) for name in names[i:i+RESOURCE_NODES_PER_TASK]]
+            tasks.append((task_definitions, resource_type, executor.submit(build_resource_nodes_of_type, task_definitions, specs, resource_info)))
+
+    built_resource_nodes:Dict[str, BuiltResourceNode] = {
+        name: (None, messages) for name, messages in lookup_messages.items()
+    }
+    for task_definitions, resource_type, future in tasks:
+        try:
+            results = future.result()
+        except Exception:
+            context.log_debug(f"failed to build resource nodes of [{resource_type}] with the executor. build them in this process")
+            specs, resource_info = specs_by_type[resource_type]
+            results = build_resource_nodes_of_type(task_definitions, specs, resource_info)
+        for (name, _), (resource_node, messages) in zip(task_definitions, results):
+            built_resource_nodes[name] = (resource_node, lookup_messages[name] + messages)
+    return built_resource_nodes
+
 class CfnTemplateResourceGroupNode:
     def __init__(
         self,
         definitions:Mapping[str, CfnTemplateResourceDefinition],
         spec_repository:ICfnSpecificationRepository,
         context:AppContext,
-
+        sparse:bool=False,
+        max_depth:int=AppConfig.MAX_PROPERTY_DEPTH,
+        shared_property_nodes:Optional[SharedPropertyNodes]=None,
+        built_resource_nodes:Optional[Mapping[str, BuiltResourceNode]]=None,
     ) -> None:
         self.resource_nodes:Mapping[str, CfnTemplateResourceNode] = {}
+        if built_resource_nodes is not None:
+            # built by the executor in advance. messages are logged in the same order as they are built here
+            for name in definitions.keys():
+                resource_node, messages = built_resource_nodes[name]
+                context.replay(messages)
+                if resource_node is not None:
+                    self.resource_nodes[name] = resource_node
+            return
+        if shared_property_nodes is None:
+            shared_property_nodes = {}
         for name, definition in definitions.items():
             try:
                 specs = spec_repository.get_specs_for_resource(CfnSpecificationResourceTypeName(definition.Type, context))
                 resource_info=ResourceInfo(
                     type=definition.Type, 
-                    is_recursive=spec_repository.is_recursive(CfnSpecificationResourceTypeName(definition.Type, context))
+                    is_recursive=spec_repository.is_recursive(CfnSpecificationResourceTypeName(definition.Type, context)),
+                    sparse=sparse,
+                    max_depth=max_depth,
+                    shared_property_nodes=shared_property_nodes,
                 )
                 self.resource_nodes[name] = CfnTemplateResourceNode(
                     definition=definition, 
@@ -886,6 +1026,17 @@ class CfnTemplateResourceGroupNode:
 class ResourceInfo:
     type: str
     is_recursive: bool
+    # build nodes and leaves only for properties set in the template, e.g. for documents which render nothing else
+    sparse: bool = False
+    # property nodes nested deeper than this are not built
+    max_depth: int = AppConfig.MAX_PROPERTY_DEPTH
+    # property nodes without definitions, shared with other resources built with the same dict (not shared if None)
+    shared_property_nodes: Optional[SharedPropertyNodes] = None
+
+    @property
+    def defined_only(self) -> bool:
+        # recursive resource types are always built sparsely, since their full trees are infinite
+        return self.is_recursive or self.sparse
 
 class CfnTemplateResourcesNode:
     group_name_for_independent_resources = "__CFN_DOCGEN_INDEPENDENT_RESOURCES__"
@@ -896,9 +1047,27 @@ class CfnTemplateResourcesNode:
         resource_groups:Mapping[str, List[str]],
         spec_repository:ICfnSpecificationRepository,
         context:AppContext,
-
+        sparse:bool=False,
+        max_depth:int=AppConfig.MAX_PROPERTY_DEPTH,
+        executor:Optional[Executor]=None,
     ) -> None:
         self.group_nodes:Mapping[str, CfnTemplateResourceGroupNode] = {}
+        # resources of the same type share their property nodes without definitions across groups
+        shared_property_nodes:SharedPropertyNodes = {}
+        # resource nodes of all groups are built by the executor at once, if it is given
+        built_resource_nodes:Optional[Mapping[str, BuiltResourceNode]] = None
+        if executor is not None:
+            try:
+                built_resource_nodes = build_resource_nodes_with_executor(
+                    definitions=definitions,
+                    spec_repository=spec_repository,
+                    context=context,
+                    sparse=sparse,
+                    max_depth=max_depth,
+                    executor=executor,
+                )
+            except Exception:
+                context.log_warning("failed to build resource nodes with the executor. build them in this process")
         
         for group_name, resource_ids in resource_groups.items():
             try:
@@ -909,6 +1078,10 @@ class CfnTemplateResourcesNode:
                     },
                     spec_repository=spec_repository,
                     context=context,
+                    sparse=sparse,
+                    max_depth=max_depth,
+                    shared_property_nodes=shared_property_nodes,
+                    built_resource_nodes=built_resource_nodes,
                 )
             except Exception:
                 context.log_warning(f"failed to build CfnTemplateResourcesNode for resource group [{group_name}]")
@@ -924,6 +1097,10 @@ class CfnTemplateResourcesNode:
                 },
                 spec_repository=spec_repository,
                 context=context,
+                sparse=sparse,
+                max_depth=max_depth,
+                shared_property_nodes=shared_property_nodes,
+                built_resource_nodes=built_resource_nodes,
             )
         except Exception:
             context.log_warning(f"failed to build CfnTemplateResourcesNode for resource group [{self.group_name_for_independent_resources}]")
@@ -946,6 +1123,8 @@ class CfnTemplateResourcesNode:
         #         context.log_warning(f"failed to build CfnTemplateResourceNode for resource [{name}]")
 
 class CfnTemplateOutputLeaf:
+    __slots__ = ("definition",)
+
     def __init__(
         self,
         definition:CfnTemplateOutputDefinition    
@@ -989,13 +1168,21 @@ class CfnTemplateSource:
 
 
 class CfnTemplateTree:
-    """treet CfnTemplate as tree"""
+    """
+    treet CfnTemplate as tree.
+    with sparse, resource properties not set in the template are not built (enough for documents, but not for skeletons)
+    and property nodes nested deeper than max_depth are not built.
+    with executor (e.g. ProcessPoolExecutor), resource nodes are built in its workers
+    """
     def __init__(
         self, 
         template_source:CfnTemplateSource,
         definition:CfnTemplateDefinition, 
         spec_repository:ICfnSpecificationRepository,
         context:AppContext,
+        sparse:bool=False,
+        max_depth:int=AppConfig.MAX_PROPERTY_DEPTH,
+        executor:Optional[Executor]=None,
     ) -> None:
         self.template_source = template_source
         self.description = definition.Description
@@ -1028,6 +1215,9 @@ class CfnTemplateTree:
             resource_groups=definition.get_resource_groups(),
             spec_repository=spec_repository,
             context=context,
+            sparse=sparse,
+            max_depth=max_depth,
+            executor=executor,
         )
         self.outputs_node = CfnTemplateOutputsNode(
             definitions=definition.Outputs,
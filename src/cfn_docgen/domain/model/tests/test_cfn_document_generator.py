@@ -1089,6 +1089,56 @@ def test_CfnMarkdownDocumentGenerator_flatten_properties(context:AppContext):
         assert p.UpdateType == e.UpdateType, p
 
 
+def test_CfnMarkdownDocumentGenerator_flatten_properties_order(context:AppContext):
+    resources_node = CfnTemplateResourcesNode(
+        context=context,
+        definitions={
+            "WebACL": CfnTemplateResourceDefinition(
+                Type="AWS::WAFv2::WebACL",
+                Properties={
+                    "Scope": "REGIONAL",
+                    "CustomResponseBodies": {
+                        "a-b": {"ContentType": "TEXT_PLAIN", "Content": "a-b"},
+                        "a": {"ContentType": "TEXT_PLAIN", "Content": "a"},
+                    },
+                    "Tags": [{"Key": f"key{i}", "Value": f"value{i}"} for i in range(11)],
+                },
+            ),
+        },
+        spec_repository=CfnSpecificationRepository(
+            context=context,
+            source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
+            loader_factory=specification_loader_factory,
+            cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context,),
+            recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        ),
+        resource_groups={},
+        sparse=True,
+    )
+    generator = CfnMarkdownDocumentGenerator(context=context,)
+    properties = generator._flatten_properties_node( # type: ignore
+        resources_node.group_nodes[resources_node.group_name_for_independent_resources].resource_nodes["WebACL"].properties_node,
+    )
+    rows = [(p.Property, p.Value) for p in properties]
+
+    # properties by name, each followed by its own properties, and items of maps by key
+    assert rows[:6] == [
+        ("&nbsp;&nbsp;a", "-"),
+        ("&nbsp;&nbsp;&nbsp;&nbsp;Content", "a"),
+        ("&nbsp;&nbsp;&nbsp;&nbsp;ContentType", "TEXT_PLAIN"),
+        ("&nbsp;&nbsp;a-b", "-"),
+        ("&nbsp;&nbsp;&nbsp;&nbsp;Content", "a-b"),
+        ("&nbsp;&nbsp;&nbsp;&nbsp;ContentType", "TEXT_PLAIN"),
+    ]
+    assert rows[6] == ("Scope", "REGIONAL")
+    # items of lists by index, not by the string of their json paths
+    assert [row for row in rows if row[0].startswith("Tags")] == [(f"Tags[{i}]", "-") for i in range(11)]
+    assert rows[-3:] == [
+        ("Tags[10]", "-"),
+        ("&nbsp;&nbsp;Key", "key10"),
+        ("&nbsp;&nbsp;Value", "value10"),
+    ]
+
 @pytest.mark.parametrize("jsonpath,expected", [
     ("$.BlockDeviceMappings", "BlockDeviceMappings"),
     ("$.BlockDeviceMappings[0]", "BlockDeviceMappings[0]"),
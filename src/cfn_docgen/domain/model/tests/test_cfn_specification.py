@@ -1,10 +1,12 @@
 import json
 import logging
 import os
+import pickle
 import pytest
 import requests
+from pydantic import ValidationError
 from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
-from cfn_docgen.domain.model.cfn_specification import CfnSpecification, CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName
+from cfn_docgen.domain.model.cfn_specification import CfnSpecification, CfnSpecificationCompact, CfnSpecificationCompactPropertyType, CfnSpecificationCompactResourceType, CfnSpecificationForResource, CfnSpecificationLazyMapping, CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName
 
 @pytest.fixture
 def context():
@@ -80,3 +82,137 @@ def test_CfnSpecification_merge_with_custom_specification(
     assert "Custom::Resource" in list(original_specification.ResourceTypes.keys())
     assert "Custom::Resource.NestedProp" in list(original_specification.PropertyTypes.keys())
     assert "AWS::CloudFormation::CustomResource" in list(original_specification.ResourceTypes.keys())
+
+def test_CfnSpecification_lazy(
+    custom_specification:CfnSpecification,
+):
+    localpath = os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "..", "..", "docs", "custom-specification.json",
+    )
+    with open(localpath, "r", encoding="UTF-8") as fp:
+        data = json.loads(fp.read())
+    lazy_specification = CfnSpecification.lazy(data)
+
+    assert isinstance(lazy_specification.PropertyTypes, CfnSpecificationLazyMapping)
+    assert list(lazy_specification.PropertyTypes.keys()) == list(custom_specification.PropertyTypes.keys())
+    # entries are validated at the first access only
+    assert isinstance(lazy_specification.PropertyTypes.entries["Custom::Resource.NestedProp"], dict)
+    nested_prop = lazy_specification.PropertyTypes["Custom::Resource.NestedProp"]
+    assert nested_prop == custom_specification.PropertyTypes["Custom::Resource.NestedProp"]
+    assert lazy_specification.PropertyTypes["Custom::Resource.NestedProp"] is nested_prop
+    assert lazy_specification.ResourceTypes["Custom::Resource"] == custom_specification.ResourceTypes["Custom::Resource"]
+
+def test_CfnSpecification_lazy_invalid():
+    lazy_specification = CfnSpecification.lazy({
+        "ResourceSpecificationVersion": "1.0.0",
+        "ResourceTypes": {"Custom::Resource": {"Properties": "invalid"}},
+        "PropertyTypes": {},
+    })
+    with pytest.raises(ValidationError):
+        lazy_specification.ResourceTypes["Custom::Resource"]
+    with pytest.raises(KeyError):
+        lazy_specification.ResourceTypes["Custom::NotExist"]
+
+def test_CfnSpecification_from_entries(
+    custom_specification:CfnSpecification,
+):
+    entries = [("ResourceSpecificationVersion", None, custom_specification.ResourceSpecificationVersion)]
+    for resource_type, resource_spec in custom_specification.ResourceTypes.items():
+        entries.append(("ResourceTypes", resource_type, resource_spec.model_dump(exclude_unset=True)))
+    for property_type, property_spec in custom_specification.PropertyTypes.items():
+        entries.append(("PropertyTypes", property_type, property_spec.model_dump(exclude_unset=True)))
+
+    assert CfnSpecification.from_entries(entries) == custom_specification
+
+def test_CfnSpecification_from_entries_invalid():
+    with pytest.raises(ValidationError):
+        CfnSpecification.from_entries([
+            ("ResourceSpecificationVersion", None, "1.0.0"),
+            ("ResourceTypes", "Custom::Resource", {"Properties": "invalid"}),
+        ])
+
+def test_CfnSpecificationForResource_resolve(context:AppContext):
+    specification = CfnSpecificationCompact.from_specification(CfnSpecification(**{
+        "ResourceSpecificationVersion": "1.0.0",
+        "ResourceTypes": {"Custom::Resource": {"Properties": {
+            "StringProp": {"PrimitiveType": "String"},
+            "Statement": {"Type": "Statement"},
+            "Tags": {"Type": "List", "ItemType": "Tag"},
+            "Rules": {"Type": "Map", "ItemType": "Rule"},
+            "Unknown": {"Type": "Unknown"},
+        }}},
+        "PropertyTypes": {
+            "Custom::Resource.Statement": {"Properties": {
+                # refers to itself
+                "Statements": {"Type": "List", "ItemType": "Statement"},
+                "Tag": {"Type": "Tag"},
+            }},
+            "Custom::Resource.Rule": {"Properties": {"Name": {"PrimitiveType": "String"}}},
+            "Tag": {"Properties": {"Key": {"PrimitiveType": "String"}, "Value": {"PrimitiveType": "String"}}},
+        },
+    }))
+    specs = CfnSpecificationForResource.resolve(
+        resource_type="Custom::Resource",
+        resource_spec=specification.ResourceTypes["Custom::Resource"],
+        property_specs=specification.PropertyTypes,
+        context=context,
+    )
+    resolved = specs.ResolvedProperties
+
+    assert list(resolved.keys()) == ["StringProp", "Statement", "Tags", "Rules", "Unknown"]
+    assert resolved["StringProp"].Kind == "Primitive"
+    assert resolved["Unknown"].PropertyType is None
+
+    statement = resolved["Statement"].PropertyType
+    assert resolved["Statement"].Kind == "PropertyType" and statement is not None
+    assert statement.Spec == specification.PropertyTypes["Custom::Resource.Statement"]
+    # the same property type is resolved once and shared
+    assert statement.Properties["Statements"].Kind == "List"
+    assert statement.Properties["Statements"].PropertyType is statement
+
+    tag = resolved["Tags"].PropertyType
+    assert resolved["Tags"].Kind == "List" and tag is not None
+    assert tag.Spec == specification.PropertyTypes["Tag"]
+    assert statement.Properties["Tag"].PropertyType is tag
+
+    rule = resolved["Rules"].PropertyType
+    assert resolved["Rules"].Kind == "Map" and rule is not None
+    assert rule.Properties["Name"].Kind == "Primitive"
+
+def test_CfnSpecificationCompact(custom_specification:CfnSpecification):
+    compact_specification = CfnSpecificationCompact.from_specification(custom_specification)
+    assert list(compact_specification.ResourceTypes.keys()) == list(custom_specification.ResourceTypes.keys())
+    assert list(compact_specification.PropertyTypes.keys()) == list(custom_specification.PropertyTypes.keys())
+
+    resource_type = compact_specification.ResourceTypes["Custom::Resource"]
+    assert isinstance(resource_type, CfnSpecificationCompactResourceType)
+    for name, prop in custom_specification.ResourceTypes["Custom::Resource"].Properties.items():
+        compact_prop = resource_type.Properties[name]
+        assert (compact_prop.PrimitiveType, compact_prop.Type, compact_prop.Required) == (prop.PrimitiveType, prop.Type, prop.Required)
+    nested_prop = compact_specification.PropertyTypes["Custom::Resource.NestedProp"]
+    assert isinstance(nested_prop, CfnSpecificationCompactPropertyType) and nested_prop.Properties is not None
+
+    # no dict for each instance, equal values of type fields are shared, and specs are read-only
+    assert not hasattr(resource_type, "__dict__")
+    assert resource_type.Properties["StringProp"].UpdateType is nested_prop.Properties["NumberProp"].UpdateType # type: ignore
+    with pytest.raises(AttributeError):
+        resource_type.Documentation = "changed" # type: ignore
+
+    assert pickle.loads(pickle.dumps(compact_specification)) == compact_specification
+
+def test_CfnSpecificationCompact_lazy(custom_specification:CfnSpecification):
+    localpath = os.path.join(
+        os.path.dirname(__file__), "..", "..", "..", "..", "..", "docs", "custom-specification.json",
+    )
+    with open(localpath, "r", encoding="UTF-8") as fp:
+        data = json.loads(fp.read())
+    compact_specification = CfnSpecificationCompact.from_specification(CfnSpecification.lazy(data))
+
+    # stays lazy, and keeps compact specs of the entries accessed so far
+    property_types = compact_specification.PropertyTypes
+    assert isinstance(property_types, CfnSpecificationLazyMapping)
+    assert isinstance(property_types.entries["Custom::Resource.NestedProp"], dict)
+    nested_prop = property_types["Custom::Resource.NestedProp"]
+    assert isinstance(nested_prop, CfnSpecificationCompactPropertyType)
+    assert property_types.entries["Custom::Resource.NestedProp"] is nested_prop
+    assert compact_specification == CfnSpecificationCompact.from_specification(custom_specification)
@@ -1,8 +1,10 @@
 from __future__ import annotations
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 import logging
-from typing import Any, Mapping, Optional, cast, List
+from typing import Any, Callable, Mapping, Optional, Tuple, cast, List
 
 import pytest
+from jsonpath_ng import parse # type: ignore
 from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
 from cfn_docgen.adapters.internal.cache import LocalFileCache
 from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
@@ -91,6 +93,55 @@ def test_CfnTemplateResourceMetadataCfnDocgenDefinition_get_property_description
     else:
         assert d == expected
 
+@pytest.mark.parametrize("json_path", [
+    "$.ImageId",
+    "$.ImageId[0]",
+    "$.VolumeSize[0]",
+    "$.VolumeSize[0].Key",
+    "$.Empty[0]",
+    "$.Tags[1].Key",
+    "$.Tags[2].Key",
+    "$.Tags[0].Key[0]",
+    "$.Map.key-1",
+    "$.Map.where",
+    "$.Map.wherenot",
+    "$.Map.whereabouts",
+    "$.Map.aws:cdk:path",
+    "$.Map.1a",
+    "$.Map.a.b",
+    "$.Map.a b",
+])
+def test_CfnTemplateResourceMetadataCfnDocgenDefinition_get_property_description_by_json_path_jsonpath_ng(
+    json_path:str,
+):
+    properties = {
+        "ImageId": "imageid",
+        "VolumeSize": 8,
+        "Empty": "",
+        "Tags": [{"Key": "key0"}, {"Key": "key1"}],
+        "Map": {
+            "key-1": "key-1",
+            "where": "where",
+            "wherenot": "wherenot",
+            "whereabouts": "whereabouts",
+            "aws:cdk:path": "aws:cdk:path",
+            "1a": "1a",
+            "a.b": "a.b",
+            "a": {"b": "nested a.b"},
+            "a b": "a b",
+        },
+    }
+    definition = CfnTemplateResourceMetadataCfnDocgenDefinition(Properties=properties)
+    # the same as finding the json path with jsonpath_ng, including how it indexes into strings and fails on numbers
+    try:
+        found:List[Any] = [f.value for f in parse(json_path).find(properties)] # type: ignore
+        expected = found[0] if len(found) == 1 and isinstance(found[0], str) else None
+    except Exception as e:
+        with pytest.raises(type(e)):
+            definition.get_property_description_by_json_path(json_path)
+        return
+    assert definition.get_property_description_by_json_path(json_path) == expected
+
 
 
 
@@ -609,6 +660,224 @@ def test_CfnTemplateResourcesNode_avoid_recursion_error(
     rules_node = without_definition_node.properties_node.property_nodes_list["Rules"]
     assert len(rules_node) == 0
 
+def test_CfnTemplateResourcesNode_shared_property_nodes(
+    spec_repository:CfnSpecificationRepository,
+    context:AppContext,
+):
+    definitions:Mapping[str, CfnTemplateResourceDefinition] = {
+        "Instance1": CfnTemplateResourceDefinition(
+            Type="AWS::EC2::Instance",
+            Properties={"CpuOptions": {"CoreCount": 1}},
+        ),
+        "Instance2": CfnTemplateResourceDefinition(
+            Type="AWS::EC2::Instance",
+            Metadata=CfnTemplateResourceMetadataDefinition(**{
+                "aws:cdk:path": "some-stack/Instance/instance2"
+            }), # type: ignore
+            Properties={"CpuOptions": {"CoreCount": 2}},
+        ),
+        "Instance3": CfnTemplateResourceDefinition(
+            Type="AWS::EC2::Instance",
+            Metadata=CfnTemplateResourceMetadataDefinition(
+                CfnDocgen=CfnTemplateResourceMetadataCfnDocgenDefinition(
+                    Properties={"LaunchTemplate": {"Version": "version"}},
+                )
+            ),
+            Properties={},
+        ),
+    }
+    resources_node = CfnTemplateResourcesNode(
+        definitions=definitions,
+        spec_repository=spec_repository,
+        context=context,
+        resource_groups={"Instance": ["Instance2"]},
+    )
+    instance1, instance3 = [
+        resources_node.group_nodes[resources_node.group_name_for_independent_resources].resource_nodes[name].properties_node
+        for name in ["Instance1", "Instance3"]
+    ]
+    instance2 = resources_node.group_nodes["Instance"].resource_nodes["Instance2"].properties_node
+
+    # nodes without definitions are shared, even between groups
+    assert instance1.property_nodes["LaunchTemplate"] is instance2.property_nodes["LaunchTemplate"]
+    assert instance1.property_nodes_list["BlockDeviceMappings"][0] is instance2.property_nodes_list["BlockDeviceMappings"][0]
+    assert instance1.property_nodes["LaunchTemplate"].property_leaves["Version"].definition is None
+    # nodes with definitions are not
+    assert instance1.property_nodes["CpuOptions"] is not instance2.property_nodes["CpuOptions"]
+    assert instance1.property_nodes["CpuOptions"].property_leaves["CoreCount"].definition == 1
+    assert instance2.property_nodes["CpuOptions"].property_leaves["CoreCount"].definition == 2
+    # nor nodes of resources which describe their properties
+    assert instance3.property_nodes["LaunchTemplate"] is not instance1.property_nodes["LaunchTemplate"]
+    assert instance3.property_nodes["LaunchTemplate"].property_leaves["Version"].description == "version"
+    assert instance1.property_nodes["LaunchTemplate"].property_leaves["Version"].description is None
+
+def property_leaves(node:Any) -> List[Tuple[str, Any, Optional[str]]]:
+    leaves:List[Tuple[str, Any, Optional[str]]] = []
+    stack = [node]
+    while stack:
+        n = stack.pop()
+        leaves.extend((leaf.json_path, leaf.definition, leaf.description) for leaf in n.property_leaves.values())
+        stack.extend(n.property_nodes.values())
+        for nodes in n.property_nodes_list.values():
+            stack.extend(nodes)
+        for nodes in n.property_nodes_map.values():
+            stack.extend(nodes.values())
+    return leaves
+
+class FailingExecutor(Executor):
+    def submit(self, fn:Callable[..., Any], /, *args:Any, **kwargs:Any) -> Future[Any]:
+        future:Future[Any] = Future()
+        future.set_exception(RuntimeError("broken executor"))
+        return future
+
+@pytest.mark.parametrize("executor_factory", [
+    lambda: ProcessPoolExecutor(max_workers=2),
+    # tasks which fail in the executor are built in this process
+    lambda: FailingExecutor(),
+])
+def test_CfnTemplateResourcesNode_executor(
+    spec_repository:CfnSpecificationRepository,
+    executor_factory:Callable[[], Executor],
+):
+    definitions:Mapping[str, CfnTemplateResourceDefinition] = {
+        "Instance1": CfnTemplateResourceDefinition(
+            Type="AWS::EC2::Instance",
+            Metadata=CfnTemplateResourceMetadataDefinition(
+                CfnDocgen=CfnTemplateResourceMetadataCfnDocgenDefinition(
+                    Properties={"ImageId": "image id"},
+                )
+            ),
+            Properties={"ImageId": "ami-12345678", "Tags": [{"Key": "Name", "Value": "instance1"}]},
+        ),
+        "UnknownType": CfnTemplateResourceDefinition(Type="Custom::Unknown::Type", Properties={}),
+        "Bucket": CfnTemplateResourceDefinition(
+            Type="AWS::S3::Bucket",
+            Properties={"BucketName": "bucket"},
+        ),
+        "Instance2": CfnTemplateResourceDefinition(
+            Type="AWS::EC2::Instance",
+            Properties={"ImageId": "ami-87654321"},
+        ),
+    }
+    resource_groups = {"Instances": ["Instance2", "Bucket"]}
+    built = {}
+    for name, executor in [("sequential", None), ("executor", executor_factory())]:
+        context = AppContext(
+            log_level=logging.DEBUG,
+            connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+        )
+        try:
+            resources_node = CfnTemplateResourcesNode(
+                definitions=definitions,
+                resource_groups=resource_groups,
+                spec_repository=spec_repository,
+                context=context,
+                executor=executor,
+            )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        built[name] = (
+            {
+                (group_name, resource_name): property_leaves(resource_node.properties_node)
+                for group_name, group_node in resources_node.group_nodes.items()
+                for resource_name, resource_node in group_node.resource_nodes.items()
+            },
+            [
+                (message.level, message.message) for message in context.log_messages.messages
+                if message.level >= logging.WARNING
+            ],
+        )
+    assert list(built["executor"][0].keys()) == list(built["sequential"][0].keys())
+    assert built["executor"] == built["sequential"]
+    assert ("Instances", "Bucket") in built["executor"][0]
+    assert (logging.WARNING, "failed to build CfnTemplateResourceNode for resource [UnknownType]") in built["executor"][1]
+
+def test_CfnTemplateResourcesNode_slots(
+    spec_repository:CfnSpecificationRepository,
+    context:AppContext,
+):
+    definitions:Mapping[str, CfnTemplateResourceDefinition] = {
+        "Instance": CfnTemplateResourceDefinition(
+            Type="AWS::EC2::Instance",
+            Properties={
+                "ImageId": "ami-12345678",
+                "CpuOptions": {},
+                "BlockDeviceMappings": [{"DeviceName": "/dev/xvda", "Ebs": {"VolumeSize": 8}}],
+            },
+        ),
+    }
+    resources_node = CfnTemplateResourcesNode(
+        definitions=definitions,
+        spec_repository=spec_repository,
+        context=context,
+        resource_groups={},
+        sparse=True,
+    )
+    properties_node = resources_node.group_nodes[resources_node.group_name_for_independent_resources].resource_nodes["Instance"].properties_node
+    block_device_mapping = properties_node.property_nodes_list["BlockDeviceMappings"][0]
+    cpu_options = properties_node.property_nodes["CpuOptions"]
+
+    # no dict for each node and leaf
+    for obj in [block_device_mapping, properties_node.property_leaves["ImageId"], block_device_mapping.property_leaves["DeviceName"]]:
+        assert not hasattr(obj, "__dict__")
+    # nodes share one empty dict for the kinds of children they do not have
+    assert len(cpu_options.property_leaves) == 0
+    assert cpu_options.property_leaves is cpu_options.property_nodes
+    assert block_device_mapping.property_nodes_list is cpu_options.property_nodes_map
+    assert block_device_mapping.property_nodes["Ebs"].property_leaves["VolumeSize"].definition == 8
+
+def nested_statement(levels:int) -> Mapping[str, Any]:
+    statement:Mapping[str, Any] = {"ByteMatchStatement": {"SearchString": "innermost"}}
+    for _ in range(levels):
+        statement = {"AndStatement": {"Statements": [statement]}}
+    return statement
+
+@pytest.mark.parametrize("levels,max_depth,expected_levels", [
+    (3, 100, 3),
+    # deeper than the recursion limit of python, if each node were built by a recursive call
+    (1200, 10000, 1200),
+    # Rules[0] and Statement are at depth 1 and 2, and each level adds two more
+    (60, 100, 49),
+    (10, 7, 2),
+])
+def test_CfnTemplateResourcesNode_max_depth(
+    spec_repository:CfnSpecificationRepository,
+    context:AppContext,
+    levels:int, max_depth:int, expected_levels:int,
+):
+    definitions:Mapping[str, CfnTemplateResourceDefinition] = {
+        "RuleGroup": CfnTemplateResourceDefinition(
+            Type="AWS::WAFv2::RuleGroup",
+            Properties={
+                "Rules": [
+                    {"Statement": nested_statement(levels)},
+                ],
+            },
+        ),
+    }
+    resources_node = CfnTemplateResourcesNode(
+        definitions=definitions,
+        spec_repository=spec_repository,
+        context=context,
+        resource_groups={},
+        max_depth=max_depth,
+    )
+    rule_group_node = resources_node.group_nodes[resources_node.group_name_for_independent_resources].resource_nodes.get("RuleGroup")
+    assert rule_group_node is not None
+    statement = rule_group_node.properties_node.property_nodes_list["Rules"][0].property_nodes["Statement"]
+    built_levels = 0
+    while "AndStatement" in statement.property_nodes and "Statements" in statement.property_nodes["AndStatement"].property_nodes_list:
+        statement = statement.property_nodes["AndStatement"].property_nodes_list["Statements"][0]
+        built_levels += 1
+    assert built_levels == expected_levels
+    if expected_levels == levels:
+        byte_match_statement = statement.property_nodes["ByteMatchStatement"]
+        assert byte_match_statement.property_leaves["SearchString"].definition == "innermost"
+        assert "is nested deeper than" not in context.log_messages.as_string(logging.WARNING)
+    else:
+        assert f"is nested deeper than {max_depth} levels" in context.log_messages.as_string(logging.WARNING)
+
 
 def test_CfnTemplateTree(
     spec_repository:CfnSpecificationRepository,
@@ -846,6 +1115,67 @@ def test_CfnTemplateResourcesNode_resource_groups(
     independent_node = resources_node.group_nodes[resources_node.group_name_for_independent_resources]
     assert set(independent_node.resource_nodes.keys()) == set(["independent-resource1", "independent-resource2"])
 
+def test_CfnTemplateResourcesNode_sparse(
+    spec_repository:CfnSpecificationRepository,
+    context:AppContext,
+):
+    definitions:Mapping[str, CfnTemplateResourceDefinition] = {
+        "Instance": CfnTemplateResourceDefinition(
+            Type="AWS::EC2::Instance",
+            Properties={
+                "ImageId": "IMAGEID",
+                "BlockDeviceMappings": [
+                    {
+                        "DeviceName": "DEVICENAME",
+                        "Ebs": {
+                            "VolumeSize" : 0,
+                        }
+                    },
+                ],
+                "CpuOptions": {
+                    "CoreCount": 0
+                },
+                "Tags": [
+                    {
+                        "Key": "KEY1",
+                        "Value": "VALUE1"
+                    },
+                ]
+            }
+        )
+    }
+    nodes = {
+        sparse: CfnTemplateResourcesNode(
+            definitions=definitions,
+            spec_repository=spec_repository,
+            context=context,
+            resource_groups={},
+            sparse=sparse,
+        ) for sparse in [False, True]
+    }
+    full_node, sparse_node = [
+        nodes[sparse].group_nodes[nodes[sparse].group_name_for_independent_resources].resource_nodes["Instance"].properties_node
+        for sparse in [False, True]
+    ]
+
+    assert set(sparse_node.property_leaves.keys()) == set(["ImageId"])
+    assert set(sparse_node.property_nodes.keys()) == set(["CpuOptions"])
+    assert set(sparse_node.property_nodes_list.keys()) == set(["BlockDeviceMappings", "Tags"])
+    assert len(sparse_node.property_nodes_map) == 0
+    assert len(full_node.property_leaves) > len(sparse_node.property_leaves)
+
+    block_device_mapping = sparse_node.property_nodes_list["BlockDeviceMappings"][0]
+    assert set(block_device_mapping.property_leaves.keys()) == set(["DeviceName"])
+    assert set(block_device_mapping.property_nodes.keys()) == set(["Ebs"])
+    assert set(block_device_mapping.property_nodes["Ebs"].property_leaves.keys()) == set(["VolumeSize"])
+
+    # properties set in the template are the same as the full build
+    for name, leaf in sparse_node.property_leaves.items():
+        assert leaf.definition == full_node.property_leaves[name].definition
+        assert leaf.json_path == full_node.property_leaves[name].json_path
+    cpu_options = full_node.property_nodes["CpuOptions"]
+    assert sparse_node.property_nodes["CpuOptions"].property_leaves["CoreCount"].definition == cpu_options.property_leaves["CoreCount"].definition
+
 
 def test_CfnTemplateResourcesNode_as_skeleton(
     spec_repository:CfnSpecificationRepository,
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import ContextManager, Iterable, Iterator, Optional
 
 from cfn_docgen.config import AppContext
 
@@ -16,4 +16,30 @@ class IFileCache(ABC):
         pass
     @abstractmethod
     def get(self, filepath:str) -> Optional[str]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def put_bytes(self, filepath:str, body:bytes):
+        pass
+    @abstractmethod
+    def get_bytes(self, filepath:str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def put_stream(self, filepath:str, chunks:Iterable[bytes]) -> Iterator[bytes]:
+        """write chunks into the cache while passing them through. the cache is updated only after all chunks are consumed"""
+        pass
+
+    @abstractmethod
+    def lock(self, filepath:str) -> ContextManager[None]:
+        """hold an exclusive lock for filepath across threads and processes, e.g. while filling its cache"""
+        pass
+
+    @abstractmethod
+    def delete(self, filepath:str):
+        pass
+
+    @abstractmethod
+    def get_local_filepath(self, filepath:str) -> Optional[str]:
+        """local path of the cached file to read it directly (e.g. with mmap), if any"""
+        pass
@@ -4,7 +4,7 @@ from cfn_docgen.config import AppContext
 from cfn_docgen.domain.ports.cache import IFileCache
 from cfn_docgen.domain.ports.internal.file_loader import IFileLoader
 
-from cfn_docgen.domain.model.cfn_specification import CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName, CfnSpecificationPropertyType, CfnSpecificationResourceType, CfnSpecificationForResource
+from cfn_docgen.domain.model.cfn_specification import CfnSpecificationCompactPropertyType, CfnSpecificationCompactResourceType, CfnSpecificationPropertyTypeName, CfnSpecificationResourceTypeName, CfnSpecificationForResource
 
 
 class ICfnSpecificationRepository(ABC):
@@ -22,16 +22,16 @@ class ICfnSpecificationRepository(ABC):
         pass
 
     @abstractmethod
-    def get_resource_spec(self, resource_type:CfnSpecificationResourceTypeName) -> CfnSpecificationResourceType:
+    def get_resource_spec(self, resource_type:CfnSpecificationResourceTypeName) -> CfnSpecificationCompactResourceType:
         pass
 
     @abstractmethod
-    def get_property_spec(self, property_type:CfnSpecificationPropertyTypeName) -> CfnSpecificationPropertyType:
+    def get_property_spec(self, property_type:CfnSpecificationPropertyTypeName) -> CfnSpecificationCompactPropertyType:
         pass
 
 
     @abstractmethod
-    def list_properties_for_resource(self, resource_type:CfnSpecificationResourceTypeName) -> Mapping[str, CfnSpecificationPropertyType]:
+    def list_properties_for_resource(self, resource_type:CfnSpecificationResourceTypeName) -> Mapping[str, CfnSpecificationCompactPropertyType]:
         pass
 
 
@@ -1,9 +1,15 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
 
 from cfn_docgen.config import AppContext
 
+@dataclass
+class FileValidators:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
 class IFileLoader(ABC):
 
     def __init__(self, context:AppContext) -> None:
@@ -13,10 +19,20 @@ class IFileLoader(ABC):
     def download(self, source:str) -> bytes:
         pass
 
+    @abstractmethod
+    def download_if_modified(self, source:str, validators:FileValidators) -> Tuple[Optional[bytes], FileValidators]:
+        """download the file only if it is modified since validators are taken. return None as body if not modified"""
+        pass
+
+    @abstractmethod
+    def download_stream(self, source:str) -> Tuple[Iterator[bytes], FileValidators]:
+        """download the file as a stream of chunks, without holding the whole of it in memory"""
+        pass
+
     @abstractmethod
     def upload(self, body:bytes, dest:str) -> None:
         pass
 
     @abstractmethod
     def list(self, source:str) -> List[str]:
-        pass
\ No newline at end of file
+        pass
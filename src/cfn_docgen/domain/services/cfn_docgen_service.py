@@ -1,12 +1,11 @@
 from __future__ import annotations
+from concurrent.futures import Executor
 from dataclasses import dataclass
 import logging
-from typing import Callable, Mapping
+from typing import Callable, Mapping, Optional
 from cfn_docgen.adapters.cfn_document_storage import document_storage_facotory
-from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.cfn_specification_repository import spec_repository_registry
 from cfn_docgen.adapters.cfn_template_provider import template_provider_factory
-from cfn_docgen.adapters.internal.cache import LocalFileCache
-from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
 from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
 from cfn_docgen.domain.model.cfn_document_generator import CfnDocumentDestination, ICfnDocumentGenerator, SupportedFormat, document_generator_factory
 from cfn_docgen.domain.model.cfn_template import CfnTemplateSource, CfnTemplateTree
@@ -37,8 +36,11 @@ class CfnDocgenService(object):
         cfn_document_storage_factory:Callable[[CfnDocumentDestination, AppContext], ICfnDocumentStorage],
         cfn_specification_repository:ICfnSpecificationRepository,
         context:AppContext,
+        executor:Optional[Executor]=None,
     ) -> None:
         self.context = context
+        # resource nodes of templates are built in the executor (e.g. ProcessPoolExecutor) if it is given
+        self.executor = executor
         try:
             self.template_provider_factory = cfn_template_provider_facotry
             self.document_generator_factory = cfn_document_generator_factory
@@ -68,6 +70,9 @@ class CfnDocgenService(object):
                 definition=template_definition,
                 spec_repository=self.spec_repository,
                 context=self.context,
+                # documents render only the properties set in the template
+                sparse=True,
+                executor=self.executor,
             )
         except Exception as ex:
             self.context.log_error("failed to build CfnTemplateTree")
@@ -111,11 +116,10 @@ class CfnDocgenService(object):
             cfn_template_provider_facotry=template_provider_factory,
             cfn_document_generator_factory=document_generator_factory,
             cfn_document_storage_factory=document_storage_facotory,
-            cfn_specification_repository=CfnSpecificationRepository(
-                context=context,
+            # share the repository among services in the process, instead of loading the specification every time
+            cfn_specification_repository=spec_repository_registry.get(
                 source_url=AppConfig.DEFAULT_SPECIFICATION_URL,
-                loader_factory=specification_loader_factory,
-                cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
-                recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+                custom_resource_specification_url=None,
+                context=context,
             )
         )
\ No newline at end of file
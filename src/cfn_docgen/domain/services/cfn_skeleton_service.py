@@ -1,11 +1,11 @@
 from dataclasses import dataclass
-import json
 from typing import Literal, Optional
 from cfn_flip import to_yaml # type: ignore
 
+from cfn_docgen import json_backend
 from cfn_docgen.config import AppContext
 from cfn_docgen.domain.model.cfn_specification import CfnSpecificationResourceTypeName
-from cfn_docgen.domain.model.cfn_template import CfnTemplateResourceDefinition, CfnTemplateResourceNode, ResourceInfo
+from cfn_docgen.domain.model.cfn_template import CfnTemplateResourceDefinition, CfnTemplateResourceNode, ResourceInfo, SharedPropertyNodes
 from cfn_docgen.domain.ports.cfn_specification_repository import ICfnSpecificationRepository
 
 SkeletonFormat = Literal["yaml", "json"]
@@ -28,6 +28,8 @@ class CfnSkeletonService:
     def __init__(self, cfn_specification_repository:ICfnSpecificationRepository, context:AppContext) -> None:
         self.spec_repository = cfn_specification_repository
         self.context = context
+        # skeletons have no definitions, so each property node is built once for the service
+        self.shared_property_nodes:SharedPropertyNodes = {}
 
     def main(self, command_input:CfnSkeletonServiceCommandInput) -> CfnSkeletonServiceCommandOutput:
         self.context.log_debug(f"received skeleton type is [{command_input.type}]")
@@ -56,13 +58,14 @@ class CfnSkeletonService:
                 resource_info=ResourceInfo(
                     type=command_input.type.fullname,
                     is_recursive=self.spec_repository.is_recursive(command_input.type),
+                    shared_property_nodes=self.shared_property_nodes,
                 ),
                 specs=specs,
                 context=self.context,
             )
 
             resource_skeleton = resource_node.as_skeleton()
-            dumped_resource_skeleton = json.dumps(resource_skeleton, indent=2, ensure_ascii=False)
+            dumped_resource_skeleton = json_backend.dumps_indented(resource_skeleton)
             if command_input.format == "yaml":
                 dumped_resource_skeleton = to_yaml(dumped_resource_skeleton)
 
@@ -1,8 +1,8 @@
 from dataclasses import dataclass
-import json
 from typing import Literal, Optional
 from cfn_flip import to_yaml # type: ignore
 
+from cfn_docgen import json_backend
 from cfn_docgen.config import AppContext
 from cfn_docgen.domain.model.cfn_specification import CfnSpecificationResourceTypeName
 from cfn_docgen.domain.model.cfn_template import CfnTemplateResourceDefinition, CfnTemplateResourceNode, ResourceInfo
@@ -62,7 +62,7 @@ class CfnSkeltonService:
             )
 
             resource_skelton = resource_node.as_skelton()
-            dumped_resource_skelton = json.dumps(resource_skelton, indent=2, ensure_ascii=False)
+            dumped_resource_skelton = json_backend.dumps_indented(resource_skelton)
             if command_input.format == "yaml":
                 dumped_resource_skelton = to_yaml(dumped_resource_skelton)
 
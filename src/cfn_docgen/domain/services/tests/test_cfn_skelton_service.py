@@ -87,6 +87,29 @@ def test_CfnSkeletonService_resource_skeleton(
             **json.loads(to_json(command_output.skeleton))
         )
 
+def test_CfnSkeletonService_resource_skeleton_shared_property_nodes(
+    repository:CfnSpecificationRepository,
+    context:AppContext
+):
+    service = CfnSkeletonService(
+        cfn_specification_repository=repository,
+        context=context,
+    )
+    command_input = CfnSkeletonServiceCommandInput(
+        type=CfnSpecificationResourceTypeName("AWS::EC2::Instance", context),
+        format="json",
+        list=False,
+    )
+
+    first_output = service.main(command_input)
+    number_of_shared_property_nodes = len(service.shared_property_nodes)
+    second_output = service.main(command_input)
+
+    # property nodes are built for the first skeleton only
+    assert number_of_shared_property_nodes > 0
+    assert len(service.shared_property_nodes) == number_of_shared_property_nodes
+    assert first_output.skeleton == second_output.skeleton
+
 def test_CfnSkeletonService_resource_skeleton_error(
     repository:CfnSpecificationRepository,
     context:AppContext
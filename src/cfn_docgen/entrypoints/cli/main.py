@@ -1,12 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
+import functools
 import logging
 import sys
 from typing import Optional
 import click
 import tqdm
 from cfn_docgen.adapters.cfn_document_storage import document_storage_facotory
-from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository, prefetch_specifications
 from cfn_docgen.adapters.cfn_template_provider import template_provider_factory
-from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.cache import CacheCompression, LocalFileCache, file_cache_factory
 from cfn_docgen.adapters.internal.file_loader import specification_loader_factory, template_loader_factory
 from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
 from cfn_docgen.domain.model.cfn_document_generator import document_generator_factory
@@ -21,6 +23,9 @@ from cfn_docgen.entrypoints.cli.model.cli_model import CfnDocgenCLIUnitsOfWork,
 def main():
     pass
 
+def mebibytes_to_bytes(size:Optional[int]) -> Optional[int]:
+    return None if size is None else size * 1024 * 1024
+
 @main.command()
 @click.option(
     "-t", "--type", "skeleton_type", required=False, type=str, default=None,
@@ -42,6 +47,22 @@ def main():
     "-r", "--region", "region", type=click.Choice(list(AppConfig.SPECIFICATION_URL_BY_REGION.keys())), show_default=True, default="us-east-1",
     help="aws region for cfn specification file to be referenced at"
 )
+@click.option(
+    "--specification-cache-ttl", "specification_cache_ttl", required=False, type=int, default=None,
+    help="seconds to use cached cfn specification file without checking whether it is updated. cached one is used forever by default"
+)
+@click.option(
+    "--cache-compression", "cache_compression", required=False, type=click.Choice(["gzip", "zstd"]), default=None,
+    help="compress cached cfn specification files. zstd requires zstandard package (pip install cfn-docgen[zstd])"
+)
+@click.option(
+    "--content-addressed-cache", "content_addressed_cache", required=False, is_flag=True, show_default=True, default=False,
+    help="store identical cached files (e.g. cfn specification files of several regions) only once"
+)
+@click.option(
+    "--cache-max-size", "cache_max_size", required=False, type=click.IntRange(min=0), default=None,
+    help="maximum size of the cache directory in MiB. least recently used files are evicted beyond it. unlimited by default"
+)
 @click.option(
     "--debug", "debug", required=False, is_flag=True, show_default=True, default=False,
     help="enable logging"
@@ -52,6 +73,10 @@ def skeleton(
     list_:bool=False, debug:bool=False,
     fmt: SkeletonFormat="yaml",
     region:str = "us-east-1",
+    specification_cache_ttl:Optional[int]=None,
+    cache_compression:Optional[CacheCompression]=None,
+    content_addressed_cache:bool=False,
+    cache_max_size:Optional[int]=None,
 ):
     context = AppContext(
         log_level=logging.DEBUG if debug else logging.INFO
@@ -77,9 +102,13 @@ def skeleton(
                 ),
                 custom_resource_specification_url=custom_resource_specification,
                 loader_factory=specification_loader_factory,
-                cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+                cache=file_cache_factory(
+                    AppConfig.CACHE_ROOT_DIR, cache_compression, context, content_addressed_cache,
+                    max_size=mebibytes_to_bytes(cache_max_size),
+                ),
                 recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
                 context=context,
+                cache_ttl=specification_cache_ttl,
             ),
             context=context,
         )
@@ -124,6 +153,30 @@ def skeleton(
     "-r", "--region", "region", type=click.Choice(list(AppConfig.SPECIFICATION_URL_BY_REGION.keys())), show_default=True, default="us-east-1",
     help="aws region for cfn specification file to be referenced at"
 )
+@click.option(
+    "--specification-cache-ttl", "specification_cache_ttl", required=False, type=int, default=None,
+    help="seconds to use cached cfn specification file without checking whether it is updated. cached one is used forever by default"
+)
+@click.option(
+    "--cache-compression", "cache_compression", required=False, type=click.Choice(["gzip", "zstd"]), default=None,
+    help="compress cached cfn specification files. zstd requires zstandard package (pip install cfn-docgen[zstd])"
+)
+@click.option(
+    "--content-addressed-cache", "content_addressed_cache", required=False, is_flag=True, show_default=True, default=False,
+    help="store identical cached files (e.g. cfn specification files of several regions) only once"
+)
+@click.option(
+    "--cache-max-size", "cache_max_size", required=False, type=click.IntRange(min=0), default=None,
+    help="maximum size of the cache directory in MiB. least recently used files are evicted beyond it. unlimited by default"
+)
+@click.option(
+    "--template-cache/--no-template-cache", "template_cache", required=False, show_default=True, default=True,
+    help="cache validated templates by the hash of their contents, so that unchanged templates are not parsed again"
+)
+@click.option(
+    "-j", "--jobs", "jobs", required=False, type=click.IntRange(min=1), show_default=True, default=1,
+    help="number of processes to build resource nodes of templates in. resource nodes are built in this process if 1"
+)
 @click.option(
     "--debug", "debug", required=False, is_flag=True, show_default=True, default=False,
     help="enable logging"
@@ -135,6 +188,12 @@ def docgen(
     custom_resource_specification:str,
     profile:Optional[str]=None, 
     region:str = "us-east-1",
+    specification_cache_ttl:Optional[int]=None,
+    cache_compression:Optional[CacheCompression]=None,
+    content_addressed_cache:bool=False,
+    cache_max_size:Optional[int]=None,
+    template_cache:bool=True,
+    jobs:int=1,
     debug:bool=False,
 ):
     context = AppContext(
@@ -164,9 +223,19 @@ def docgen(
         click.echo(context.log_messages.as_string(logging.INFO))
         sys.exit(1)
 
+    executor:Optional[ProcessPoolExecutor] = None
     try:
+        if jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=jobs)
+        # templates are cached in the same cache as specifications, and evicted together
+        cache = file_cache_factory(
+            AppConfig.CACHE_ROOT_DIR, cache_compression, context, content_addressed_cache,
+            max_size=mebibytes_to_bytes(cache_max_size),
+        )
         service = CfnDocgenService(
-            cfn_template_provider_facotry=template_provider_factory,
+            cfn_template_provider_facotry=functools.partial(
+                template_provider_factory, cache=cache if template_cache else None,
+            ),
             cfn_document_generator_factory=document_generator_factory,
             cfn_document_storage_factory=document_storage_facotory,
             cfn_specification_repository=CfnSpecificationRepository(
@@ -175,11 +244,13 @@ def docgen(
                 ),
                 custom_resource_specification_url=custom_resource_specification,
                 loader_factory=specification_loader_factory,
-                cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=context),
+                cache=cache,
                 recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
                 context=context,
+                cache_ttl=specification_cache_ttl,
             ),
             context=context,
+            executor=executor,
         )
         
     except Exception:
@@ -195,7 +266,156 @@ def docgen(
         except Exception:
             context.log_warning(f"failed to generate document [{command_input.document_dest.dest}] from template [{command_input.template_source.source}]")
             continue
-
+    if executor is not None:
+        executor.shutdown()
 
     click.echo(context.log_messages.as_string(logging.INFO))
     sys.exit(0)
+
+
+@main.group()
+def spec():
+    """manage cfn specification files"""
+    pass
+
+@spec.command()
+@click.option(
+    "--regions", "regions", required=False, type=str, default=None,
+    help="comma separated aws regions for cfn specification files to be prefetched (e.g. us-east-1,ap-northeast-1). all regions by default"
+)
+@click.option(
+    "-j", "--jobs", "jobs", required=False, type=click.IntRange(min=1), show_default=True, default=8,
+    help="number of cfn specification files to be downloaded in parallel"
+)
+@click.option(
+    "--specification-cache-ttl", "specification_cache_ttl", required=False, type=int, default=None,
+    help="seconds to use cached cfn specification file without checking whether it is updated. cached one is used forever by default"
+)
+@click.option(
+    "--cache-compression", "cache_compression", required=False, type=click.Choice(["gzip", "zstd"]), default=None,
+    help="compress cached cfn specification files. zstd requires zstandard package (pip install cfn-docgen[zstd])"
+)
+@click.option(
+    "--content-addressed-cache", "content_addressed_cache", required=False, is_flag=True, show_default=True, default=False,
+    help="store identical cached files (e.g. cfn specification files of several regions) only once"
+)
+@click.option(
+    "--cache-max-size", "cache_max_size", required=False, type=click.IntRange(min=0), default=None,
+    help="maximum size of the cache directory in MiB. least recently used files are evicted beyond it. unlimited by default"
+)
+@click.option(
+    "--debug", "debug", required=False, is_flag=True, show_default=True, default=False,
+    help="enable logging"
+)
+def prefetch(
+    regions:Optional[str]=None,
+    jobs:int=8,
+    specification_cache_ttl:Optional[int]=None,
+    cache_compression:Optional[CacheCompression]=None,
+    content_addressed_cache:bool=False,
+    cache_max_size:Optional[int]=None,
+    debug:bool=False,
+):
+    """download, validate and cache cfn specification files of regions in parallel (e.g. while building CI images)"""
+    context = AppContext(log_level=logging.DEBUG if debug else logging.CRITICAL)
+    if regions is None:
+        target_regions = list(AppConfig.SPECIFICATION_URL_BY_REGION.keys())
+    else:
+        target_regions = [r.strip() for r in regions.split(",") if r.strip() != ""]
+    unknown_regions = [r for r in target_regions if r not in AppConfig.SPECIFICATION_URL_BY_REGION]
+    if len(unknown_regions) > 0:
+        context.log_error(f"regions [{', '.join(unknown_regions)}] are not supported")
+        click.echo(context.log_messages.as_string(logging.ERROR))
+        sys.exit(1)
+
+    try:
+        prefetched = prefetch_specifications(
+            source_urls=[AppConfig.SPECIFICATION_URL_BY_REGION[r] for r in target_regions],
+            cache=file_cache_factory(
+                AppConfig.CACHE_ROOT_DIR, cache_compression, context, content_addressed_cache,
+                max_size=mebibytes_to_bytes(cache_max_size),
+            ),
+            context=context,
+            jobs=jobs,
+            cache_ttl=specification_cache_ttl,
+        )
+    except Exception:
+        context.log_error("failed to prefetch cfn specification files")
+        click.echo(context.log_messages.as_string(logging.ERROR))
+        sys.exit(1)
+
+    failed_regions = [r for r in target_regions if not prefetched[AppConfig.SPECIFICATION_URL_BY_REGION[r]]]
+    for region in target_regions:
+        click.echo(f"{region}: {'failed' if region in failed_regions else 'cached'}")
+    if len(failed_regions) > 0:
+        click.echo(context.log_messages.as_string(logging.WARNING))
+        sys.exit(1)
+    sys.exit(0)
+
+@main.group()
+def cache():
+    """show or clean up the cache of cfn specification files"""
+    pass
+
+@cache.command()
+@click.option(
+    "--debug", "debug", required=False, is_flag=True, show_default=True, default=False,
+    help="enable logging"
+)
+def stats(debug:bool=False):
+    """show number and size of cached files, and cache hits and misses of recent runs"""
+    context = AppContext(log_level=logging.DEBUG if debug else logging.CRITICAL)
+    try:
+        cache_stats = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context).stats()
+    except Exception:
+        context.log_error(f"failed to read stats of cache at [{AppConfig.CACHE_ROOT_DIR}]")
+        click.echo(context.log_messages.as_string(logging.ERROR))
+        sys.exit(1)
+    click.echo(f"directory: {AppConfig.CACHE_ROOT_DIR}")
+    click.echo(f"entries: {cache_stats.entries}")
+    click.echo(f"bytes: {cache_stats.bytes}")
+    click.echo(f"runs: {len(cache_stats.runs)}")
+    click.echo(f"hits: {cache_stats.hits}")
+    click.echo(f"misses: {cache_stats.misses}")
+    if len(cache_stats.runs) > 0:
+        last_run = cache_stats.runs[-1]
+        click.echo(f"last run: {last_run.hits} hits, {last_run.misses} misses")
+    sys.exit(0)
+
+@cache.command()
+@click.option(
+    "--max-size", "max_size", required=True, type=click.IntRange(min=0),
+    help="size of the cache directory in MiB to evict least recently used files down to"
+)
+@click.option(
+    "--debug", "debug", required=False, is_flag=True, show_default=True, default=False,
+    help="enable logging"
+)
+def prune(max_size:int, debug:bool=False):
+    """evict least recently used cached files"""
+    context = AppContext(log_level=logging.DEBUG if debug else logging.CRITICAL)
+    try:
+        evicted = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context).prune(max_size * 1024 * 1024)
+    except Exception:
+        context.log_error(f"failed to prune cache at [{AppConfig.CACHE_ROOT_DIR}]")
+        click.echo(context.log_messages.as_string(logging.ERROR))
+        sys.exit(1)
+    click.echo(f"evicted {len(evicted)} files")
+    sys.exit(0)
+
+@cache.command()
+@click.option(
+    "--debug", "debug", required=False, is_flag=True, show_default=True, default=False,
+    help="enable logging"
+)
+def clear(debug:bool=False):
+    """delete all cached files"""
+    context = AppContext(log_level=logging.DEBUG if debug else logging.CRITICAL)
+    try:
+        removed = LocalFileCache(AppConfig.CACHE_ROOT_DIR, context).clear()
+    except Exception:
+        context.log_error(f"failed to clear cache at [{AppConfig.CACHE_ROOT_DIR}]")
+        click.echo(context.log_messages.as_string(logging.ERROR))
+        sys.exit(1)
+    click.echo(f"deleted {len(removed)} files")
+    sys.exit(0)
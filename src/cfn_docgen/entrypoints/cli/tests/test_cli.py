@@ -6,6 +6,8 @@ import os
 import shutil
 import boto3
 from click.testing import CliRunner
+from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.config import AppConfig, AppContext
 from cfn_docgen.domain.model.cfn_template import CfnTemplateResourceDefinition
 
 from cfn_docgen.entrypoints.cli.main import main
@@ -139,6 +141,30 @@ def test_cli_local_file_source_local_file_dest():
     assert output == example
 
 
+@pytest.mark.parametrize("template_cache_option", [
+    # parsed at the first run, and loaded from the cache at the second run
+    "--template-cache", "--template-cache", "--no-template-cache",
+])
+def test_cli_template_cache(template_cache_option:str):
+    args = CliDocgenArguement(
+        subcommand="docgen",
+        format="markdown",
+        source=INPUT_FILE1,
+        dest=OUTPUT_MD_FILE1,
+    )
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=[*args.as_list(), template_cache_option])
+    assert result.exit_code == 0
+
+    with open(OUTPUT_MD_FILE1, "rb") as fp:
+        output = fp.read()
+    with open(EXPECTED_MASTER_FILE, "rb") as fp:
+        example = fp.read()
+    
+    assert output == example
+
+
 def test_cli_s3_key_source_s3_key_dest():
     args = CliDocgenArguement(
         subcommand="docgen",
@@ -288,3 +314,36 @@ def test_cli_skeleton_list():
 
     assert "AWS::EC2::Instance" in result.stdout
     assert "Custom::Resource" in result.stdout
+
+def test_cli_cache(monkeypatch:pytest.MonkeyPatch, tmp_path:str):
+    # do not touch the cache shared with other tests
+    monkeypatch.setattr(AppConfig, "CACHE_ROOT_DIR", str(tmp_path))
+    context = AppContext(log_level=logging.DEBUG)
+    cache = LocalFileCache(str(tmp_path), context)
+    for i in range(3):
+        cache.put_bytes(f"/foo/{i}.json", b"0" * 1024 * 1024)
+        os.utime(cache.cache_filepath(f"/foo/{i}.json"), (i, i))
+    cache.get_bytes("/foo/2.json")
+    cache.get_bytes("/foo/3.json")
+
+    runner = CliRunner()
+    result = runner.invoke(main, args=["cache", "stats"])
+    assert result.exit_code == 0
+    assert "entries: 3" in result.stdout
+    assert f"bytes: {3 * 1024 * 1024}" in result.stdout
+    assert "last run: 1 hits, 1 misses" in result.stdout
+
+    result = runner.invoke(main, args=["cache", "prune", "--max-size", "1"])
+    assert result.exit_code == 0
+    assert "evicted 2 files" in result.stdout
+    assert cache.get_bytes("/foo/2.json") is not None
+
+    result = runner.invoke(main, args=["cache", "clear"])
+    assert result.exit_code == 0
+    assert cache.stats().entries == 0
+
+def test_cli_spec_prefetch_unsupported_region():
+    runner = CliRunner()
+    result = runner.invoke(main, args=["spec", "prefetch", "--regions", "us-east-1,xx-north-9"])
+    assert result.exit_code == 1
+    assert "regions [xx-north-9] are not supported" in result.stdout
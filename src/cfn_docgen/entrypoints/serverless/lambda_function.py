@@ -3,12 +3,13 @@ import logging
 import os
 from typing import Any, List, Mapping, Optional
 from cfn_docgen.adapters.cfn_document_storage import document_storage_facotory
-from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository
+from cfn_docgen.adapters.cfn_specification_repository import CfnSpecificationRepository, CfnSpecificationRepositoryRegistry
 from cfn_docgen.adapters.cfn_template_provider import template_provider_factory
-from cfn_docgen.adapters.internal.cache import LocalFileCache
+from cfn_docgen.adapters.internal.cache import file_cache_factory
 from cfn_docgen.adapters.internal.file_loader import specification_loader_factory
 from cfn_docgen.config import AppConfig, AppContext, AwsConnectionSettings, ConnectionSettings
 from cfn_docgen.domain.model.cfn_document_generator import document_generator_factory
+from cfn_docgen.domain.ports.cfn_specification_repository import ICfnSpecificationRepository
 from cfn_docgen.domain.services.cfn_docgen_service import CfnDocgenService, CfnDocgenServiceCommandOutput
 from cfn_docgen.entrypoints.serverless.model.lambda_model import CfnDocgenServerlessUnitsOfWork, S3NotificationEvent, ServerlessArguement
 
@@ -18,6 +19,30 @@ if DEST_BUCKET_PREFIX.startswith("/"):
     DEST_BUCKET_PREFIX = DEST_BUCKET_PREFIX[1:] # type: ignore
 CUSTOM_RESOURCE_SPECIFICATION_URL=os.environ.get("CUSTOM_RESOURCE_SPECIFICATION_URL", None)
 CFN_SPECIFICATION_REGION=os.environ.get("AWS_REGION", "us-east-1")
+SPECIFICATION_CACHE_TTL=os.environ.get("SPECIFICATION_CACHE_TTL", None)
+CACHE_COMPRESSION=os.environ.get("CACHE_COMPRESSION", None)
+# MiB
+CACHE_MAX_SIZE=os.environ.get("CACHE_MAX_SIZE", None)
+
+
+def repository_factory(
+    source_url:str,
+    custom_resource_specification_url:Optional[str],
+    context:AppContext,
+) -> ICfnSpecificationRepository:
+    return CfnSpecificationRepository(
+        context=context,
+        source_url=source_url,
+        custom_resource_specification_url=custom_resource_specification_url,
+        loader_factory=specification_loader_factory,
+        cache=file_cache_factory(
+            AppConfig.CACHE_ROOT_DIR, CACHE_COMPRESSION, context, # type: ignore
+            max_size=int(CACHE_MAX_SIZE) * 1024 * 1024 if CACHE_MAX_SIZE is not None else None,
+        ),
+        recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+        cache_ttl=float(SPECIFICATION_CACHE_TTL) if SPECIFICATION_CACHE_TTL is not None else None,
+    )
+spec_repository_registry = CfnSpecificationRepositoryRegistry(repository_factory)
 
 
 def lambda_handler(event:Mapping[str, Optional[Any]], context:Any) -> List[str]:
@@ -52,15 +77,13 @@ def lambda_handler(event:Mapping[str, Optional[Any]], context:Any) -> List[str]:
             cfn_template_provider_facotry=template_provider_factory,
             cfn_document_generator_factory=document_generator_factory,
             cfn_document_storage_factory=document_storage_facotory,
-            cfn_specification_repository=CfnSpecificationRepository(
-                context=app_context,
+            # reuse the repository built by previous invocations in the same execution environment
+            cfn_specification_repository=spec_repository_registry.get(
                 source_url=AppConfig.SPECIFICATION_URL_BY_REGION.get(
                     CFN_SPECIFICATION_REGION, AppConfig.DEFAULT_SPECIFICATION_URL,
                 ),
                 custom_resource_specification_url=CUSTOM_RESOURCE_SPECIFICATION_URL,
-                loader_factory=specification_loader_factory,
-                cache=LocalFileCache(AppConfig.CACHE_ROOT_DIR, context=app_context),
-                recursive_resource_types=AppConfig.RECURSIVE_RESOURCE_TYPES,
+                context=app_context,
             ),
             context=app_context,
         )
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import json
+import math
+from typing import Any, List, Union
+
+try:
+    import orjson # type: ignore
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# range of integers orjson serializes
+MIN_ORJSON_INT = -(2**63)
+MAX_ORJSON_INT = 2**64 - 1
+
+def loads(data:Union[str, bytes]) -> Any:
+    """json.loads, with orjson if it is installed. bytes are parsed without decoding them first"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN, Infinity and big integers, which the standard json module accepts (or reports the error in its own way)
+            pass
+    return json.loads(data)
+
+def dumps_indented(obj:Any) -> str:
+    """the same string as json.dumps(obj, indent=2, ensure_ascii=False), with orjson if it is installed and obj allows it"""
+    if ORJSON_AVAILABLE and orjson_compatible(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            # e.g. lone surrogates or non-string keys
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+def orjson_compatible(obj:Any) -> bool:
+    # orjson renders floats in exponent form and non-finite floats differently from the standard json module,
+    # and types the standard json module cannot serialize must raise as before
+    stack:List[Any] = [obj]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is str or value_type is bool or value is None:
+            continue
+        if value_type is dict:
+            stack.extend(value.values())
+        elif value_type is list or value_type is tuple:
+            stack.extend(value)
+        elif value_type is int:
+            if not MIN_ORJSON_INT <= value <= MAX_ORJSON_INT:
+                return False
+        elif value_type is float:
+            if not math.isfinite(value) or "e" in repr(value):
+                return False
+        else:
+            return False
+    return True
@@ -57,4 +57,26 @@ def test_AppContext_log_message():
 
     log_string = context.log_messages.as_string(logging.INFO)
     expected = "[INFO] info\n[WARNING] warning\n[ERROR] error\n[WARNING] warning"
-    assert log_string == expected
\ No newline at end of file
+    assert log_string == expected
+def test_AppContext_replay():
+    worker_context = AppContext(
+        logger_name="cfn-docgen-test-worker",
+        log_level=logging.CRITICAL,
+    )
+    worker_context.log_warning("warning")
+    worker_context.log_debug("debug")
+    worker_context.log_error("error")
+    context = AppContext(
+        log_level=logging.INFO,
+        connection_settings=ConnectionSettings(aws=AwsConnectionSettings(profile_name=None)),
+    )
+    context.log_info("info")
+
+    context.replay(worker_context.log_messages.messages)
+
+    assert [(m.level, m.message) for m in context.log_messages.messages] == [
+        (logging.INFO, "info"),
+        (logging.WARNING, "warning"),
+        (logging.DEBUG, "debug"),
+        (logging.ERROR, "error"),
+    ]
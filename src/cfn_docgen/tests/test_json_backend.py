@@ -0,0 +1,49 @@
+import json
+from collections import OrderedDict
+from typing import Any
+
+import pytest
+from cfn_docgen import json_backend
+
+def test_orjson_available():
+    assert json_backend.ORJSON_AVAILABLE
+
+@pytest.mark.parametrize("data", [
+    '{"Foo": [1, 2.5, -3e10, true, false, null], "Bar": "é あ 😀"}',
+    '{"Foo": [1, 2.5, -3e10, true, false, null], "Bar": "é あ 😀"}'.encode(),
+    # not supported by orjson
+    '{"NaN": NaN, "Infinity": -Infinity, "Big": 123456789012345678901234567890}',
+])
+def test_loads(data:Any):
+    expected = json.loads(data)
+    assert json.dumps(json_backend.loads(data)) == json.dumps(expected)
+
+def test_loads_invalid():
+    with pytest.raises(json.JSONDecodeError):
+        json_backend.loads(b'{"Foo": }')
+
+@pytest.mark.parametrize("obj", [
+    {"Foo": [1, 2.5, -3, True, False, None, "", [], {}], "Bar": {"Baz": "é あ 😀   \x7f"}},
+    {"Escaped": "\"quoted\" \\ \n\t\b\f\r \x00 \x1f </script>"},
+    [0.1, 1.0, -0.0, 123456789.125, 0.0001, 1e15],
+    # rendered differently or not supported by orjson
+    [1e16, 1e-05, 5e-324, float("nan"), float("inf")],
+    [2**64, -(2**63) - 1],
+    {1: "int", 1.5: "float", None: "null", True: "bool"},
+    OrderedDict([("B", 1), ("A", 2)]),
+    ("tuple", "\ud800"),
+    "scalar",
+    [],
+])
+def test_dumps_indented(obj:Any):
+    assert json_backend.dumps_indented(obj) == json.dumps(obj, indent=2, ensure_ascii=False)
+
+def test_dumps_indented_not_serializable():
+    with pytest.raises(TypeError):
+        json_backend.dumps_indented({"Foo": object()})
+
+def test_without_orjson(monkeypatch:pytest.MonkeyPatch):
+    monkeypatch.setattr(json_backend, "ORJSON_AVAILABLE", False)
+    obj = {"Foo": [1, 2.5, None], "Bar": "あ"}
+    assert json_backend.loads(json.dumps(obj).encode()) == obj
+    assert json_backend.dumps_indented(obj) == json.dumps(obj, indent=2, ensure_ascii=False)